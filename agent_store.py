@@ -0,0 +1,74 @@
+# single list of live ants with stable ids, used for updates, rendering and combat
+class AgentStore:
+    def __init__(self, ants=()):
+        self.ants = []
+        # position of each ant in self.ants keyed by ant id
+        self.slots = {}
+        self.next_id = 0
+        for ant in ants:
+            self.add(ant)
+
+    def __iter__(self):
+        return iter(self.ants)
+
+    def __len__(self):
+        return len(self.ants)
+
+    def __contains__(self, ant):
+        slot = self.slots.get(getattr(ant, "id", None))
+        return slot is not None and self.ants[slot] is ant
+
+    def __getitem__(self, slot):
+        return self.ants[slot]
+
+    # adds an ant and gives it the next free id
+    def add(self, ant):
+        ant.id = self.next_id
+        self.next_id += 1
+        self.slots[ant.id] = len(self.ants)
+        self.ants.append(ant)
+        return ant
+
+    def get(self, ant_id):
+        slot = self.slots.get(ant_id)
+        return None if slot is None else self.ants[slot]
+
+    # puts new_ant in old_ants slot, it keeps the old ants id
+    def replace(self, old_ant, new_ant):
+        new_ant.id = old_ant.id
+        self.ants[self.slots[old_ant.id]] = new_ant
+
+    # takes old_ant out keeping the order of the others and puts new_ant last, it keeps the old
+    # ants id, so the new ant acts after every other ant like a role change always has
+    def replace_at_end(self, old_ant, new_ant):
+        slot = self.slots.pop(old_ant.id)
+        del self.ants[slot]
+        for ant in self.ants[slot:]:
+            self.slots[ant.id] -= 1
+        new_ant.id = old_ant.id
+        self.slots[new_ant.id] = len(self.ants)
+        self.ants.append(new_ant)
+
+    # removes every dead ant in one pass keeping the others in order, returns the removed ants,
+    # ants act in store order so keeping it keeps seeded games the same
+    def remove_dead(self):
+        removed = []
+        write = 0
+        for ant in self.ants:
+            if ant.alive:
+                if write != self.slots[ant.id]:
+                    self.ants[write] = ant
+                    self.slots[ant.id] = write
+                write += 1
+            else:
+                removed.append(ant)
+                del self.slots[ant.id]
+        del self.ants[write:]
+        return removed
+
+    # the given ants that are still in the store, in store order
+    def in_order(self, ants):
+        slots = self.slots
+        present = [ant for ant in ants if ant in self]
+        present.sort(key=lambda ant: slots[ant.id])
+        return present
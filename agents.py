@@ -1,69 +1,44 @@
-import random
 import math
-import heapq
+from collections import deque
 
+from seeding import SplitMix64
+from spatial_index import SpatialIndex
+from telemetry import DEBUG, INFO
 
-def a_star_search(environment, start, goal):
-
-    # returns manhattan distance between points
-    def heuristic(start_point, end_point):
-        return abs(start_point[0] - end_point[0]) + abs(start_point[1] - end_point[1])
-
-    # q for nodes to search, starts with priority of 0
-    search_q = []
-    heapq.heappush(search_q, (0, start))
-
-    # dictionary to track path
-    came_from = {}
-    # dictionary to store cost
-    cost_so_far = {start: 0}
-
-    while search_q:
-
-        # gets lowest priority node
-        priority, current = heapq.heappop(search_q)
-
-        if current == goal:
-            break
-
-        # explore all valid neighbors
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            neighbor = ((current[0] + dx) % environment.width, (current[1] + dy) % environment.height)
-
-            # avoids hazards
-            if environment.grid[neighbor[1]][neighbor[0]]["hazard"]:
-                continue
-
-            # calculate new cost
-            new_cost = cost_so_far[current] + 1
-            # if neighbor hasn't been visited or a cheaper path found
-            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                # updates cost
-                cost_so_far[neighbor] = new_cost
-                # calculates priority for open set
-                priority = new_cost + heuristic(goal, neighbor)
-                # adds neighbor to open set
-                heapq.heappush(search_q, (priority, neighbor))
-                # records path to neighbor
-                came_from[neighbor] = current
-
-    # reconstructs path to goal node then returns the path as output
-    current = goal
-    path = []
-    while current != start:
-        path.append(current)
-        current = came_from.get(current, start)
-    path.reverse()
-    return path
+# chance a scout boxed in on its route gives up waiting and plans a new route
+REPLAN_CHANCE = 0.1
 
 
+# ants keep their state in slots rather than a dict per ant, large colonies have many thousands
 class AntBasicMovement:
-    def __init__(self, x, y, environment):
+    __slots__ = ("x", "y", "environment", "rng", "steps_since_last_move", "alive", "move_delay", "last_turn",
+                 "next_turn", "id", "colony")
+
+    def __init__(self, x, y, environment, rng=None):
         self.x = x
         self.y = y
         self.environment = environment
+        # the ant stands on its cell from when it is made until the simulation removes it
+        environment.occupancy.add(x, y)
+        # the ants own random stream for its decisions
+        self.rng = rng or SplitMix64()
         self.steps_since_last_move = 0
         self.alive = True
+        # ticks waited between moves
+        self.move_delay = 0
+        # ticks of the last turn counted and the next move, kept by the simulations scheduler
+        self.last_turn = None
+        self.next_turn = None
+
+    # steps onto a cell, keeping the occupancy counts current for the ants that move after it
+    def move_to(self, x, y):
+        self.environment.occupancy.move(self.x, self.y, x, y)
+        self.x = x
+        self.y = y
+
+    # counts ticks the ant was not called for, the same as calling act while it waits
+    def wait(self, ticks):
+        self.steps_since_last_move += ticks
 
     # moves ant randomly both straight and diagonally, avoiding occupied squares and hazards
     def move_randomly(self, occupied_squares):
@@ -76,10 +51,10 @@ class AntBasicMovement:
         ]
         valid_moves = [
             pos for pos in potential_moves
-            if pos not in occupied_squares and not self.environment.grid[pos[1]][pos[0]]["hazard"]
+            if pos not in occupied_squares and not self.environment.grid.hazard[pos[1], pos[0]]
         ]
         if valid_moves:
-            self.x, self.y = random.choice(valid_moves)
+            self.move_to(*self.rng.choice(valid_moves))
 
     # gets Euclidean distance
     def euclidean_distance(self, x1, y1, x2, y2):
@@ -96,109 +71,166 @@ class AntBasicMovement:
         ]
         valid_moves = [
             pos for pos in potential_moves
-            if pos not in occupied_squares and not self.environment.grid[pos[1]][pos[0]]["hazard"]
+            if pos not in occupied_squares and not self.environment.grid.hazard[pos[1], pos[0]]
         ]
         if valid_moves:
             best_move = min(valid_moves, key=lambda pos: self.euclidean_distance(pos[0], pos[1], target_x, target_y))
-            self.x, self.y = best_move
+            self.move_to(*best_move)
 
 
 class ScoutAnt(AntBasicMovement):
-    def __init__(self, x, y, environment, colony):
-        super().__init__(x, y, environment)
+    __slots__ = ("state", "current_food", "current_route")
+    role = "scout"
+
+    def __init__(self, x, y, environment, colony, rng=None):
+        super().__init__(x, y, environment, rng)
         self.colony = colony
         self.state = "scanning"
         self.current_food = None
-        self.food = []
-        self.hazards = []
-        self.current_route = []
+        # cells left on the way to the food, taken from the front as the scout moves
+        self.current_route = deque()
+        self.move_delay = environment.config.scout_move_delay
+
+    # the environments hazard cells, shared by every scout, a frozenset so no ant can change them
+    @property
+    def hazards(self):
+        return self.environment.hazard_locations
 
-    # scans enviroment for food and hazards updates both lists
+    # scans enviroment for food and hazards, returns the food in row order like a full grid sweep,
+    # it is only used to pick a target so no scout keeps its own copy
     def scan_environment(self):
-        self.food = []
-        self.hazards = []
-        for y in range(self.environment.height):
-            for x in range(self.environment.width):
-                cell = self.environment.grid[y][x]
-                if cell["food"] > 0:
-                    self.food.append((x, y))
-                if cell["hazard"]:
-                    self.hazards.append((x, y))
-        print(f"scout ant scanned grid found food: {len(self.food)}, hazards: {len(self.hazards)}")
-
-    def act(self, occupied_squares, all_ants):
+        food = sorted(self.environment.food_locations, key=lambda location: (location[1], location[0]))
+        self.environment.telemetry.log(DEBUG, "scout.scan", "scout ant scanned grid found food: {}, hazards: {}",
+                                       len(food), len(self.hazards))
+        return food
+
+    # another ant is on the next cell of the route, steps onto a free cell next to the one after it
+    # and rejoins the route there, false when there is no such cell
+    def step_around(self, occupied_squares):
+        route = self.current_route
+        blocked = route[0]
+        after_x, after_y = route[1]
+        width = self.environment.width
+        height = self.environment.height
+        hazard = self.environment.grid.hazard
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
+            pos = ((self.x + dx) % width, (self.y + dy) % height)
+            if (pos != blocked and pos not in occupied_squares and not hazard[pos[1], pos[0]]
+                    and (pos[0] - after_x + 1) % width <= 2 and (pos[1] - after_y + 1) % height <= 2):
+                route.popleft()
+                # the cell after could be next to the ant already
+                if pos == route[0]:
+                    route.popleft()
+                self.move_to(*pos)
+                return True
+        return False
+
+    def act(self, occupied_squares, all_ants, ant_index=None):
 
         # movement happens every three steps
-        if self.steps_since_last_move < 3:
+        if self.steps_since_last_move < self.move_delay:
             self.steps_since_last_move += 1
             return
         self.steps_since_last_move = 0
 
         # scans grid, chooses random food
         if self.state == "scanning":
-            self.scan_environment()
-            if self.food:
-                self.current_food = random.choice(self.food)
-                self.current_route = a_star_search(self.environment, (self.x, self.y), self.current_food)
-                # change state to traveling
-                self.state = "traveling"
+            food = self.scan_environment()
+            if food:
+                self.current_food = self.rng.choice(food)
+                route = self.environment.paths.find_path((self.x, self.y), self.current_food)
+                if route is None:
+                    # food can't be reached, try again next scan
+                    self.current_food = None
+                    self.move_randomly(occupied_squares)
+                else:
+                    self.current_route = deque(route)
+                    # change state to traveling
+                    self.state = "traveling"
             else:
                 self.move_randomly(occupied_squares)
 
         # follows path to food
         elif self.state == "traveling":
             if self.current_route:
-                next_step = self.current_route.pop(0)
-                self.x, self.y = next_step
-                # once at food ,mark as visited
+                if self.current_route[0] not in occupied_squares:
+                    self.move_to(*self.current_route.popleft())
+                elif len(self.current_route) == 1:
+                    # an ant is on the food, wait for it to move off
+                    return
+                elif not self.step_around(occupied_squares):
+                    # boxed in, usually wait for the crowd to move on, now and then wander off and
+                    # plan again from there so two scouts meeting in a narrow gap do not wait forever
+                    if self.rng.random() >= REPLAN_CHANCE:
+                        return
+                    self.move_randomly(occupied_squares)
+                    route = self.environment.paths.find_path((self.x, self.y), self.current_food)
+                    if route is None:
+                        self.state = "scanning"
+                        self.current_food = None
+                        self.current_route.clear()
+                    else:
+                        self.current_route = deque(route)
+                    return
+                # once at food, go back laying a trail to it
                 if not self.current_route:
-                    if self.current_food in self.food:
-                        self.food.remove(self.current_food)
                     # change state to returning
                     self.state = "returning"
-                    self.environment.add_pheromone(self.x, self.y, colony=self.colony, amount=20, food_location=self.current_food)
+                    self.environment.add_pheromone(self.x, self.y, colony=self.colony, amount=self.environment.config.scout_pheromone_amount, food_location=self.current_food)
             else:
                 self.state = "returning"
 
         # while returning leave pheromones
         elif self.state == "returning":
-            self.environment.add_pheromone(self.x, self.y, colony=self.colony, amount=20, food_location=self.current_food)
+            self.environment.add_pheromone(self.x, self.y, colony=self.colony, amount=self.environment.config.scout_pheromone_amount, food_location=self.current_food)
             # gets nest coords
             nest_x, nest_y = self.environment.nests[self.colony]
             # once back at nest change state back to scanning, reset target food and clear path
             if (self.x, self.y) == (nest_x, nest_y):
                 self.state = "scanning"
                 self.current_food = None
-                self.current_route = []
+                self.current_route.clear()
             else:
-                # if not back at nest yet, continue back to nest
-                if not self.current_route:
-                    self.current_route = a_star_search(self.environment, (self.x, self.y), (nest_x, nest_y))
-                if self.current_route:
-                    next_step = self.current_route.pop(0)
-                    self.x, self.y = next_step
+                # if not back at nest yet, follow the nests distance map one step closer
+                next_step = self.environment.paths.step_home(self.colony, self.x, self.y)
+                if next_step and next_step not in occupied_squares:
+                    self.move_to(*next_step)
+                else:
+                    self.move_randomly(occupied_squares)
 
 
 class WorkerAnt(AntBasicMovement):
-    def __init__(self, x, y, environment, colony):
-        super().__init__(x, y, environment)
+    __slots__ = ("carrying_food", "last_position", "timeout_counter", "timeout_limit", "recent_positions",
+                 "recent_head", "memory_limit")
+    role = "worker"
+
+    def __init__(self, x, y, environment, colony, rng=None):
+        super().__init__(x, y, environment, rng)
         self.colony = colony
         self.carrying_food = False
         self.last_position = None
         self.timeout_counter = 0
         # how long until ants head back to nest
-        self.timeout_limit = 500
-        # saves recent position to stop ants going in circles
-        self.recent_positions = []
-        self.memory_limit = 5
+        self.timeout_limit = environment.config.worker_timeout_limit
+        # saves recent position to stop ants going in circles, a ring of memory_limit cells
+        # where recent_head is the next one overwritten
+        self.memory_limit = environment.config.worker_memory_limit
+        self.recent_positions = [None] * self.memory_limit
+        self.recent_head = 0
+        self.move_delay = environment.config.worker_move_delay
+
+    # the timeout keeps counting while the ant waits
+    def wait(self, ticks):
+        super().wait(ticks)
+        self.timeout_counter += ticks
 
-    def act(self, occupied_squares, all_ants):
+    def act(self, occupied_squares, all_ants, ant_index=None):
 
         # adds 1 to timer
         self.timeout_counter += 1
 
         # movement happens every 5 steps
-        if self.steps_since_last_move < 5:
+        if self.steps_since_last_move < self.move_delay:
             self.steps_since_last_move += 1
             return
         self.steps_since_last_move = 0
@@ -232,31 +264,34 @@ class WorkerAnt(AntBasicMovement):
                     (1, 1), (-1, -1), (1, -1), (-1, 1)
                 ]
             ]
+            hazard = self.environment.grid.hazard
+            pheromone = self.environment.grid.pheromone[self.colony - 1]
             # filtering out bad moves
             valid_moves = [
                 pos for pos in potential_moves
                 if pos != self.last_position
                    and pos not in self.recent_positions
-                   and not self.environment.grid[pos[1]][pos[0]]["hazard"]
+                   and not hazard[pos[1], pos[0]]
+                   and pos not in occupied_squares
 
                     # follow colony trail
-                   and self.environment.grid[pos[1]][pos[0]]["pheromone"].get(self.colony, 0) > 0
+                   and pheromone[pos[1], pos[0]] > 0
             ]
 
             # within the valid moves choose the best move
             if valid_moves:
                 # best move is one with highest pheromone level and moving further away from nest
                 best_move = max(valid_moves, key=lambda pos: (
-                    self.environment.grid[pos[1]][pos[0]]["pheromone"].get(self.colony, 0),
+                    pheromone[pos[1], pos[0]],
                     self.euclidean_distance(pos[0], pos[1], self.environment.nests[self.colony][0], self.environment.nests[self.colony][1])
                 ))
                 self.last_position = (self.x, self.y)
-                self.x, self.y = best_move
+                self.move_to(*best_move)
 
                 # updates last five positions
-                self.recent_positions.append((self.x, self.y))
-                if len(self.recent_positions) > self.memory_limit:
-                    self.recent_positions.pop(0)
+                if self.memory_limit:
+                    self.recent_positions[self.recent_head] = (self.x, self.y)
+                    self.recent_head = (self.recent_head + 1) % self.memory_limit
 
                 # check if food is found
                 if self.environment.is_food(self.x, self.y):
@@ -269,29 +304,37 @@ class WorkerAnt(AntBasicMovement):
                 self.last_position = (self.x, self.y)
 
 class AttackAnt(AntBasicMovement):
-    def __init__(self, x, y, environment, colony):
-        super().__init__(x, y, environment)
+    __slots__ = ("attack_radius", "follow_distance", "in_final_duel", "only_attackers_left")
+    role = "attacker"
+
+    def __init__(self, x, y, environment, colony, rng=None):
+        super().__init__(x, y, environment, rng)
         self.colony = colony
         # range for attacks
-        self.attack_radius = 2
+        self.attack_radius = environment.config.attack_radius
         # distance they follow scout
-        self.follow_distance = 5
+        self.follow_distance = environment.config.follow_distance
         self.in_final_duel = False
+        self.move_delay = environment.config.attacker_move_delay
 
-    def act(self, occupied_squares, all_ants):
+    def act(self, occupied_squares, all_ants, ant_index=None):
 
         # movement every 3 steps
-        if self.steps_since_last_move < 3:
+        if self.steps_since_last_move < self.move_delay:
             self.steps_since_last_move += 1
             return
         self.steps_since_last_move = 0
 
+        # spatial index of the ants, normally built once per tick by the simulation
+        if ant_index is None:
+            ant_index = SpatialIndex(all_ants)
+
         # check if only attackers
-        self.check_only_attackers_left(all_ants)
+        self.check_only_attackers_left(ant_index)
 
         # change state to find and attack
         if self.only_attackers_left:
-            enemy_ant = self.find_nearest_enemy_attacker(all_ants)
+            enemy_ant = self.find_nearest_enemy_attacker(ant_index)
             if enemy_ant:
                 # moves towards enemy ant
                 self.move_towards(enemy_ant.x, enemy_ant.y, occupied_squares)
@@ -302,12 +345,12 @@ class AttackAnt(AntBasicMovement):
         else:
             # protection state
             # if enemy attack
-            enemy_ants = self.detect_enemies(all_ants)
+            enemy_ants = self.detect_enemies(ant_index)
             if enemy_ants:
                 self.attack(enemy_ants)
             else:
                 # locate nearest scout to defend
-                scout_position = self.find_scout_position(all_ants)
+                scout_position = self.find_scout_position(ant_index)
                 if scout_position:
                     distance = self.euclidean_distance(self.x, self.y, scout_position[0], scout_position[1])
                     # keeps within distance of 5
@@ -319,41 +362,36 @@ class AttackAnt(AntBasicMovement):
                     self.move_randomly(occupied_squares)
 
     # check own colony if only attackers are left
-    def check_only_attackers_left(self, all_ants):
-        colony_ants = [ant for ant in all_ants if ant.colony == self.colony]
-        self.only_attackers_left = all(isinstance(ant, AttackAnt) for ant in colony_ants)
+    def check_only_attackers_left(self, ant_index):
+        self.only_attackers_left = ant_index.count(self.colony) == ant_index.count(self.colony, "attacker")
 
     # finds nearest enemy ant
-    def find_nearest_enemy_attacker(self, all_ants):
-        nearest_enemy = None
-        min_distance = float('inf')
-        for ant in all_ants:
-            if isinstance(ant, AttackAnt) and ant.colony != self.colony:
-                distance = self.euclidean_distance(self.x, self.y, ant.x, ant.y)
-                if distance < min_distance:
-                    nearest_enemy = ant
-                    min_distance = distance
-        return nearest_enemy
+    def find_nearest_enemy_attacker(self, ant_index):
+        enemies = [
+            ant_index.nearest(self.x, self.y, colony, "attacker")
+            for colony in ant_index.colonies() if colony != self.colony
+        ]
+        enemies = [ant for ant in enemies if ant is not None]
+        if not enemies:
+            return None
+        return ant_index.closest_of(self.x, self.y, enemies)
 
     # detects all ants in attack radius, checks if enemy
-    def detect_enemies(self, all_ants):
-        enemies = []
-        for ant in all_ants:
-            if ant.colony != self.colony:
-                distance = self.euclidean_distance(self.x, self.y, ant.x, ant.y)
-                if distance <= self.attack_radius:
-                    enemies.append(ant)
-        return enemies
+    def detect_enemies(self, ant_index):
+        return ant_index.within_radius(self.x, self.y, self.attack_radius, exclude_colony=self.colony)
 
     # finds closest scout in colony
-    def find_scout_position(self, all_ants):
-        for ant in all_ants:
-            if isinstance(ant, ScoutAnt) and ant.colony == self.colony:
-                return ant.x, ant.y
+    def find_scout_position(self, ant_index):
+        scouts = ant_index.by_role(self.colony, "scout")
+        if scouts:
+            return scouts[0].x, scouts[0].y
         return None
 
     # attacks first enemy in list
     def attack(self, enemies):
         target = enemies[0]
-        print(f"attack ant from colony {self.colony} attacked enemy at: ({target.x}, {target.y})!")
+        self.environment.telemetry.log(INFO, "attack.kill", "attack ant from colony {} attacked enemy at: ({}, {})!",
+                                       self.colony, target.x, target.y)
         target.alive = False
+        if self.environment.events is not None:
+            self.environment.events.kill(self, target)
@@ -0,0 +1,85 @@
+# times a tick of attack ant decisions with the spatial index against full list scans
+# run from the repo root with: python -m benchmarks.combat
+import math
+import random
+
+from agents import AttackAnt, ScoutAnt, WorkerAnt
+from benchmarks.common import print_table, time_per_call
+from environment import Environment
+from spatial_index import SpatialIndex
+
+GRID_SIZE = 250
+ANT_COUNTS = [100, 500, 2000, 5000, 20000, 50000]
+# list scans are quadratic, past this they take minutes
+MAX_SCAN_ANTS = 5000
+
+
+# answers the same queries as SpatialIndex by scanning every ant like the old code
+class ListScan:
+    def __init__(self, ants):
+        self.ants = ants
+
+    def colonies(self):
+        return sorted({ant.colony for ant in self.ants})
+
+    def count(self, colony, role=None):
+        return sum(1 for ant in self.ants if ant.colony == colony and (role is None or ant.role == role))
+
+    def by_role(self, colony, role):
+        return [ant for ant in self.ants if ant.colony == colony and ant.role == role]
+
+    def within_radius(self, x, y, radius, exclude_colony=None):
+        return [
+            ant for ant in self.ants
+            if ant.colony != exclude_colony and math.sqrt((ant.x - x) ** 2 + (ant.y - y) ** 2) <= radius
+        ]
+
+    def nearest(self, x, y, colony, role=None):
+        ants = [ant for ant in self.ants if ant.colony == colony and (role is None or ant.role == role)]
+        return self.closest_of(x, y, ants) if ants else None
+
+    def closest_of(self, x, y, ants):
+        return min(ants, key=lambda ant: math.sqrt((ant.x - x) ** 2 + (ant.y - y) ** 2))
+
+
+def make_ants(environment, count, seed=0):
+    rng = random.Random(seed)
+    ants = []
+    for i in range(count):
+        ant_type = [ScoutAnt, WorkerAnt, WorkerAnt, AttackAnt, AttackAnt][i % 5]
+        ants.append(ant_type(rng.randrange(GRID_SIZE), rng.randrange(GRID_SIZE), environment, colony=i % 2 + 1))
+    return ants
+
+
+# one tick where every attack ant moves, attacks are made harmless so the setup stays the same
+def attack_tick(ants, make_index):
+    ant_index = make_index(ants)
+    occupied = set()
+    for ant in ants:
+        if isinstance(ant, AttackAnt):
+            ant.steps_since_last_move = 3
+            old_x, old_y = ant.x, ant.y
+            ant.act(occupied, ants, ant_index)
+            if isinstance(ant_index, SpatialIndex) and (ant.x, ant.y) != (old_x, old_y):
+                ant_index.moved(ant, old_x, old_y)
+    for ant in ants:
+        ant.alive = True
+
+
+def main():
+    environment = Environment(GRID_SIZE, GRID_SIZE)
+    rows = []
+    for count in ANT_COUNTS:
+        ants = make_ants(environment, count)
+        calls = 5 if count <= 5000 else 2
+        indexed = time_per_call(lambda: attack_tick(ants, SpatialIndex), calls)
+        if count <= MAX_SCAN_ANTS:
+            scanned = time_per_call(lambda: attack_tick(ants, ListScan), calls)
+            rows.append([count, f"{scanned * 1000:.1f}", f"{indexed * 1000:.1f}", f"{scanned / indexed:.1f}x"])
+        else:
+            rows.append([count, "-", f"{indexed * 1000:.1f}", "-"])
+    print_table(["ants", "scan ms/tick", "index ms/tick", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
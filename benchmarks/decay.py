@@ -0,0 +1,87 @@
+# compares the vectorised pheromone decay models against the old per cell loop
+# run from the repo root with: python -m benchmarks.decay
+import random
+
+from benchmarks.common import print_table, time_per_call
+from environment import Environment
+from pheromone_decay import make_decay_model
+
+GRID_SIZES = [75, 250, 1000]
+# share of cells holding pheromones and how many trails point at food
+TRAIL_CELL_SHARE = 0.05
+NUM_TRAILS = 50
+
+
+# the update_pheromone_timeleft loop from before the grid moved to arrays
+def legacy_update_pheromone_timeleft(grid, pheromone_trails):
+    for y, row in enumerate(grid):
+        for x, cell in enumerate(row):
+            if "timeleft" in cell and cell["timeleft"] > 0:
+                cell["timeleft"] -= 1
+                if cell["timeleft"] == 0:
+                    cell["pheromone"] = {1: 0, 2: 0}
+
+                    if (x, y) in pheromone_trails:
+                        for food_location, trail in pheromone_trails.items():
+                            if (x, y) in trail:
+                                trail.remove((x, y))
+                        pheromone_trails = {k: v for k, v in pheromone_trails.items() if v}
+    return pheromone_trails
+
+
+# picks the same random trail cells for both grid layouts
+def make_trails(size, seed=0):
+    rng = random.Random(seed)
+    cells = [(rng.randrange(size), rng.randrange(size)) for _ in range(int(size * size * TRAIL_CELL_SHARE))]
+    trails = {}
+    for i, cell in enumerate(cells):
+        food_location = cells[i % NUM_TRAILS]
+        trails.setdefault(food_location, set()).add(cell)
+    timers = {cell: rng.randint(1, 1050) for cell in cells}
+    return trails, timers
+
+
+def legacy_setup(size):
+    trails, timers = make_trails(size)
+    grid = [[{"food": 0, "hazard": False, "pheromone": {1: 0, 2: 0}} for _ in range(size)] for _ in range(size)]
+    for (x, y), timeleft in timers.items():
+        grid[y][x]["pheromone"][1] = 20
+        grid[y][x]["timeleft"] = timeleft
+    return grid, trails
+
+
+def array_setup(size, model):
+    trails, timers = make_trails(size)
+    environment = Environment(size, size, pheromone_decay=make_decay_model(model))
+    for food_location, trail in trails.items():
+        for x, y in trail:
+            environment.add_pheromone(x, y, colony=1, amount=20, food_location=food_location,
+                                      timeleft=timers[(x, y)])
+    return environment
+
+
+def main():
+    rows = []
+    for size in GRID_SIZES:
+        calls = 3 if size >= 1000 else 20
+
+        grid, trails = legacy_setup(size)
+        state = {"trails": trails}
+
+        def legacy_tick():
+            state["trails"] = legacy_update_pheromone_timeleft(grid, state["trails"])
+
+        legacy = time_per_call(legacy_tick, calls)
+        del grid
+        rows.append([f"{size}x{size}", "legacy loop", f"{legacy * 1000:.2f}", "1.0x"])
+
+        for model in ["timeout", "evaporation", "diffusion"]:
+            environment = array_setup(size, model)
+            seconds = time_per_call(environment.update_pheromone_timeleft, calls)
+            rows.append([f"{size}x{size}", model, f"{seconds * 1000:.2f}", f"{legacy / seconds:.1f}x"])
+
+    print_table(["grid", "decay", "ms/tick", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
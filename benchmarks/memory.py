@@ -0,0 +1,91 @@
+# bytes per ant for 100k ants in the colony role mix, after scouts have scanned for food and
+# workers have filled their position memory, measured with tracemalloc, each ant counted with the
+# random stream it carries in a game
+# run from the repo root with: python -m benchmarks.memory
+import gc
+import random
+import tracemalloc
+
+from agents import AttackAnt, ScoutAnt, WorkerAnt
+from benchmarks.common import print_table
+from environment import Environment
+from seeding import SplitMix64
+from worker_batch import BatchedWorkerAnt, WorkerBatch
+
+ANTS = 100000
+# ants of each role in 100k, three workers to each scout and attacker like a colony
+ROLE_SHARES = [(ScoutAnt, 0.2), (WorkerAnt, 0.6), (AttackAnt, 0.2)]
+GRID_SIZE = 1000
+NUM_FOOD = 500
+
+
+def make_environment():
+    environment = Environment(GRID_SIZE, GRID_SIZE, rng=random.Random(0))
+    environment.spawn_food(num_food=NUM_FOOD)
+    environment.add_hazards(num_hazards=GRID_SIZE * GRID_SIZE // 20)
+    # a trail everywhere so workers keep following it and remembering where they went
+    environment.grid.pheromone[:] = 20
+    return environment
+
+
+# plays a role for a few turns so its per ant state is the size it is in a running game
+def exercise(ant):
+    if isinstance(ant, ScoutAnt):
+        ant.scan_environment()
+    elif isinstance(ant, WorkerAnt):
+        for _ in range(ant.memory_limit + 1):
+            ant.steps_since_last_move = ant.move_delay
+            ant.act(set(), [])
+
+
+# bytes allocated for count ants of one role, kept alive until measured
+def measure(environment, ant_class, count):
+    gc.collect()
+    tracemalloc.start()
+    rng = random.Random(0)
+    before = tracemalloc.get_traced_memory()[0]
+    ants = [ant_class(rng.randrange(GRID_SIZE), rng.randrange(GRID_SIZE), environment, colony=i % 2 + 1,
+                      rng=SplitMix64(i)) for i in range(count)]
+    for ant in ants:
+        exercise(ant)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del ants
+    return used
+
+
+# makes workers for the arrays backend, a slotted proxy each and a row in one shared batch,
+# the batch is made with the first worker so its arrays are counted too
+def batched_worker_maker():
+    batches = []
+
+    def make(x, y, environment, colony, rng):
+        if not batches:
+            batches.append(WorkerBatch(environment))
+        return BatchedWorkerAnt(x, y, environment, colony, batches[0])
+    return make
+
+
+def main():
+    environment = make_environment()
+    rows = []
+    total = 0
+    for ant_class, share in ROLE_SHARES:
+        count = int(ANTS * share)
+        used = measure(environment, ant_class, count)
+        total += used
+        rows.append([ant_class.__name__, count, f"{used / count:.0f}"])
+    rows.append(["all", ANTS, f"{total / ANTS:.0f}"])
+    print_table(["role", "ants", "bytes/ant"], rows)
+    # the random stream on its own, already counted in bytes/ant above
+    rng_bytes = measure(environment, lambda x, y, environment, colony, rng: rng, 10000) / 10000
+    print(f"total {total / 2 ** 20:.1f} MiB, of which the random stream is {rng_bytes:.0f} bytes/ant")
+    # workers in the same number as above, on the arrays backend
+    count = int(ANTS * dict(ROLE_SHARES)[WorkerAnt])
+    batched = measure(environment, batched_worker_maker(), count)
+    print(f"workers on the arrays backend {batched / count:.0f} bytes/ant")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# cost of keeping track of occupied cells, rebuilding a set of ant positions every tick against
+# counting ants in and out of cells as they move, and how many cells end up with two ants
+# because the rebuilt set did not see moves made earlier in the same tick
+# run from the repo root with: python -m benchmarks.occupancy
+import random
+import time
+from collections import Counter
+
+from benchmarks.common import print_table
+from occupancy import Occupancy
+
+GRID_SIZE = 500
+ANT_COUNTS = [1000, 10000, 100000]
+TICKS = 30
+# ants move once every this many ticks like the default worker, the set is rebuilt every tick
+MOVE_EVERY = 6
+MOVES = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+def starting_positions(count, seed=0):
+    rng = random.Random(seed)
+    cells = rng.sample(range(GRID_SIZE * GRID_SIZE), count)
+    return [[cell % GRID_SIZE, cell // GRID_SIZE] for cell in cells]
+
+
+# the ants due this tick step to a random free neighbour, the same way ants move in the game
+def step(ants, tick, occupied, rng, moved=None):
+    for ant in ants[tick % MOVE_EVERY::MOVE_EVERY]:
+        x, y = ant
+        free = [((x + dx) % GRID_SIZE, (y + dy) % GRID_SIZE) for dx, dy in MOVES]
+        free = [cell for cell in free if cell not in occupied]
+        if free:
+            new_x, new_y = rng.choice(free)
+            if moved is not None:
+                moved(x, y, new_x, new_y)
+            ant[0], ant[1] = new_x, new_y
+
+
+# seconds per tick and cells holding more than one ant at the end
+def rebuilt_set(count):
+    ants = starting_positions(count)
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        occupied = {(x, y) for x, y in ants}
+        step(ants, tick, occupied, rng)
+    elapsed = (time.perf_counter() - start) / TICKS
+    return elapsed, sum(1 for ants_here in Counter(map(tuple, ants)).values() if ants_here > 1)
+
+
+def incremental(count):
+    ants = starting_positions(count)
+    rng = random.Random(0)
+    occupancy = Occupancy(GRID_SIZE, GRID_SIZE)
+    for x, y in ants:
+        occupancy.add(x, y)
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        step(ants, tick, occupancy.full, rng, occupancy.move)
+    elapsed = (time.perf_counter() - start) / TICKS
+    return elapsed, int((occupancy.counts > 1).sum())
+
+
+def main():
+    rows = []
+    for count in ANT_COUNTS:
+        old, old_shared = rebuilt_set(count)
+        new, new_shared = incremental(count)
+        rows.append([count, f"{old * 1000:.1f}", f"{new * 1000:.1f}", f"{old / new:.2f}x", old_shared, new_shared])
+    print_table(["ants", "set ms/tick", "counts ms/tick", "speedup", "set shared cells", "counts shared cells"],
+                rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# compares the path finding service against the old per call A* search
+# run from the repo root with: python -m benchmarks.pathfinding
+import heapq
+import random
+import time
+
+from benchmarks.common import print_table
+from environment import Environment
+from pathfinding import Pathfinder
+
+GRID_SIZES = [75, 250, 1000]
+HAZARD_SHARE = 0.1
+QUERIES = 20
+# cache sizes tried in the multi scout run
+CACHE_SIZES = [0, 16, 64, 256, 1024]
+
+
+# the a_star_search function scouts used before the path finding service
+def legacy_a_star_search(environment, start, goal):
+
+    def heuristic(start_point, end_point):
+        return abs(start_point[0] - end_point[0]) + abs(start_point[1] - end_point[1])
+
+    search_q = []
+    heapq.heappush(search_q, (0, start))
+    came_from = {}
+    cost_so_far = {start: 0}
+
+    while search_q:
+        priority, current = heapq.heappop(search_q)
+        if current == goal:
+            break
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            neighbor = ((current[0] + dx) % environment.width, (current[1] + dy) % environment.height)
+            if environment.grid.hazard[neighbor[1], neighbor[0]]:
+                continue
+            new_cost = cost_so_far[current] + 1
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                priority = new_cost + heuristic(goal, neighbor)
+                heapq.heappush(search_q, (priority, neighbor))
+                came_from[neighbor] = current
+
+    current = goal
+    path = []
+    while current != start:
+        path.append(current)
+        current = came_from.get(current, start)
+    path.reverse()
+    return path
+
+
+def make_environment(size, seed=0):
+    environment = Environment(size, size, rng=random.Random(seed))
+    environment.add_hazards(num_hazards=int(size * size * HAZARD_SHARE))
+    return environment
+
+
+# random cells without hazards
+def open_cells(environment, count, seed=0):
+    rng = random.Random(seed)
+    cells = []
+    while len(cells) < count:
+        cell = (rng.randrange(environment.width), rng.randrange(environment.height))
+        if cell not in environment.hazard_locations:
+            cells.append(cell)
+    return cells
+
+
+# random open cells to search between
+def make_queries(environment, seed=0):
+    cells = open_cells(environment, QUERIES * 2, seed)
+    return list(zip(cells[::2], cells[1::2]))
+
+
+def milliseconds_per_query(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(*query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    rows = []
+    for size in GRID_SIZES:
+        environment = make_environment(size)
+        queries = make_queries(environment)
+        paths = environment.paths
+        nest = environment.nests[1]
+
+        legacy = milliseconds_per_query(lambda start, goal: legacy_a_star_search(environment, start, goal), queries)
+        astar = milliseconds_per_query(paths.find_path, queries)
+        legacy_home = milliseconds_per_query(lambda start, goal: legacy_a_star_search(environment, start, nest), queries)
+
+        start = time.perf_counter()
+        paths.nest_distances(1)
+        field_build = (time.perf_counter() - start) * 1000
+        home_step = milliseconds_per_query(lambda start, goal: paths.step_home(1, *start), queries)
+
+        rows.append([f"{size}x{size}", f"{legacy:.2f}", f"{astar:.2f}", f"{legacy_home:.2f}",
+                     f"{field_build:.1f}", f"{home_step:.4f}"])
+    print_table(["grid", "old A* ms", "new A* ms", "old A* to nest ms", "nest field build ms", "step home ms"], rows)
+    print()
+    cache_sizes()
+
+
+# scouts leaving the nest for random food and sometimes picking a new target part way along
+def scout_queries(environment, num_food=150, num_queries=3000, seed=0):
+    rng = random.Random(seed)
+    nest = environment.nests[1]
+    foods = open_cells(environment, num_food, seed)
+    queries = []
+    for _ in range(num_queries):
+        goal = rng.choice(foods)
+        start = nest
+        if queries and rng.random() < 0.3:
+            # starts somewhere along an earlier route to the same food
+            route = environment.paths.find_path(nest, goal) or []
+            if route:
+                start = rng.choice(route)
+        queries.append((start, goal))
+    return queries
+
+
+# hit rates and time for a run of scout searches at different cache sizes
+def cache_sizes(size=250):
+    environment = make_environment(size)
+    queries = scout_queries(environment)
+    rows = []
+    for entries in CACHE_SIZES:
+        paths = Pathfinder(environment, cache_entries=entries)
+        start = time.perf_counter()
+        for query in queries:
+            paths.find_path(*query)
+        seconds = time.perf_counter() - start
+        stats = paths.cache.stats() if paths.cache else {"hit_rate": 0.0, "suffix_hits": 0, "evictions": 0, "bytes": 0}
+        rows.append([entries, f"{stats['hit_rate']:.2%}", stats["suffix_hits"], stats["evictions"],
+                     f"{stats['bytes'] / 1024:.0f}", f"{seconds * 1000 / len(queries):.3f}"])
+    print(f"{len(queries)} scout searches on a {size}x{size} grid")
+    print_table(["cache entries", "hit rate", "suffix hits", "evictions", "KiB", "ms/search"], rows)
+
+
+if __name__ == "__main__":
+    main()
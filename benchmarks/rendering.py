@@ -0,0 +1,156 @@
+# frame time of the cached surface renderer against the old draw call per cell
+# run from the repo root with: python -m benchmarks.rendering
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from benchmarks.common import print_table
+from config import SimulationConfig
+from simulation import Simulation
+
+GRID_SIZES = [75, 250, 500]
+SCREEN_SIZE = (1250, 1250)
+# ticks played before timing so there are trails and moved ants to draw
+WARMUP_TICKS = 200
+FRAMES = 30
+
+
+# the draw_world function from before the renderer, one rect per cell and fonts made every frame
+def legacy_draw_world(screen, food, hazard, pheromone, nests, ants, counts, food_returned, spawn_food_cost, winner=None):
+    # background colour
+    screen.fill((10, 100, 25))
+    cell_size = 16
+
+    # render each cell of environment grid
+    height, width = hazard.shape
+    for y in range(height):
+        for x in range(width):
+            # hazard with dark brown color
+            if hazard[y, x]:
+                pygame.draw.rect(screen, (102, 51, 0),
+                                 (x * cell_size, y * cell_size, cell_size, cell_size))
+            # food with yellow color
+            elif food[y, x] > 0:
+                pygame.draw.rect(screen, (255, 255, 102),
+                                 (x * cell_size, y * cell_size, cell_size, cell_size))
+            # check pheromone levels for brightness intensity
+            elif pheromone[:, y, x].any():
+                # blue and red for respective colonys
+                brightness_blue = min(255, int(pheromone[0, y, x]) * 2)
+                brightness_red = min(255, int(pheromone[1, y, x]) * 2)
+                color = (brightness_red, 55, brightness_blue)
+                pygame.draw.rect(screen, color, (x * cell_size, y * cell_size, cell_size, cell_size))
+
+    # renders nests
+    for colony, (nest_x, nest_y) in nests.items():
+        color = (0, 102, 255) if colony == 1 else (255, 51, 51)  # Different colors for each nest
+        pygame.draw.rect(screen, color, (nest_x * cell_size, nest_y * cell_size, cell_size, cell_size))
+
+    # renders ants
+    for role, x, y in ants:
+        if role == "scout":
+            # cyan for scouts
+            color = (0, 255, 255)
+        elif role == "worker":
+            # orange for workers
+            color = (255, 165, 0)
+        elif role == "attacker":
+            # red for attack ant
+            color = (255, 0, 0)
+        else:
+            color = (255, 255, 255)
+        # draw ants as circles
+        pygame.draw.circle(screen, color,
+                           (x * cell_size + cell_size // 2, y * cell_size + cell_size // 2),
+                           cell_size // 3)
+
+    # set font and get colony counts
+    font = pygame.font.Font(None, 36)
+
+    # display colony 1 info
+    header_1 = font.render("Colony Blue", True, (255, 255, 255))
+    screen.blit(header_1, (10, 10))
+    colony_1_text = [
+        f"Food Returned: {food_returned[1]}/{spawn_food_cost}",
+        f"Scouts: {counts[1]['scouts']}",
+        f"Workers: {counts[1]['workers']}",
+        f"Attackers: {counts[1]['attackers']}"
+    ]
+    for i, line in enumerate(colony_1_text):
+        text = font.render(line, True, (255, 255, 255))
+        screen.blit(text, (10, 50 + i * 30))
+
+    # display colony 2 info
+    header_2 = font.render("Colony Red", True, (255, 255, 255))
+    screen.blit(header_2, (screen.get_width() - 300, 10))
+    colony_2_text = [
+        f"Food Returned: {food_returned[2]}/{spawn_food_cost}",
+        f"Scouts: {counts[2]['scouts']}",
+        f"Workers: {counts[2]['workers']}",
+        f"Attackers: {counts[2]['attackers']}"
+    ]
+    for i, line in enumerate(colony_2_text):
+        text = font.render(line, True, (255, 255, 255))
+        screen.blit(text, (screen.get_width() - 300, 50 + i * 30))
+
+    # display winning colony
+    if winner is not None:
+        another_font = pygame.font.Font(None, 125)
+        winning_text = another_font.render(f"Colony {winner} Wins!", True, (255, 255, 255))  # White text
+        screen.blit(winning_text,
+                    (screen.get_width() // 2 - winning_text.get_width() // 2,
+                     screen.get_height() // 2 - winning_text.get_height() // 2))
+
+    pygame.display.flip()
+
+
+def make_simulation(size):
+    config = SimulationConfig(width=size, height=size, num_food=size * size // 400,
+                              num_hazards=size * size * 500 // (75 * 75), colony_size=50)
+    simulation = Simulation(seed=0, config=config)
+    for _ in range(WARMUP_TICKS):
+        simulation.update()
+    return simulation
+
+
+def legacy_frame(screen, simulation):
+    grid = simulation.environment.grid
+    legacy_draw_world(screen, grid.food, grid.hazard, grid.pheromone, simulation.environment.nests,
+                      ((agent.role, agent.x, agent.y) for agent in simulation.agents), simulation.count_ants(),
+                      simulation.environment.food_returned, simulation.config.spawn_food_cost)
+
+
+def renderer_frame(screen, simulation):
+    pygame.display.update(simulation.render(screen))
+
+
+# mean seconds per frame with the simulation stepping between frames, which is not timed
+def time_frames(screen, size, frame):
+    simulation = make_simulation(size)
+    frame(screen, simulation)
+    seconds = 0.0
+    for _ in range(FRAMES):
+        simulation.update()
+        start = time.perf_counter()
+        frame(screen, simulation)
+        seconds += time.perf_counter() - start
+    return seconds / FRAMES
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    rows = []
+    for size in GRID_SIZES:
+        legacy = time_frames(screen, size, legacy_frame)
+        cached = time_frames(screen, size, renderer_frame)
+        rows.append([f"{size}x{size}", f"{legacy * 1000:.1f}", f"{1 / legacy:.0f}", f"{cached * 1000:.2f}",
+                     f"{1 / cached:.0f}", f"{legacy / cached:.1f}x"])
+    pygame.quit()
+    print_table(["grid", "old ms/frame", "old fps", "new ms/frame", "new fps", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
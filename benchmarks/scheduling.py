@@ -0,0 +1,67 @@
+# act calls and tick time with the turn scheduler against calling every ant every tick
+# run from the repo root with: python -m benchmarks.scheduling
+from benchmarks.common import print_table
+from config import SimulationConfig
+from profiler import TickProfiler
+from simulation import Simulation
+
+GRID_SIZE = 500
+COLONY_SIZES = [5, 1000, 10000, 50000]
+TICKS = 30
+
+
+# the old way, every ant is called every tick and counts down its own move delay
+class PollingScheduler:
+    def __init__(self, simulation):
+        self.simulation = simulation
+
+    def add(self, ant, tick):
+        ant.last_turn = tick - 1
+
+    def pop(self, tick):
+        return list(self.simulation.agents)
+
+    def settle(self, ants, tick):
+        pass
+
+
+# no food so scouts wander instead of searching paths, which would swamp the calls being measured
+def make_simulation(colony_size, polling):
+    config = SimulationConfig(width=GRID_SIZE, height=GRID_SIZE, num_food=0, regen_rate=0.0,
+                              num_hazards=GRID_SIZE * GRID_SIZE // 20, colony_size=colony_size)
+    simulation = Simulation(seed=0, config=config, populate=False)
+    if polling:
+        simulation.scheduler = PollingScheduler(simulation)
+    simulation.environment.spawn_food()
+    simulation.environment.add_hazards()
+    for ant in simulation.starting_ants():
+        simulation.add_ant(ant)
+    simulation.profiler = TickProfiler()
+    return simulation
+
+
+# act calls per tick, ms in the act phase and ms per tick, and the state hash at the end
+def measure(colony_size, polling):
+    simulation = make_simulation(colony_size, polling)
+    for _ in range(TICKS):
+        simulation.update()
+    summary = simulation.profiler.summary()
+    return (summary["counters_per_tick"]["turns"]["mean"], summary["phases_ms"]["act"]["mean"],
+            summary["phases_ms"]["tick"]["mean"], simulation.state_hash())
+
+
+def main():
+    rows = []
+    for colony_size in COLONY_SIZES:
+        old_calls, old_act, old_tick, old_hash = measure(colony_size, polling=True)
+        new_calls, new_act, new_tick, new_hash = measure(colony_size, polling=False)
+        if old_hash != new_hash:
+            raise RuntimeError(f"scheduled game differs from the polled one at colony size {colony_size}")
+        rows.append([colony_size * 2, f"{old_calls:.0f}", f"{new_calls:.0f}", f"{1 - new_calls / old_calls:.0%}",
+                     f"{old_act:.2f}", f"{new_act:.2f}", f"{old_tick:.2f}", f"{new_tick:.2f}"])
+    print_table(["ants", "old calls/tick", "new calls/tick", "calls removed", "old act ms", "new act ms",
+                 "old tick ms", "new tick ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
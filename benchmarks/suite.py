@@ -0,0 +1,245 @@
+# benchmark suite for catching performance regressions before a release, each scaling scenario
+# is a headless game in a fresh process giving ticks/sec, peak memory and per phase times,
+# the microbenchmarks time the hot spots on their own
+# run from the repo root with: python -m benchmarks.suite --out results.json
+# and compare against a saved run with: python -m benchmarks.suite --baseline baseline.json
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from agents import AttackAnt
+from benchmarks.combat import make_ants
+from benchmarks.common import print_table, time_per_call
+from benchmarks.decay import array_setup
+from benchmarks.pathfinding import make_environment, make_queries, open_cells
+from config import SimulationConfig
+from environment import Environment
+from headless import run_headless
+from pathfinding import Pathfinder
+from spatial_index import SpatialIndex
+
+# values swept for each axis, the other settings stay at the base scenario,
+# the quick suite takes about a minute and the full one hours at the largest colonies
+SUITES = {
+    "quick": {
+        "ticks": 100,
+        "grid_size": [75, 250, 1000],
+        "colony_size": [5, 100, 1000],
+        "food_density": [0.001, 0.01],
+        "hazard_density": [0.05, 0.2],
+    },
+    "full": {
+        "ticks": 300,
+        "grid_size": [75, 250, 500, 1000, 2000],
+        "colony_size": [5, 100, 1000, 10000, 100000],
+        "food_density": [0.001, 0.005, 0.02, 0.05],
+        "hazard_density": [0.0, 0.05, 0.1, 0.2, 0.3],
+    },
+}
+# food and hazards per cell in the original 75x75 game
+DEFAULT_FOOD_DENSITY = 15 / (75 * 75)
+DEFAULT_HAZARD_DENSITY = 500 / (75 * 75)
+# grid each axis is swept on when it is not the grid size itself
+BASE_GRID = {"colony_size": 250, "food_density": 250, "hazard_density": 250}
+SEED = 0
+# microbenchmarks report the best of this many timings, which is the least noisy
+REPEATS = 5
+# a metric this much worse than the baseline counts as a regression
+THRESHOLD = 0.15
+# whether more of each metric is better, per phase times are kept for reading but not compared
+HIGHER_IS_BETTER = {"ticks_per_sec": True, "peak_rss_mb": False, "us_per_call": False}
+
+
+def scenario_config(axis, value):
+    size = value if axis == "grid_size" else BASE_GRID[axis]
+    food = value if axis == "food_density" else DEFAULT_FOOD_DENSITY
+    hazards = value if axis == "hazard_density" else DEFAULT_HAZARD_DENSITY
+    return SimulationConfig(
+        width=size,
+        height=size,
+        num_food=max(1, round(size * size * food)),
+        num_hazards=round(size * size * hazards),
+        colony_size=value if axis == "colony_size" else 5,
+    )
+
+
+# runs in a fresh process so the peak memory belongs to this scenario alone
+def run_scenario(job):
+    summary = run_headless(max_ticks=job["ticks"], seed=SEED, worker_backend=job["worker_backend"],
+                           config=job["config"], profile=True)
+    # kilobytes on linux, bytes on macos
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024
+    return {
+        "ticks": summary["ticks"],
+        "ticks_per_sec": summary["ticks_per_sec"],
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "phases_ms": {phase: round(described["mean"], 4)
+                      for phase, described in summary["profile"]["phases_ms"].items()},
+    }
+
+
+def scaling(suite, ticks, worker_backend):
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for axis in ("grid_size", "colony_size", "food_density", "hazard_density"):
+        for value in suite[axis]:
+            job = {"ticks": ticks, "worker_backend": worker_backend,
+                   "config": scenario_config(axis, value).to_dict()}
+            name = f"{axis}={value}"
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[name] = pool.submit(run_scenario, job).result()
+            print(f"{name}: {results[name]['ticks_per_sec']} ticks/sec", file=sys.stderr)
+    return results
+
+
+def best_time(fn, calls):
+    return min(time_per_call(fn, calls) for _ in range(REPEATS))
+
+
+# one uncached A* search between random open cells of a 250x250 grid with hazards
+def micro_a_star():
+    environment = make_environment(250)
+    paths = Pathfinder(environment, cache_entries=0)
+    queries = make_queries(environment)
+    return best_time(lambda: [paths.search(*query) for query in queries], 1) / len(queries)
+
+
+# one tick of pheromone decay over a 250x250 grid with 5% of cells on trails
+def micro_update_pheromone_timeleft():
+    environment = array_setup(250, "timeout")
+    return best_time(environment.update_pheromone_timeleft, 50)
+
+
+# taking the last food from a cell and clearing its 50 cell trail
+def micro_collect_food():
+    timings = []
+    for repeat in range(REPEATS):
+        environment = Environment(250, 250, rng=random.Random(repeat))
+        cells = open_cells(environment, 200 * 51, seed=repeat)
+        foods = cells[:200]
+        for i, food_location in enumerate(foods):
+            environment.set_food(*food_location, 1)
+            for x, y in cells[200 + i * 50:200 + (i + 1) * 50]:
+                environment.add_pheromone(x, y, colony=1, amount=20, food_location=food_location)
+        start = time.perf_counter()
+        for x, y in foods:
+            environment.collect_food(x, y)
+        timings.append((time.perf_counter() - start) / len(foods))
+    return min(timings)
+
+
+# every attack ant among 5000 ants on a 250x250 grid looking for enemies in range
+def micro_detect_enemies():
+    environment = Environment(250, 250)
+    ants = make_ants(environment, 5000)
+    ant_index = SpatialIndex(ants)
+    attackers = [ant for ant in ants if isinstance(ant, AttackAnt)]
+    return best_time(lambda: [ant.detect_enemies(ant_index) for ant in attackers], 5) / len(attackers)
+
+
+MICROBENCHMARKS = {
+    "a_star_search": micro_a_star,
+    "update_pheromone_timeleft": micro_update_pheromone_timeleft,
+    "collect_food": micro_collect_food,
+    "detect_enemies": micro_detect_enemies,
+}
+
+
+def microbenchmarks():
+    return {name: {"us_per_call": round(benchmark() * 1e6, 3)} for name, benchmark in MICROBENCHMARKS.items()}
+
+
+# where and on what the results were measured, comparing across machines means little
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+# metrics worse than the baseline by more than threshold, as (benchmark, metric, old, new, change)
+def compare(results, baseline, threshold=THRESHOLD):
+    regressions = []
+    rows = []
+    for section in ("scaling", "micro"):
+        for name, metrics in results.get(section, {}).items():
+            old_metrics = baseline.get(section, {}).get(name)
+            if old_metrics is None:
+                continue
+            for metric, higher_is_better in HIGHER_IS_BETTER.items():
+                old, new = old_metrics.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = new / old - 1
+                worse = -change if higher_is_better else change
+                rows.append([name, metric, old, new, f"{change:+.1%}", "REGRESSION" if worse > threshold else ""])
+                if worse > threshold:
+                    regressions.append((name, metric, old, new, change))
+    if rows:
+        print_table(["benchmark", "metric", "baseline", "now", "change", ""], rows)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--ticks", type=int, help="ticks per scaling scenario, defaults to the suites own")
+    parser.add_argument("--workers", choices=["objects", "arrays"], default="objects",
+                        help="worker backend for the scaling scenarios")
+    parser.add_argument("--only", choices=["scaling", "micro"], help="run one half of the suite")
+    parser.add_argument("--out", help="json file to write the results to, keep one as a baseline")
+    parser.add_argument("--baseline", help="earlier results to compare against, exits 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="fraction a metric may worsen before it counts as a regression")
+    args = parser.parse_args(argv)
+
+    suite = SUITES[args.suite]
+    results = {"machine": machine_info(), "suite": args.suite, "worker_backend": args.workers}
+    if args.only != "micro":
+        results["ticks"] = args.ticks or suite["ticks"]
+        results["scaling"] = scaling(suite, results["ticks"], args.workers)
+        print_table(["scenario", "ticks", "ticks/sec", "peak MB"],
+                    [[name, result["ticks"], result["ticks_per_sec"], result["peak_rss_mb"]]
+                     for name, result in results["scaling"].items()])
+        print()
+    if args.only != "scaling":
+        results["micro"] = microbenchmarks()
+        print_table(["microbenchmark", "us/call"],
+                    [[name, result["us_per_call"]] for name, result in results["micro"].items()])
+        print()
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}")
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
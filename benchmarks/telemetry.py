@@ -0,0 +1,71 @@
+# tick time with logging off, counting only, full trace to a file, and the old synchronous prints
+# run from the repo root with: python -m benchmarks.telemetry
+import contextlib
+import os
+import random
+import tempfile
+
+from agents import AttackAnt, ScoutAnt, WorkerAnt
+from benchmarks.common import print_table, time_per_call
+from config import SimulationConfig
+from simulation import Simulation
+from telemetry import TRACE, Telemetry
+
+GRID_SIZE = 150
+# extra ants of each role per colony on top of the starting ants
+EXTRA_ANTS = [0, 50, 200]
+TICKS = 200
+
+
+# formats and prints every message straight away, like the print calls it replaced
+class PrintTelemetry(Telemetry):
+    def log(self, level, category, message, *args):
+        self.counts[category] = self.counts.get(category, 0) + 1
+        print(f"{self.tick} {category} {message.format(*args)}")
+
+    def enabled(self, level):
+        return True
+
+
+def make_simulation(extra, telemetry):
+    config = SimulationConfig(width=GRID_SIZE, height=GRID_SIZE, num_food=60, num_hazards=GRID_SIZE * GRID_SIZE // 20)
+    simulation = Simulation(seed=0, config=config, telemetry=telemetry)
+    rng = random.Random(0)
+    for colony, (nest_x, nest_y) in simulation.environment.nests.items():
+        for ant_class in (ScoutAnt, WorkerAnt, AttackAnt):
+            for _ in range(extra):
+                x = (nest_x + rng.randint(-20, 20)) % GRID_SIZE
+                y = (nest_y + rng.randint(-20, 20)) % GRID_SIZE
+                simulation.add_ant(simulation.make_ant(ant_class, x, y, colony))
+    return simulation
+
+
+def time_ticks(extra, telemetry):
+    simulation = make_simulation(extra, telemetry)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        seconds = time_per_call(simulation.update, TICKS)
+    telemetry.close()
+    return seconds, sum(telemetry.counts.values())
+
+
+def main():
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        trace_path = os.path.join(directory, "trace.log")
+        modes = [
+            ("off", lambda: Telemetry(counters=False)),
+            ("counters", lambda: Telemetry()),
+            ("trace to file", lambda: Telemetry(level=TRACE, path=trace_path)),
+            ("print per message", lambda: PrintTelemetry()),
+        ]
+        for extra in EXTRA_ANTS:
+            baseline = None
+            for name, make_telemetry in modes:
+                seconds, messages = time_ticks(extra, make_telemetry())
+                baseline = baseline or seconds
+                rows.append([10 + extra * 6, name, messages, f"{seconds * 1000:.3f}", f"{seconds / baseline:.2f}x"])
+    print_table(["ants", "logging", "messages", "ms/tick", "vs off"], rows)
+
+
+if __name__ == "__main__":
+    main()
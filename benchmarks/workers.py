@@ -0,0 +1,120 @@
+# worker ant throughput for the object and array backends, plus a check that both behave alike
+# run from the repo root with: python -m benchmarks.workers
+import random
+
+import numpy as np
+
+from agents import WorkerAnt
+from benchmarks.common import print_table, time_per_call
+from environment import Environment
+from occupancy import Occupancy
+from seeding import SplitMix64
+from worker_batch import WorkerBatch
+
+GRID_SIZE = 1000
+WORKER_COUNTS = [1000, 10000, 100000]
+# the object backend is too slow to time past this
+MAX_OBJECT_WORKERS = 10000
+TICKS = 12
+
+
+# grid with hazards, pheromone patches and food on some of the trail cells
+def make_environment(seed=0):
+    environment = Environment(GRID_SIZE, GRID_SIZE, regen_seed=seed, rng=random.Random(seed))
+    environment.add_hazards(num_hazards=GRID_SIZE * GRID_SIZE // 20)
+    rng = np.random.default_rng(seed)
+    patches = rng.random((2, GRID_SIZE, GRID_SIZE)) < 0.05
+    environment.grid.pheromone[patches] = rng.integers(20, 200, size=patches.sum())
+    for x, y in zip(*np.nonzero(rng.random((GRID_SIZE, GRID_SIZE)) < 0.002)):
+        environment.set_food(int(x), int(y), 5)
+    return environment
+
+
+# workers spread around both nests with their move timers out of step
+def starting_positions(environment, count, seed=0):
+    rng = random.Random(seed)
+    nests = environment.nests
+    return [
+        (nests[colony][0] + rng.randint(-50, 50), nests[colony][1] + rng.randint(-50, 50), colony, rng.randrange(6))
+        for colony in (1, 2) for _ in range(count // 2)
+    ]
+
+
+# each set of workers starts on an empty occupancy layer
+def clear_occupancy(environment):
+    environment.occupancy = Occupancy(GRID_SIZE, GRID_SIZE, environment.config.ants_per_cell,
+                                      environment.nests.values())
+
+
+def object_workers(environment, positions):
+    clear_occupancy(environment)
+    workers = []
+    for x, y, colony, steps in positions:
+        worker = WorkerAnt(x, y, environment, colony, rng=SplitMix64(x * GRID_SIZE + y))
+        worker.steps_since_last_move = steps
+        workers.append(worker)
+    return workers
+
+
+def batch_workers(environment, positions):
+    clear_occupancy(environment)
+    batch = WorkerBatch(environment, capacity=len(positions), seed=0)
+    for x, y, colony, steps in positions:
+        slot = batch.add(x, y, colony)
+        environment.occupancy.add(x, y)
+        batch.steps_since_last_move[slot] = steps
+    return batch
+
+
+# average distance from the nest, food carried and food returned after some ticks
+def behaviour(environment, positions, ticks, backend):
+    environment.food_returned = {1: 0, 2: 0}
+    if backend == "objects":
+        workers = object_workers(environment, positions)
+        for _ in range(ticks):
+            for worker in workers:
+                worker.act(environment.occupancy.full, workers)
+        xs = np.array([worker.x for worker in workers])
+        ys = np.array([worker.y for worker in workers])
+        colonies = np.array([worker.colony for worker in workers])
+        carrying = np.mean([worker.carrying_food for worker in workers])
+    else:
+        batch = batch_workers(environment, positions)
+        for _ in range(ticks):
+            batch.step()
+        xs, ys, colonies = batch.x[:batch.size], batch.y[:batch.size], batch.colony[:batch.size]
+        carrying = batch.carrying_food[:batch.size].mean()
+    nests = np.array([environment.nests[colony] for colony in colonies.tolist()])
+    distance = np.sqrt((xs - nests[:, 0]) ** 2 + (ys - nests[:, 1]) ** 2).mean()
+    returned = sum(environment.food_returned.values())
+    return f"{distance:.2f}", f"{carrying:.3f}", returned
+
+
+def main():
+    environment = make_environment()
+
+    rows = []
+    for count in WORKER_COUNTS:
+        positions = starting_positions(environment, count)
+        batch = batch_workers(environment, positions)
+        batched = time_per_call(lambda: batch.step(), TICKS)
+        if count <= MAX_OBJECT_WORKERS:
+            workers = object_workers(environment, positions)
+            objects = time_per_call(lambda: [worker.act(environment.occupancy.full, workers) for worker in workers], TICKS)
+            rows.append([count, f"{objects * 1000:.1f}", f"{batched * 1000:.1f}", f"{objects / batched:.1f}x",
+                         f"{count / batched:,.0f}"])
+        else:
+            rows.append([count, "-", f"{batched * 1000:.1f}", "-", f"{count / batched:,.0f}"])
+    print_table(["workers", "objects ms/tick", "arrays ms/tick", "speedup", "arrays workers/s"], rows)
+
+    print()
+    rows = []
+    positions = starting_positions(environment, 4000, seed=1)
+    for backend in ["objects", "arrays"]:
+        fresh = make_environment(seed=1)
+        rows.append([backend, *behaviour(fresh, positions, 600, backend)])
+    print_table(["backend", "mean nest distance", "share carrying", "food returned"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+ROLES = ("scout", "worker", "attacker")
+
+
+# live ants of each colony grouped by role, updated on spawn, death and role change
+class ColonyRegistry:
+    def __init__(self, colonies=(1, 2)):
+        self.colonies = tuple(colonies)
+        # ants keyed by their store id in the order they joined each (colony, role) group
+        self.members = {(colony, role): {} for colony in self.colonies for role in ROLES}
+        self.colony_sizes = {colony: 0 for colony in self.colonies}
+
+    def add(self, ant):
+        self.members[(ant.colony, ant.role)][ant.id] = ant
+        self.colony_sizes[ant.colony] += 1
+
+    def remove(self, ant):
+        del self.members[(ant.colony, ant.role)][ant.id]
+        self.colony_sizes[ant.colony] -= 1
+
+    def count(self, colony, role=None):
+        if role is None:
+            return self.colony_sizes[colony]
+        return len(self.members[(colony, role)])
+
+    # longest serving ant of a colony and role
+    def first(self, colony, role):
+        return next(iter(self.members[(colony, role)].values()), None)
+
+    # counts in the format shown on the display
+    def counts(self):
+        return {
+            colony: {
+                "scouts": self.count(colony, "scout"),
+                "workers": self.count(colony, "worker"),
+                "attackers": self.count(colony, "attacker"),
+            }
+            for colony in self.colonies
+        }
@@ -0,0 +1,166 @@
+# command line entry point for running simulations without a window
+# python -m colonyclash run --ticks 5000 --seed 1
+import argparse
+import json
+
+
+# settings from a --config json file, None when not given
+def load_config(path):
+    if path is None:
+        return None
+    from config import SimulationConfig
+
+    with open(path) as file:
+        return SimulationConfig.from_dict(json.load(file))
+
+
+def run_command(args):
+    from headless import run_headless
+
+    summary = run_headless(
+        max_ticks=args.ticks,
+        seed=args.seed,
+        width=args.width,
+        height=args.height,
+        worker_backend=args.workers,
+        quiet=not args.verbose,
+        config=load_config(args.config),
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+        event_log=args.events,
+        keyframe_every=args.keyframe_every,
+        log_level=args.log_level,
+        log_path=args.log_file,
+        profile_path=args.profile,
+        metrics_port=args.metrics_port,
+    )
+    print(json.dumps(summary))
+
+
+def replay_command(args):
+    from replay import view
+
+    view(args.log, start=args.start, speed=args.speed)
+
+
+def tournament_command(args):
+    import sys
+
+    from tournament import run_tournament
+
+    seeds = list(range(args.first_seed, args.first_seed + args.matches))
+    finished = []
+
+    def progress(result):
+        finished.append(result)
+        print(f"seed {result['seed']}: {result['winner'] or 'unfinished'} after {result['ticks']} ticks",
+              file=sys.stderr)
+
+    summary = run_tournament(
+        seeds,
+        args.out,
+        jobs=args.jobs,
+        max_ticks=args.ticks,
+        width=args.width,
+        height=args.height,
+        worker_backend=args.workers,
+        on_result=progress,
+        config=load_config(args.config),
+    )
+    print(json.dumps(summary))
+
+
+def sweep_command(args):
+    import sys
+
+    from sweep import load_space, run_sweep, sample_points
+
+    points = sample_points(load_space(args.space), args.mode, args.samples, args.sample_seed)
+    seeds = list(range(args.first_seed, args.first_seed + args.seeds))
+    print(f"{len(points)} configs x {len(seeds)} seeds", file=sys.stderr)
+
+    def progress(result):
+        print(f"config {result['config_hash']} seed {result['seed']}: {result['winner'] or 'unfinished'} "
+              f"after {result['ticks']} ticks", file=sys.stderr)
+
+    summaries = run_sweep(
+        points,
+        seeds,
+        args.cache,
+        jobs=args.jobs,
+        max_ticks=args.ticks,
+        worker_backend=args.workers,
+        base_config=load_config(args.config),
+        on_result=progress,
+    )
+    for summary in summaries:
+        print(json.dumps(summary))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="colonyclash", description="Ant colony simulation tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run one game headless and print a JSON summary")
+    run.add_argument("--ticks", type=int, default=50000, help="stop after this many ticks if nobody has won")
+    run.add_argument("--seed", type=int, default=None)
+    run.add_argument("--width", type=int, default=None, help="defaults to the config width")
+    run.add_argument("--height", type=int, default=None, help="defaults to the config height")
+    run.add_argument("--workers", choices=["objects", "arrays"], default="objects", help="worker ant backend")
+    run.add_argument("--verbose", action="store_true", help="show the ants messages on stderr")
+    run.add_argument("--log-level", choices=["trace", "debug", "info", "warning"], default="info",
+                     help="lowest message level shown or written")
+    run.add_argument("--log-file", default=None, help="write messages to this file")
+    run.add_argument("--profile", default=None, help="write per phase tick timings to this JSON file")
+    run.add_argument("--metrics-port", type=int, default=None,
+                     help="serve tick timings on localhost, /metrics for prometheus and /metrics.json")
+    run.add_argument("--config", default=None, help="JSON file of config settings")
+    run.add_argument("--checkpoint", default=None, help="snapshot file for checkpoints")
+    run.add_argument("--checkpoint-every", type=int, default=None, help="ticks between checkpoints")
+    run.add_argument("--resume", action="store_true", help="carry on from the checkpoint file if there is one")
+    run.add_argument("--events", default=None, help="write an event log for the replay command")
+    run.add_argument("--keyframe-every", type=int, default=500, help="ticks between event log keyframes")
+    run.set_defaults(handler=run_command)
+
+    tournament = commands.add_parser("tournament", help="run many seeded games across all cores")
+    tournament.add_argument("--matches", type=int, default=100)
+    tournament.add_argument("--first-seed", type=int, default=0)
+    tournament.add_argument("--out", default="tournament.jsonl", help="results file, .jsonl or .csv, resumed if it exists")
+    tournament.add_argument("--jobs", type=int, default=None, help="worker processes, defaults to every core")
+    tournament.add_argument("--ticks", type=int, default=50000, help="per game tick limit")
+    tournament.add_argument("--width", type=int, default=None, help="defaults to the config width")
+    tournament.add_argument("--height", type=int, default=None, help="defaults to the config height")
+    tournament.add_argument("--workers", choices=["objects", "arrays"], default="objects", help="worker ant backend")
+    tournament.add_argument("--config", default=None, help="JSON file of config settings")
+    tournament.set_defaults(handler=tournament_command)
+
+    sweep = commands.add_parser("sweep", help="play seeded games over a space of config settings")
+    sweep.add_argument("--space", required=True, help="JSON file mapping settings to value lists or low/high/steps ranges")
+    sweep.add_argument("--mode", choices=["grid", "random", "lhs"], default="grid", help="how configs are picked")
+    sweep.add_argument("--samples", type=int, default=20, help="configs to try for random and lhs sweeps")
+    sweep.add_argument("--sample-seed", type=int, default=None, help="seed for picking random and lhs configs")
+    sweep.add_argument("--seeds", type=int, default=10, help="games per config")
+    sweep.add_argument("--first-seed", type=int, default=0)
+    sweep.add_argument("--cache", default="sweep.jsonl", help="jsonl file of finished games, reused between sweeps")
+    sweep.add_argument("--jobs", type=int, default=None, help="worker processes, defaults to every core")
+    sweep.add_argument("--ticks", type=int, default=50000, help="per game tick limit")
+    sweep.add_argument("--workers", choices=["objects", "arrays"], default="objects", help="worker ant backend")
+    sweep.add_argument("--config", default=None, help="JSON file of settings the sweep starts from")
+    sweep.set_defaults(handler=sweep_command)
+
+    replay = commands.add_parser("replay", help="watch a game from its event log")
+    replay.add_argument("log", help="event log written by run --events")
+    replay.add_argument("--start", type=int, default=0, help="tick to start from")
+    replay.add_argument("--speed", type=float, default=60.0, help="ticks per second")
+    replay.set_defaults(handler=replay_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
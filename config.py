@@ -0,0 +1,128 @@
+import hashlib
+import json
+import math
+from dataclasses import asdict, dataclass, fields, replace
+
+from pheromone_decay import DECAY_MODELS
+
+
+# smallest and largest value of each setting, None for no upper bound, the upper bounds are what
+# the typed arrays holding them can store: grid.timeleft is int16, the worker batches
+# recent_head is int8 and steps_since_last_move int16, pheromone is uint8
+LIMITS = {
+    "width": (1, None),
+    "height": (1, None),
+    "num_food": (0, None),
+    "num_hazards": (0, None),
+    "colony_size": (1, None),
+    "regen_rate": (0, 1),
+    "pheromone_timeleft": (1, 32767),
+    "pheromone_decay_rate": (0, 1),
+    "pheromone_spread": (0, 1),
+    "scout_pheromone_amount": (0, 255),
+    "worker_timeout_limit": (0, None),
+    "worker_memory_limit": (0, 127),
+    "attack_radius": (0, None),
+    "ants_per_cell": (0, None),
+    "follow_distance": (0, None),
+    "spawn_food_cost": (1, None),
+    "scout_move_delay": (0, 32766),
+    "attacker_move_delay": (0, 32766),
+    "worker_move_delay": (0, 32766),
+}
+# settings that may be fractional, every other setting must be a whole number
+FLOAT_SETTINGS = {"regen_rate", "pheromone_decay_rate", "pheromone_spread", "attack_radius", "follow_distance"}
+# cells kept clear of hazards on each side of a nest
+SAFE_ZONE_RADIUS = 3
+
+
+# nest cell of each colony on a width by height grid
+def nest_positions(width, height):
+    return {1: (width // 4, height // 4), 2: (3 * width // 4, 3 * height // 4)}
+
+
+# cells within radius of a nest, wrapping at the grid edges
+def safe_zone(width, height, radius=SAFE_ZONE_RADIUS):
+    cells = set()
+    for nest_x, nest_y in nest_positions(width, height).values():
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                cells.add(((nest_x + dx) % width, (nest_y + dy) % height))
+    return cells
+
+
+# tuning knobs for the environment and the ants, defaults match the original game
+@dataclass(frozen=True)
+class SimulationConfig:
+    width: int = 75
+    height: int = 75
+    # food and hazards placed at the start
+    num_food: int = 15
+    num_hazards: int = 500
+    # ants each colony starts with, the first five are the original scout, workers and attacker,
+    # the rest are spread around the nest three workers to each scout and attacker
+    colony_size: int = 5
+    # chance per tick of food regrowing on each empty cell
+    regen_rate: float = 0.0000005
+    # how long pheromone cells last and how much a scout lays per step
+    pheromone_timeleft: int = 1050
+    scout_pheromone_amount: int = 20
+    # how pheromones fade, one of pheromone_decay.DECAY_MODELS, the rate is the share lost each
+    # tick by evaporation and diffusion, the spread the share diffusion passes to the neighbours
+    pheromone_decay: str = "timeout"
+    pheromone_decay_rate: float = 0.02
+    pheromone_spread: float = 0.1
+    # ticks before a worker gives up and heads home, and how many cells it remembers
+    worker_timeout_limit: int = 500
+    worker_memory_limit: int = 5
+    attack_radius: float = 2
+    # most ants one cell holds outside the nests, 0 lets any number share a cell
+    ants_per_cell: int = 1
+    follow_distance: float = 5
+    # food a colony must return to spawn a new ant
+    spawn_food_cost: int = 6
+    # ticks each role waits between moves
+    scout_move_delay: int = 3
+    attacker_move_delay: int = 3
+    worker_move_delay: int = 5
+
+    # settings out of range fail here rather than partway through a game or a sweep
+    def __post_init__(self):
+        if self.pheromone_decay not in DECAY_MODELS:
+            raise ValueError(f"pheromone_decay must be one of {', '.join(DECAY_MODELS)}, got {self.pheromone_decay}")
+        for name, (low, high) in LIMITS.items():
+            value = getattr(self, name)
+            if name in FLOAT_SETTINGS:
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                    raise ValueError(f"{name} must be a finite number, got {value}")
+            elif isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"{name} must be a whole number, got {value}")
+            if value < low or (high is not None and value > high):
+                allowed = f"at least {low}" if high is None else f"between {low} and {high}"
+                raise ValueError(f"{name} must be {allowed}, got {value}")
+        # hazards are placed on distinct cells outside the nest safe zones, food on any cells
+        open_cells = self.width * self.height - len(safe_zone(self.width, self.height))
+        for name in ("num_hazards", "num_food"):
+            if getattr(self, name) > open_cells:
+                raise ValueError(f"{name} must be at most {open_cells} on a {self.width}x{self.height} grid, "
+                                 f"got {getattr(self, name)}")
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values):
+        known = {field.name for field in fields(cls)}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"unknown config settings: {', '.join(sorted(unknown))}")
+        return cls(**values)
+
+    # copy with some settings changed
+    def with_changes(self, **changes):
+        return replace(self, **changes)
+
+    # short stable hash of every setting, used to cache results
+    def config_hash(self):
+        encoded = json.dumps(self.to_dict(), sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
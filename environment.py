@@ -1,131 +1,164 @@
 import random
 
+import numpy as np
+
+from config import SAFE_ZONE_RADIUS, SimulationConfig, nest_positions, safe_zone
+from food_regeneration import FoodRegenerator
+from grid import Grid
+from occupancy import Occupancy
+from pathfinding import Pathfinder
+from pheromone_decay import decay_model_for
+from telemetry import DEBUG, TRACE, Telemetry
+from trail_index import TrailIndex
+
+
 class Environment:
-    def __init__(self, width=50, height=50):
+    def __init__(self, width=50, height=50, pheromone_decay=None, regen_seed=None, config=None, rng=None):
         self.width = width
         self.height = height
+        # random stream for placing the starting food and hazards
+        self.rng = rng or random.Random()
+        # tuning knobs shared with the ants
+        self.config = config or SimulationConfig(width=width, height=height)
 
-        # creates 2D list of dictionaries, keeps track of both colonies pheromone trails
-        self.grid = [
-            [{"food": 0, "hazard": False, "pheromone": {1: 0, 2: 0}} for _ in range(width)]
-            for _ in range(height)
-        ]
+        # array backed grid, keeps track of both colonies pheromone trails
+        self.grid = Grid(width, height, num_colonies=2)
         # sets nets position
-        self.nests = {1: (width // 4, height // 4), 2: (3 * width // 4, 3 * height // 4)}
-        # sets each colonies pheromone trails
-        self.pheromone_trails = {1: {}, 2: {}}
+        self.nests = nest_positions(width, height)
+        # ants standing on each cell, any number may share a nest
+        self.occupancy = Occupancy(width, height, self.config.ants_per_cell, self.nests.values())
+        # links food locations and the pheromone trail cells leading to them
+        self.trail_index = TrailIndex()
+        # pheromone trail cells keyed by the food location they lead to
+        self.pheromone_trails = self.trail_index.trails
         # for keeping track of food for both colonies
         self.food_returned = {1: 0, 2: 0}
+        # how pheromones fade each tick, defaults to the model the config picks
+        self.pheromone_decay = pheromone_decay or decay_model_for(self.config)
+        # live set of cells holding food, and the hazard cells as a frozenset that add_hazards
+        # replaces, so ants can be handed it without being able to change it
+        self.food_locations = set()
+        self.hazard_locations = frozenset()
+        # spawns food back onto empty cells over time
+        self.food_regenerator = FoodRegenerator(regen_rate=self.config.regen_rate, seed=regen_seed)
+        # goes up whenever the hazard layout changes so cached paths can be dropped
+        self.hazard_version = 0
+        # shared path finding, routes to food and distances to each nest
+        self.paths = Pathfinder(self)
+        # event recorder of the running simulation, None when not recording
+        self.events = None
+        # messages and counters, the simulation swaps in its own
+        self.telemetry = Telemetry()
 
     # spawns 15 food randomly across the grid
-    def spawn_food(self, num_food=15):
+    def spawn_food(self, num_food=None):
+        if num_food is None:
+            num_food = self.config.num_food
         for _ in range(num_food):
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
+            x = self.rng.randint(0, self.width - 1)
+            y = self.rng.randint(0, self.height - 1)
             # sets random food amount to cell
-            self.grid[y][x]["food"] = random.randint(2, 5)
+            self.set_food(x, y, self.rng.randint(2, 5))
 
     # small change to regen food not on hazard locations
-    def regenerate_food(self, regen_rate=0.0000005):
-        import random
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x]["food"] == 0 and not self.grid[y][x]["hazard"]:
-                    if random.random() < regen_rate:
-                        self.grid[y][x]["food"] = random.randint(2, 5)
+    def regenerate_food(self, regen_rate=None):
+        return self.food_regenerator.step(self, regen_rate)
+
+    # number of empty cells food could regrow on
+    def free_cell_count(self):
+        food_on_hazards = sum(1 for location in self.food_locations if location in self.hazard_locations)
+        return self.width * self.height - len(self.hazard_locations) - (len(self.food_locations) - food_on_hazards)
+
+    # sets a cells food amount keeping the food index up to date
+    def set_food(self, x, y, amount):
+        self.grid.food[y, x] = amount
+        if amount > 0:
+            self.food_locations.add((x, y))
+        else:
+            self.food_locations.discard((x, y))
 
     # removed food when collected also removes pheromone trail
     def collect_food(self, x, y):
         if self.is_food(x, y):
-            self.grid[y][x]["food"] -= 1
-            if self.grid[y][x]["food"] <= 0:
-                self.grid[y][x]["food"] = 0
+            self.grid.food[y, x] -= 1
+            if self.grid.food[y, x] <= 0:
+                self.set_food(x, y, 0)
                 food_location = (x, y)
-                if food_location in self.pheromone_trails:
-                    print(f"clearing pheromone trail at location: {food_location}")
-                    for trail_x, trail_y in self.pheromone_trails[food_location]:
-                        # checks if its overlap
-                        is_part_of_other_trail = any(
-                            (trail_x, trail_y) in trail
-                            for other_food, trail in self.pheromone_trails.items()
-                            if other_food != food_location
-                        )
-                        # clears trail where cells don't overlap
-                        if not is_part_of_other_trail:
-                            print(f"clearing pheromones at: ({trail_x}, {trail_y})")
-                            if isinstance(self.grid[trail_y][trail_x]["pheromone"], dict):
-                                self.grid[trail_y][trail_x]["pheromone"] = {1: 0, 2: 0}
-
-                            # removes food location from pheromones trails
-                            if food_location in self.pheromone_trails:
-                                del self.pheromone_trails[food_location]
-                            else:
-                                print(f" trail at  {food_location} deleted already")
+                if food_location in self.trail_index:
+                    # only clears cells no other trail still uses
+                    cleared = self.trail_index.release(food_location)
+                    self.telemetry.log(DEBUG, "trail.clear", "clearing pheromone trail at location: {}, {} cells",
+                                       food_location, len(cleared))
+                    self.telemetry.count("trail.cells_cleared", len(cleared))
+                    trace = self.telemetry.enabled(TRACE)
+                    for trail_x, trail_y in cleared:
+                        if trace:
+                            self.telemetry.log(TRACE, "trail.clear_cell", "clearing pheromones at: ({}, {})",
+                                               trail_x, trail_y)
+                        self.grid.pheromone[:, trail_y, trail_x] = 0
                 else:
-                    print(f"no trail found at this point: {food_location}")
+                    self.telemetry.log(DEBUG, "trail.missing", "no trail found at this point: {}", food_location)
 
     # checks if cell contains food
     def is_food(self, x, y):
-        return self.grid[y][x]["food"] > 0
+        return self.grid.food[y, x] > 0
 
     # adds 500 hazards doesn't spawn them around the nest
-    def add_hazards(self, num_hazards=500, safe_zone_radius=3):
-
-        # calculates the safe zone around the nest
-        safe_zones = set()
-        for nest_x, nest_y in self.nests.values():
-            for dx in range(-safe_zone_radius, safe_zone_radius + 1):
-                for dy in range(-safe_zone_radius, safe_zone_radius + 1):
-                    # adds safe coords to safe_zone
-                    safe_zones.add(((nest_x + dx) % self.width, (nest_y + dy) % self.height))
-
-        # adds in hazards avoiding safe zone and other hazard cells
-        for _ in range(num_hazards):
-            while True:
-                x = random.randint(0, self.width - 1)
-                y = random.randint(0, self.height - 1)
-                if (x, y) not in safe_zones and not self.grid[y][x].get("hazard"):
-                    self.grid[y][x]["hazard"] = True
-                    break
+    def add_hazards(self, num_hazards=None, safe_zone_radius=SAFE_ZONE_RADIUS):
+        if num_hazards is None:
+            num_hazards = self.config.num_hazards
+
+        # cell indexes hazards may not go on, the safe zone around the nests and existing hazards
+        blocked = {y * self.width + x for x, y in safe_zone(self.width, self.height, safe_zone_radius)}
+        blocked.update(y * self.width + x for x, y in self.hazard_locations)
+        blocked = np.array(sorted(blocked), dtype=np.int64)
+        free = self.width * self.height - len(blocked)
+        if num_hazards > free:
+            raise ValueError(f"cannot place {num_hazards} hazards, only {free} free cells")
+
+        # picks distinct free cells by their rank among the free cells, then maps each rank to its
+        # cell index by counting the blocked cells before it
+        ranks = np.array(self.rng.sample(range(free), num_hazards), dtype=np.int64)
+        cells = ranks + np.searchsorted(blocked - np.arange(len(blocked)), ranks, side="right")
+        ys, xs = np.divmod(cells, self.width)
+        self.grid.hazard[ys, xs] = True
+        self.hazard_locations = self.hazard_locations.union(zip(xs.tolist(), ys.tolist()))
+        self.hazard_version += 1
+
+    # closest food to a point measured in grid steps, the grid wraps at the edges
+    def nearest_food(self, x, y):
+        def wrapped_distance(location):
+            dx = abs(location[0] - x)
+            dy = abs(location[1] - y)
+            return min(dx, self.width - dx) + min(dy, self.height - dy)
+
+        if not self.food_locations:
+            return None
+        return min(self.food_locations, key=lambda location: (wrapped_distance(location), location[1], location[0]))
 
     # adds pheromones to grid taking in colony and tracks by food location, sets
-    def add_pheromone(self, x, y, colony, amount=50, food_location=None, timeleft=1050):
-
-        # accesses cell
-        cell = self.grid[y][x]
-
-        # initializes pheromone value for the colony if is doesn't already have one
-        if colony not in cell["pheromone"]:
-            cell["pheromone"][colony] = 0
+    def add_pheromone(self, x, y, colony, amount=50, food_location=None, timeleft=None):
+        if timeleft is None:
+            timeleft = self.config.pheromone_timeleft
 
         # adds pheromone value, capping value at 255
-        cell["pheromone"][colony] += amount
-        cell["pheromone"][colony] = min(cell["pheromone"][colony], 255)
+        layer = self.grid.pheromone[colony - 1]
+        layer[y, x] = min(int(layer[y, x]) + amount, 255)
 
         # connects the trail to the food location
         if food_location:
-            if food_location not in self.pheromone_trails:
-                self.pheromone_trails[food_location] = set()
-            self.pheromone_trails[food_location].add((x, y))
+            self.trail_index.add(food_location, (x, y))
 
         # updates time left for each cell
-        if "timeleft" not in cell or cell["timeleft"] < timeleft:
-            cell["timeleft"] = timeleft
+        if self.grid.timeleft[y, x] < timeleft:
+            self.grid.timeleft[y, x] = timeleft
 
     # reduces time left for pheromone trail cells
     def update_pheromone_timeleft(self):
-        for y, row in enumerate(self.grid):
-            for x, cell in enumerate(row):
-                if "timeleft" in cell and cell["timeleft"] > 0:
-                    cell["timeleft"] -= 1
-                    if cell["timeleft"] == 0:
-                        cell["pheromone"] = {1: 0, 2: 0}
-
-                        # deletes trail section
-                        if (x, y) in self.pheromone_trails:
-                            for food_location, trail in self.pheromone_trails.items():
-                                if (x, y) in trail:
-                                    trail.remove((x, y))
-
-                            # removes empty trails from dictionary
-                            self.pheromone_trails = {k: v for k, v in self.pheromone_trails.items() if v}
+        expired = self.pheromone_decay.step(self.grid)
+        if not self.trail_index or not expired.any():
+            return
+
+        # deletes expired trail sections
+        expired_ys, expired_xs = np.divmod(np.flatnonzero(expired), self.width)
+        self.trail_index.discard_cells(zip(expired_xs.tolist(), expired_ys.tolist()))
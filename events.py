@@ -0,0 +1,294 @@
+import bisect
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from colony_registry import ROLES
+
+# file layout: magic, format version and a json header, then blocks of one tick of events
+# or one keyframe, each block starts with its kind, tick and payload length
+MAGIC = b"COLONYEV"
+FORMAT_VERSION = 1
+FILE_START = struct.Struct("<8sII")
+BLOCK = struct.Struct("<BII")
+TICK_BLOCK = 1
+KEYFRAME_BLOCK = 2
+
+# event records inside a tick block, a type byte then the fields
+MOVE = 1
+PLACE = 2
+SPAWN = 3
+ROLE = 4
+DEATH = 5
+KILL = 6
+PICKUP = 7
+DROP = 8
+FOOD = 9
+PHEROMONE = 10
+RETURNED = 11
+RECORDS = {
+    # ant id and wrapped step, most moves are one cell
+    MOVE: struct.Struct("<Ibb"),
+    # ant id and cell, for jumps a step can't hold
+    PLACE: struct.Struct("<IHH"),
+    # ant id, role, colony and cell
+    SPAWN: struct.Struct("<IBBHH"),
+    # ant id and its new role
+    ROLE: struct.Struct("<IB"),
+    DEATH: struct.Struct("<I"),
+    # attacker id and victim id
+    KILL: struct.Struct("<II"),
+    # ant id, food picked up or dropped at the ants cell
+    PICKUP: struct.Struct("<I"),
+    DROP: struct.Struct("<I"),
+    # flat cell index and new food amount
+    FOOD: struct.Struct("<Ib"),
+    # flat index over both pheromone layers and new strength
+    PHEROMONE: struct.Struct("<IB"),
+    # colony and its new food returned count
+    RETURNED: struct.Struct("<BI"),
+}
+# one row per ant in a keyframe
+ANT_ROW = np.dtype([("id", "<u4"), ("role", "u1"), ("colony", "u1"), ("x", "<u2"), ("y", "<u2"), ("carrying", "u1")])
+
+
+# what a replay needs of an ant
+def ant_record(ant):
+    return ROLES.index(ant.role), ant.colony, ant.x, ant.y, bool(getattr(ant, "carrying_food", False))
+
+
+# writes a tick by tick event log of a running simulation, ant and grid changes are found by
+# comparing against the previous tick so the ants themselves only report kills
+class EventRecorder:
+    def __init__(self, path, simulation, keyframe_every=500):
+        self.file = open(path, "wb")
+        self.keyframe_every = keyframe_every
+        environment = simulation.environment
+        self.width = environment.width
+        self.height = environment.height
+        header = json.dumps({
+            "width": self.width,
+            "height": self.height,
+            "nests": {colony: list(nest) for colony, nest in environment.nests.items()},
+            "config": simulation.config.to_dict(),
+            "seed": simulation.seed,
+            "keyframe_every": keyframe_every,
+        }).encode()
+        self.file.write(FILE_START.pack(MAGIC, FORMAT_VERSION, len(header)))
+        self.file.write(header)
+
+        # kills reported by attackers during the current tick
+        self.pending = bytearray()
+        self.food = environment.grid.food.copy()
+        self.pheromone = environment.grid.pheromone.copy()
+        self.food_returned = dict(environment.food_returned)
+        self.ants = {ant.id: ant_record(ant) for ant in simulation.agents if ant.alive}
+        self.write_keyframe(simulation)
+
+    def kill(self, attacker, victim):
+        self.pending += bytes([KILL]) + RECORDS[KILL].pack(attacker.id, victim.id)
+
+    # records what changed during the tick that just ended
+    def end_tick(self, simulation):
+        payload = self.pending
+        self.pending = bytearray()
+        width = self.width
+        height = self.height
+
+        current = {}
+        for ant in simulation.agents:
+            if ant.alive:
+                current[ant.id] = ant_record(ant)
+        for ant_id, (role, colony, x, y, carrying) in current.items():
+            before = self.ants.get(ant_id)
+            if before is None:
+                payload += bytes([SPAWN]) + RECORDS[SPAWN].pack(ant_id, role, colony, x, y)
+                continue
+            if before[0] != role:
+                payload += bytes([ROLE]) + RECORDS[ROLE].pack(ant_id, role)
+            if (before[2], before[3]) != (x, y):
+                # shortest step allowing for the grid wrapping
+                dx = (x - before[2] + width // 2) % width - width // 2
+                dy = (y - before[3] + height // 2) % height - height // 2
+                if -128 <= dx <= 127 and -128 <= dy <= 127:
+                    payload += bytes([MOVE]) + RECORDS[MOVE].pack(ant_id, dx, dy)
+                else:
+                    payload += bytes([PLACE]) + RECORDS[PLACE].pack(ant_id, x, y)
+            if carrying != before[4]:
+                kind = PICKUP if carrying else DROP
+                payload += bytes([kind]) + RECORDS[kind].pack(ant_id)
+        for ant_id in self.ants.keys() - current.keys():
+            payload += bytes([DEATH]) + RECORDS[DEATH].pack(ant_id)
+        self.ants = current
+
+        grid = simulation.environment.grid
+        for index in np.flatnonzero(grid.food != self.food).tolist():
+            payload += bytes([FOOD]) + RECORDS[FOOD].pack(index, int(grid.food.flat[index]))
+        for index in np.flatnonzero(grid.pheromone != self.pheromone).tolist():
+            payload += bytes([PHEROMONE]) + RECORDS[PHEROMONE].pack(index, int(grid.pheromone.flat[index]))
+        np.copyto(self.food, grid.food)
+        np.copyto(self.pheromone, grid.pheromone)
+
+        for colony, amount in simulation.environment.food_returned.items():
+            if self.food_returned.get(colony) != amount:
+                payload += bytes([RETURNED]) + RECORDS[RETURNED].pack(colony, amount)
+                self.food_returned[colony] = amount
+
+        self.file.write(BLOCK.pack(TICK_BLOCK, simulation.tick, len(payload)))
+        self.file.write(payload)
+        if self.keyframe_every and simulation.tick % self.keyframe_every == 0:
+            self.write_keyframe(simulation)
+
+    # full replay state so viewers can start here without reading from the start
+    def write_keyframe(self, simulation):
+        rows = np.array(
+            [(ant_id, *record) for ant_id, record in self.ants.items()],
+            dtype=ANT_ROW,
+        )
+        grid = simulation.environment.grid
+        payload = zlib.compress(b"".join([
+            struct.pack("<III", len(rows), self.food_returned.get(1, 0), self.food_returned.get(2, 0)),
+            rows.tobytes(),
+            grid.food.tobytes(),
+            grid.pheromone.tobytes(),
+            grid.hazard.tobytes(),
+        ]))
+        self.file.write(BLOCK.pack(KEYFRAME_BLOCK, simulation.tick, len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# world as the replay sees it at one tick
+class ReplayState:
+    def __init__(self, header, tick, payload):
+        self.tick = tick
+        self.width = header["width"]
+        self.height = header["height"]
+        self.nests = {int(colony): tuple(nest) for colony, nest in header["nests"].items()}
+        cells = self.width * self.height
+
+        data = zlib.decompress(payload)
+        count, returned_1, returned_2 = struct.unpack_from("<III", data)
+        offset = 12
+        rows = np.frombuffer(data, ANT_ROW, count, offset)
+        offset += rows.nbytes
+        self.food = np.frombuffer(data, np.int8, cells, offset).reshape(self.height, self.width).copy()
+        offset += cells
+        self.pheromone = np.frombuffer(data, np.uint8, 2 * cells, offset).reshape(2, self.height, self.width).copy()
+        offset += 2 * cells
+        self.hazard = np.frombuffer(data, bool, cells, offset).reshape(self.height, self.width).copy()
+        self.food_returned = {1: returned_1, 2: returned_2}
+        # ant id -> [role, colony, x, y, carrying]
+        self.ants = {int(row["id"]): [int(row["role"]), int(row["colony"]), int(row["x"]), int(row["y"]),
+                                      bool(row["carrying"])]
+                     for row in rows}
+        self.kills = []
+
+    # moves the state on by one tick block
+    def apply(self, tick, payload):
+        self.tick = tick
+        self.kills = []
+        offset = 0
+        end = len(payload)
+        while offset < end:
+            kind = payload[offset]
+            record = RECORDS[kind]
+            fields = record.unpack_from(payload, offset + 1)
+            offset += 1 + record.size
+            if kind == MOVE:
+                ant = self.ants[fields[0]]
+                ant[2] = (ant[2] + fields[1]) % self.width
+                ant[3] = (ant[3] + fields[2]) % self.height
+            elif kind == PLACE:
+                ant = self.ants[fields[0]]
+                ant[2], ant[3] = fields[1], fields[2]
+            elif kind == SPAWN:
+                ant_id, role, colony, x, y = fields
+                self.ants[ant_id] = [role, colony, x, y, False]
+            elif kind == ROLE:
+                self.ants[fields[0]][0] = fields[1]
+            elif kind == DEATH:
+                del self.ants[fields[0]]
+            elif kind == KILL:
+                self.kills.append(fields)
+            elif kind == PICKUP:
+                self.ants[fields[0]][4] = True
+            elif kind == DROP:
+                self.ants[fields[0]][4] = False
+            elif kind == FOOD:
+                self.food.flat[fields[0]] = fields[1]
+            elif kind == PHEROMONE:
+                self.pheromone.flat[fields[0]] = fields[1]
+            elif kind == RETURNED:
+                self.food_returned[fields[0]] = fields[1]
+
+    # ants as (role, x, y) for drawing
+    def ant_positions(self):
+        return [(ROLES[role], x, y) for role, _, x, y, _ in self.ants.values()]
+
+    # counts in the format shown on the display
+    def counts(self):
+        counts = {colony: {"scouts": 0, "workers": 0, "attackers": 0} for colony in self.nests}
+        names = {"scout": "scouts", "worker": "workers", "attacker": "attackers"}
+        for role, colony, _, _, _ in self.ants.values():
+            counts[colony][names[ROLES[role]]] += 1
+        return counts
+
+
+# reads an event log, any tick can be rebuilt from the keyframe before it
+class EventLog:
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.data = file.read()
+        magic, version, header_length = FILE_START.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an event log")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"event log format version {version} is not supported, expected {FORMAT_VERSION}")
+        offset = FILE_START.size
+        self.header = json.loads(self.data[offset:offset + header_length])
+        offset += header_length
+
+        # where each tick and keyframe starts, a cut off last block is ignored
+        self.ticks = {}
+        self.keyframe_ticks = []
+        self.keyframes = []
+        while offset + BLOCK.size <= len(self.data):
+            kind, tick, length = BLOCK.unpack_from(self.data, offset)
+            start = offset + BLOCK.size
+            if start + length > len(self.data):
+                break
+            if kind == TICK_BLOCK:
+                self.ticks[tick] = (start, length)
+            else:
+                self.keyframe_ticks.append(tick)
+                self.keyframes.append((start, length))
+            offset = start + length
+        if not self.keyframes:
+            raise ValueError(f"{path} has no keyframes")
+        self.first_tick = self.keyframe_ticks[0]
+        self.last_tick = max(self.ticks, default=self.first_tick)
+
+    def block(self, start, length):
+        return self.data[start:start + length]
+
+    # replay state at the end of a tick
+    def state_at(self, tick):
+        tick = max(self.first_tick, min(tick, self.last_tick))
+        position = bisect.bisect_right(self.keyframe_ticks, tick) - 1
+        state = ReplayState(self.header, self.keyframe_ticks[position], self.block(*self.keyframes[position]))
+        self.advance(state, tick)
+        return state
+
+    # moves a state forward to a later tick
+    def advance(self, state, tick):
+        for next_tick in range(state.tick + 1, min(tick, self.last_tick) + 1):
+            if next_tick in self.ticks:
+                state.apply(next_tick, self.block(*self.ticks[next_tick]))
+        state.tick = max(state.tick, min(tick, self.last_tick))
+        return state
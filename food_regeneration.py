@@ -0,0 +1,50 @@
+import numpy as np
+
+
+# respawns food on empty cells, each free cell has a regen_rate chance per tick
+class FoodRegenerator:
+    def __init__(self, regen_rate=0.0000005, seed=None):
+        self.regen_rate = regen_rate
+        # own random stream so runs can be reproduced from a seed
+        self.rng = np.random.default_rng(seed)
+
+    # spawns food for one tick, returns the cells that got food
+    def step(self, environment, regen_rate=None):
+        rate = self.regen_rate if regen_rate is None else regen_rate
+        free_cells = environment.free_cell_count()
+        if free_cells <= 0 or rate <= 0:
+            return []
+
+        # one draw gives how many of the free cells spawn food this tick
+        spawns = int(self.rng.binomial(free_cells, min(rate, 1.0)))
+        if spawns == 0:
+            return []
+
+        cells = self.pick_free_cells(environment, spawns, free_cells)
+        amounts = self.rng.integers(2, 6, size=len(cells))
+        for (x, y), amount in zip(cells, amounts.tolist()):
+            environment.set_food(x, y, amount)
+        return cells
+
+    # picks distinct empty non hazard cells uniformly at random
+    def pick_free_cells(self, environment, count, free_cells):
+        width = environment.width
+        total_cells = width * environment.height
+        food = environment.grid.food
+        hazard = environment.grid.hazard
+
+        # on a mostly empty grid guessing cells is much cheaper than listing free ones
+        if free_cells * 2 >= total_cells:
+            picked = set()
+            while len(picked) < count:
+                for index in self.rng.integers(0, total_cells, size=count - len(picked)).tolist():
+                    y, x = divmod(index, width)
+                    if food[y, x] == 0 and not hazard[y, x]:
+                        picked.add((x, y))
+                        if len(picked) == count:
+                            break
+            return sorted(picked, key=lambda cell: (cell[1], cell[0]))
+
+        free_indexes = np.flatnonzero((food == 0) & ~hazard)
+        chosen = np.sort(self.rng.choice(free_indexes, size=count, replace=False))
+        return [(index % width, index // width) for index in chosen.tolist()]
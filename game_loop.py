@@ -0,0 +1,195 @@
+import threading
+import time
+
+import pygame
+
+from profiler import TickProfiler, draw_profile_overlay
+from renderer import Renderer
+
+# most ticks played between two frames at a fixed tick rate, a machine that cannot keep up
+# plays slower instead of falling further and further behind
+MAX_CATCH_UP_TICKS = 250
+
+
+# draws frames copied from the simulation on its own thread onto an offscreen surface, so a slow
+# frame never holds up the ticks, the main thread copies each finished frame to the window,
+# as only the main thread may touch the window and its events on some platforms
+class RenderThread:
+    def __init__(self, screen, profiler_of):
+        self.renderer = Renderer(pygame.Surface(screen.get_size()))
+        # returns the profiler to draw as an overlay, or None
+        self.profiler_of = profiler_of
+        # the frame waiting to be drawn, and the changed rects of a drawn frame waiting to be shown
+        self.frame = None
+        self.drawn = None
+        self.drawing = False
+        self.ready = threading.Condition()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.draw_loop, name="render", daemon=True)
+        self.thread.start()
+
+    # true from handing over a frame until it has been shown, the offscreen surface is never
+    # drawn on while the main thread copies from it
+    def busy(self):
+        with self.ready:
+            return self.frame is not None or self.drawing or self.drawn is not None
+
+    def submit(self, frame):
+        with self.ready:
+            self.frame = frame
+            self.ready.notify()
+
+    def draw_loop(self):
+        while True:
+            with self.ready:
+                while self.frame is None and not self.stopping:
+                    self.ready.wait()
+                if self.stopping:
+                    return
+                frame, self.frame = self.frame, None
+                self.drawing = True
+            dirty = draw_frame(self.renderer, frame, self.profiler_of())
+            with self.ready:
+                self.drawn = dirty
+                self.drawing = False
+
+    # on the main thread, copies a finished frame to the screen and updates the window
+    def show(self, screen):
+        with self.ready:
+            dirty, self.drawn = self.drawn, None
+        if dirty is None:
+            return
+        for rect in dirty:
+            screen.blit(self.renderer.screen, rect, rect)
+        pygame.display.update(dirty)
+
+    def close(self):
+        with self.ready:
+            self.stopping = True
+            self.ready.notify()
+        self.thread.join()
+
+
+# draws one frame with the profile overlay on top, returns the changed areas
+def draw_frame(renderer, frame, profiler):
+    started = time.perf_counter()
+    dirty = renderer.draw(*frame)
+    if profiler is not None:
+        profiler.record("render", time.perf_counter() - started)
+        overlay = draw_profile_overlay(renderer.screen, profiler, renderer.font(16, "monospace"))
+        # the overlay is drawn over the world, so it is redrawn from scratch next frame
+        renderer.invalidate(overlay)
+        dirty.append(overlay)
+    return dirty
+
+
+# plays the simulation at a fixed tick rate however long frames take to draw, or in fast mode
+# plays as fast as it can and draws after at most ticks_per_frame ticks, sooner when
+# max_frame_time runs out first,
+# space pauses, f switches modes, up and down double or halve the tick rate or ticks per frame,
+# p toggles the profiler overlay
+class GameLoop:
+    def __init__(self, simulation, screen, tick_rate=60.0, fps=60, fast=False, ticks_per_frame=100,
+                 threaded_render=False, max_frame_time=0.1):
+        self.simulation = simulation
+        self.screen = screen
+        self.tick_rate = tick_rate
+        self.fps = fps
+        self.fast = fast
+        self.ticks_per_frame = ticks_per_frame
+        # in fast mode a frame is drawn at least this often in seconds so the window keeps responding
+        self.max_frame_time = max_frame_time
+        self.paused = False
+        self.running = True
+        self.clock = pygame.time.Clock()
+        self.render_thread = RenderThread(screen, lambda: self.simulation.profiler) if threaded_render else None
+        # ticks owed at the fixed tick rate, carried between frames
+        self.owed = 0.0
+        self.last_time = time.perf_counter()
+
+    def run(self):
+        while self.running:
+            self.handle_events()
+            now = time.perf_counter()
+            elapsed, self.last_time = now - self.last_time, now
+            idle = self.paused or self.simulation.game_end()
+            if not idle:
+                if self.fast:
+                    self.play_fast(now)
+                else:
+                    self.play_fixed(elapsed)
+            self.draw()
+            # fast mode only waits for the next frame when there are no ticks to play
+            self.clock.tick(0 if self.fast and not idle else self.fps)
+        if self.render_thread is not None:
+            self.render_thread.close()
+
+    def play_fixed(self, elapsed):
+        self.owed += elapsed * self.tick_rate
+        ticks = int(self.owed)
+        if ticks > MAX_CATCH_UP_TICKS:
+            ticks = MAX_CATCH_UP_TICKS
+            self.owed = 0.0
+        else:
+            self.owed -= ticks
+        self.play(ticks)
+
+    def play_fast(self, started):
+        deadline = started + self.max_frame_time
+        for _ in range(self.ticks_per_frame):
+            if not self.play(1) or time.perf_counter() > deadline:
+                break
+
+    # plays up to ticks ticks, false once a colony has won
+    def play(self, ticks):
+        for _ in range(ticks):
+            self.simulation.update()
+            if self.simulation.game_end():
+                return False
+        return True
+
+    def draw(self):
+        simulation = self.simulation
+        if self.render_thread is None:
+            if simulation.renderer is None:
+                simulation.renderer = Renderer(self.screen)
+            dirty = draw_frame(simulation.renderer, simulation.frame(copy=False), simulation.profiler)
+            pygame.display.update(dirty)
+        else:
+            self.render_thread.show(self.screen)
+            if not self.render_thread.busy():
+                self.render_thread.submit(simulation.frame())
+        pygame.display.set_caption(self.caption())
+
+    def caption(self):
+        if self.paused:
+            speed = "paused"
+        elif self.fast:
+            speed = f"fast, up to {self.ticks_per_frame} ticks/frame"
+        else:
+            speed = f"{self.tick_rate:g} ticks/s"
+        return f"Ant Colony Sim - tick {self.simulation.tick} - {speed}"
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.paused = not self.paused
+                elif event.key == pygame.K_f:
+                    self.fast = not self.fast
+                    self.owed = 0.0
+                elif event.key == pygame.K_UP:
+                    if self.fast:
+                        self.ticks_per_frame *= 2
+                    else:
+                        self.tick_rate *= 2
+                elif event.key == pygame.K_DOWN:
+                    if self.fast:
+                        self.ticks_per_frame = max(self.ticks_per_frame // 2, 1)
+                    else:
+                        self.tick_rate = max(self.tick_rate / 2, 0.25)
+                # p toggles the tick profiler overlay
+                elif event.key == pygame.K_p:
+                    self.simulation.profiler = None if self.simulation.profiler else TickProfiler(window=300)
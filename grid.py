@@ -0,0 +1,120 @@
+import numpy as np
+
+
+# typed array layers for the environment grid, one array per cell attribute
+class Grid:
+    def __init__(self, width, height, num_colonies=2):
+        self.width = width
+        self.height = height
+        self.num_colonies = num_colonies
+
+        # food left in each cell
+        self.food = np.zeros((height, width), dtype=np.int8)
+        # hazard cells ants can't enter
+        self.hazard = np.zeros((height, width), dtype=bool)
+        # one pheromone layer per colony, colony 1 is layer 0
+        self.pheromone = np.zeros((num_colonies, height, width), dtype=np.uint8)
+        # ticks until a cells pheromones are cleared
+        self.timeleft = np.zeros((height, width), dtype=np.int16)
+
+    # lets old code keep using grid[y][x]["food"] style lookups
+    def __getitem__(self, y):
+        return GridRow(self, y)
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield GridRow(self, y)
+
+
+# one row of the grid
+class GridRow:
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.y = y
+
+    def __getitem__(self, x):
+        return GridCell(self.grid, x, self.y)
+
+    def __len__(self):
+        return self.grid.width
+
+    def __iter__(self):
+        for x in range(self.grid.width):
+            yield GridCell(self.grid, x, self.y)
+
+
+# dictionary like view of a single cell, reads and writes go to the arrays
+class GridCell:
+    keys = ("food", "hazard", "pheromone", "timeleft")
+
+    def __init__(self, grid, x, y):
+        self.grid = grid
+        self.x = x
+        self.y = y
+
+    def __getitem__(self, key):
+        if key == "pheromone":
+            return CellPheromone(self.grid, self.x, self.y)
+        if key == "food":
+            return int(self.grid.food[self.y, self.x])
+        if key == "hazard":
+            return bool(self.grid.hazard[self.y, self.x])
+        if key == "timeleft":
+            return int(self.grid.timeleft[self.y, self.x])
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "pheromone":
+            # accepts a {colony: amount} dictionary like the old cells
+            self.grid.pheromone[:, self.y, self.x] = 0
+            for colony, amount in value.items():
+                self.grid.pheromone[colony - 1, self.y, self.x] = min(max(amount, 0), 255)
+        elif key == "food":
+            self.grid.food[self.y, self.x] = value
+        elif key == "hazard":
+            self.grid.hazard[self.y, self.x] = value
+        elif key == "timeleft":
+            self.grid.timeleft[self.y, self.x] = value
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def get(self, key, default=None):
+        if key in self.keys:
+            return self[key]
+        return default
+
+
+# view of one cells pheromone values keyed by colony
+class CellPheromone:
+    def __init__(self, grid, x, y):
+        self.grid = grid
+        self.x = x
+        self.y = y
+
+    def __getitem__(self, colony):
+        if not 1 <= colony <= self.grid.num_colonies:
+            raise KeyError(colony)
+        return int(self.grid.pheromone[colony - 1, self.y, self.x])
+
+    def __setitem__(self, colony, amount):
+        self.grid.pheromone[colony - 1, self.y, self.x] = min(max(amount, 0), 255)
+
+    def __contains__(self, colony):
+        return 1 <= colony <= self.grid.num_colonies
+
+    def get(self, colony, default=0):
+        if colony in self:
+            return self[colony]
+        return default
+
+    def items(self):
+        return [(colony, self[colony]) for colony in range(1, self.grid.num_colonies + 1)]
+
+    def values(self):
+        return [amount for _, amount in self.items()]
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+
+from config import SimulationConfig
+from profiler import MetricsServer, TickProfiler
+from simulation import Simulation
+from telemetry import Telemetry
+
+
+# runs one game without a window until a colony wins or max_ticks pass, returns a summary
+# config is a SimulationConfig or a dict of settings, width and height override its grid size,
+# with checkpoint_every the game is snapshot to checkpoint_path every that many ticks and
+# resume carries on from that snapshot when it exists, event_log records every tick for replay.py,
+# messages at log_level and above go to log_path, or to stderr when not quiet,
+# profile_path gets per phase tick timings as json and metrics_port serves them while running,
+# profile adds the same timings to the summary
+def run_headless(max_ticks=50000, seed=None, width=None, height=None, worker_backend="objects", quiet=True,
+                 config=None, checkpoint_path=None, checkpoint_every=None, resume=False, event_log=None,
+                 keyframe_every=500, log_level="info", log_path=None, profile_path=None, metrics_port=None,
+                 profile=False):
+    if checkpoint_every and not checkpoint_path:
+        raise ValueError("checkpoint_every needs a checkpoint_path")
+    if log_path:
+        telemetry = Telemetry(level=log_level, path=log_path)
+    elif not quiet:
+        telemetry = Telemetry(level=log_level, stream=sys.stderr)
+    else:
+        telemetry = Telemetry()
+
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        simulation = Simulation.restore(checkpoint_path, telemetry=telemetry)
+    else:
+        if isinstance(config, dict):
+            config = SimulationConfig.from_dict(config)
+        simulation = Simulation(width=width, height=height, seed=seed, worker_backend=worker_backend, config=config,
+                                telemetry=telemetry)
+    config = simulation.config
+    if event_log:
+        simulation.record_events(event_log, keyframe_every)
+    metrics = None
+    if profile or profile_path or metrics_port:
+        simulation.profiler = TickProfiler()
+        if metrics_port:
+            metrics = MetricsServer(simulation.profiler, metrics_port)
+
+    start = time.perf_counter()
+    start_tick = simulation.tick
+    while simulation.tick < max_ticks:
+        simulation.update()
+        if simulation.game_end():
+            break
+        if checkpoint_every and simulation.tick % checkpoint_every == 0:
+            simulation.snapshot(checkpoint_path)
+    seconds = time.perf_counter() - start
+    ticks = simulation.tick
+    simulation.stop_recording()
+    telemetry.close()
+    if profile_path:
+        simulation.profiler.write_json(profile_path)
+    if metrics is not None:
+        metrics.close()
+
+    summary = {
+        # the seed in use, unseeded games get a fresh one so they can be replayed
+        "seed": simulation.seed,
+        "width": config.width,
+        "height": config.height,
+        "config_hash": config.config_hash(),
+        # what else decides how the game plays out, so saved results are only reused for the same game
+        "max_ticks": max_ticks,
+        "worker_backend": simulation.worker_backend,
+        "winner": getattr(simulation, "winning_colony", None),
+        "ticks": ticks,
+        "food_returned": simulation.total_food_returned(),
+        "ants_left": simulation.count_ants(),
+        "state_hash": simulation.state_hash(),
+        "counters": dict(sorted(telemetry.counts.items())),
+        "seconds": round(seconds, 3),
+        "ticks_per_sec": round((ticks - start_tick) / seconds, 1) if seconds > 0 else None,
+    }
+    if profile:
+        summary["profile"] = simulation.profiler.summary()
+    return summary
@@ -1,26 +1,42 @@
+import argparse
+
 import pygame
+from colonyclash import load_config
+from game_loop import GameLoop
 from simulation import Simulation
 
 
-def main():
+def build_parser():
+    parser = argparse.ArgumentParser(description="Ant colony simulation in a window")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--config", default=None, help="JSON file of config settings")
+    parser.add_argument("--tick-rate", type=float, default=60.0, help="simulation ticks per second")
+    parser.add_argument("--fps", type=int, default=60, help="most frames drawn per second")
+    parser.add_argument("--fast", type=int, default=None, metavar="N",
+                        help="play as fast as possible and draw after at most N ticks")
+    parser.add_argument("--threaded-render", action="store_true",
+                        help="draw frames on a separate thread from copies of the game state")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
     pygame.init()
     # sets display size
     screen = pygame.display.set_mode((1250, 1250))
     pygame.display.set_caption("Ant Colony Sim")
-    clock = pygame.time.Clock()
-
-    simulation = Simulation()
-
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
 
-        simulation.update()
-        simulation.render(screen)
-        pygame.display.flip()
-        clock.tick(60)
+    simulation = Simulation(seed=args.seed, config=load_config(args.config))
+    loop = GameLoop(
+        simulation,
+        screen,
+        tick_rate=args.tick_rate,
+        fps=args.fps,
+        fast=args.fast is not None,
+        ticks_per_frame=args.fast or 100,
+        threaded_render=args.threaded_render,
+    )
+    loop.run()
 
     pygame.quit()
 
@@ -0,0 +1,74 @@
+from array import array
+
+import numpy as np
+
+
+# how many ants stand on each cell, kept up to date as ants are made, move and are removed
+# so a move sees every move made before it in the same tick, the counts live in one flat
+# array that numpy shares as a grid layer for the worker batch
+class Occupancy:
+    def __init__(self, width, height, ants_per_cell=1, shared_cells=()):
+        self.width = width
+        self.height = height
+        # most ants a cell holds, 0 for no limit
+        self.ants_per_cell = ants_per_cell
+        # cells any number of ants may share, such as the nests, as flat indices and as a grid
+        self.shared = {y * width + x for x, y in shared_cells}
+        self.shared_grid = np.zeros((height, width), dtype=bool)
+        for index in self.shared:
+            self.shared_grid.flat[index] = True
+        # ants per cell indexed y * width + x, and the same memory as a height x width grid
+        self.cells = array("i", bytes(4 * width * height))
+        self.counts = np.frombuffer(self.cells, dtype=np.int32).reshape(height, width)
+        # cells that cannot take another ant, changed only when a count reaches or leaves the limit,
+        # so ants check moves with `cell not in full` at set speed
+        self.full = set()
+
+    def __contains__(self, cell):
+        return cell in self.full
+
+    def add(self, x, y):
+        index = y * self.width + x
+        self.cells[index] += 1
+        if self.cells[index] == self.ants_per_cell and index not in self.shared:
+            self.full.add((x, y))
+
+    def remove(self, x, y):
+        index = y * self.width + x
+        if self.cells[index] == self.ants_per_cell:
+            self.full.discard((x, y))
+        self.cells[index] -= 1
+
+    # remove then add without the two calls, moves are the common case
+    def move(self, old_x, old_y, x, y):
+        cells = self.cells
+        limit = self.ants_per_cell
+        index = old_y * self.width + old_x
+        if cells[index] == limit:
+            self.full.discard((old_x, old_y))
+        cells[index] -= 1
+        index = y * self.width + x
+        cells[index] += 1
+        if cells[index] == limit and index not in self.shared:
+            self.full.add((x, y))
+
+    # brings the full cells up to date after counts of many cells were changed through the grid
+    def refresh(self, xs, ys):
+        full = self.blocked(xs, ys)
+        self.full.difference_update(zip(xs[~full].tolist(), ys[~full].tolist()))
+        self.full.update(zip(xs[full].tolist(), ys[full].tolist()))
+
+    # which of many cells, given as arrays of x and y, cannot take another ant
+    def blocked(self, xs, ys):
+        if not self.ants_per_cell:
+            return np.zeros(np.shape(xs), dtype=bool)
+        return (self.counts[ys, xs] >= self.ants_per_cell) & ~self.shared_grid[ys, xs]
+
+    # ants each of many cells can still take
+    def room(self, xs, ys):
+        unlimited = np.iinfo(np.int32).max
+        if not self.ants_per_cell:
+            return np.full(np.shape(xs), unlimited, dtype=np.int64)
+        room = self.ants_per_cell - self.counts[ys, xs].astype(np.int64)
+        room[self.shared_grid[ys, xs]] = unlimited
+        return room
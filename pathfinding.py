@@ -0,0 +1,260 @@
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+
+# rough memory cost of a cached path, the tuple plus its position lookup per step
+PATH_ENTRY_BYTES = 400
+PATH_STEP_BYTES = 200
+
+
+# least recently used cache of found paths, cleared whenever the hazard layout changes
+class PathCache:
+    def __init__(self, max_entries=512, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # (start, goal) -> (path, position of each cell in the path, size in bytes)
+        self.entries = OrderedDict()
+        # starts of the cached paths to each goal, for reusing the end of a longer path
+        self.starts_by_goal = {}
+        self.hazard_version = None
+        self.bytes_used = 0
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # returns (True, path) on a hit, (False, None) on a miss, a cached path of None means no path exists
+    def lookup(self, start, goal, hazard_version):
+        self.check_version(hazard_version)
+        entry = self.entries.get((start, goal))
+        if entry is not None:
+            self.entries.move_to_end((start, goal))
+            self.hits += 1
+            return True, None if entry[0] is None else list(entry[0])
+
+        # start might be on a cached path to the same goal, the rest of that path is still shortest
+        for other_start in self.starts_by_goal.get(goal, ()):
+            path, positions, _ = self.entries[(other_start, goal)]
+            if positions and start in positions:
+                self.entries.move_to_end((other_start, goal))
+                self.suffix_hits += 1
+                return True, list(path[positions[start] + 1:])
+
+        self.misses += 1
+        return False, None
+
+    def store(self, start, goal, hazard_version, path):
+        self.check_version(hazard_version)
+        if (start, goal) in self.entries:
+            self.discard((start, goal))
+        if path is None:
+            entry = (None, None, PATH_ENTRY_BYTES)
+        else:
+            path = tuple(path)
+            positions = {cell: index for index, cell in enumerate(path)}
+            entry = (path, positions, PATH_ENTRY_BYTES + PATH_STEP_BYTES * len(path))
+        if entry[2] > self.max_bytes:
+            return
+
+        self.entries[(start, goal)] = entry
+        self.starts_by_goal.setdefault(goal, set()).add(start)
+        self.bytes_used += entry[2]
+
+        # evicts least recently used paths until back under both limits
+        while len(self.entries) > self.max_entries or self.bytes_used > self.max_bytes:
+            self.discard(next(iter(self.entries)))
+            self.evictions += 1
+
+    def discard(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes_used -= size
+        starts = self.starts_by_goal[key[1]]
+        starts.discard(key[0])
+        if not starts:
+            del self.starts_by_goal[key[1]]
+
+    # drops every path once the hazards have changed
+    def check_version(self, hazard_version):
+        if hazard_version != self.hazard_version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.starts_by_goal.clear()
+            self.bytes_used = 0
+            self.hazard_version = hazard_version
+
+    def stats(self):
+        lookups = self.hits + self.suffix_hits + self.misses
+        return {
+            "hits": self.hits,
+            "suffix_hits": self.suffix_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.suffix_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self.entries),
+            "bytes": self.bytes_used,
+        }
+
+
+# path finding over the environment grid, moves are the four straight steps and wrap at the edges
+class Pathfinder:
+    def __init__(self, environment, cache_entries=512, cache_bytes=8 * 1024 * 1024):
+        self.environment = environment
+        # reuses earlier A* results, no cache when cache_entries is 0
+        self.cache = PathCache(cache_entries, cache_bytes) if cache_entries else None
+        # distance to each nest from every cell, rebuilt when the hazards change
+        self.flow_fields = {}
+        # search buffers reused between A* calls, a cell only counts if its stamp is current,
+        # plain lists as single cell reads and writes are much faster than on numpy arrays
+        size = environment.width * environment.height
+        self.cost_so_far = [0] * size
+        self.came_from = [0] * size
+        self.stamp = [0] * size
+        self.search_id = 0
+        # flat copy of the hazard layer for A*
+        self.blocked = None
+        self.blocked_version = None
+        # total cells expanded by A*, for profiling
+        self.expansions = 0
+
+    # flat indexes of the four neighbours of a cell, in the order the old A* search tried them
+    def neighbours(self, index):
+        width = self.environment.width
+        height = self.environment.height
+        y, x = divmod(index, width)
+        return (
+            y * width + (x - 1) % width,
+            y * width + (x + 1) % width,
+            ((y - 1) % height) * width + x,
+            ((y + 1) % height) * width + x,
+        )
+
+    # steps from every cell to a colonies nest, -1 where the nest can't be reached
+    def nest_distances(self, colony):
+        version = self.environment.hazard_version
+        cached = self.flow_fields.get(colony)
+        if cached is None or cached[0] != version:
+            nest_x, nest_y = self.environment.nests[colony]
+            cached = (version, self.breadth_first_distances(nest_x, nest_y))
+            self.flow_fields[colony] = cached
+        return cached[1]
+
+    # breadth first search out from one cell, a whole frontier at a time
+    def breadth_first_distances(self, start_x, start_y):
+        width = self.environment.width
+        height = self.environment.height
+        blocked = self.environment.grid.hazard.ravel()
+        distances = np.full(width * height, -1, dtype=np.int32)
+        # scratch space for dropping repeated cells without sorting
+        claimed_by = np.zeros(width * height, dtype=np.int64)
+        frontier = np.array([start_y * width + start_x], dtype=np.int64)
+        distances[frontier] = 0
+        step = 0
+        while len(frontier):
+            step += 1
+            ys, xs = np.divmod(frontier, width)
+            candidates = np.concatenate([
+                ys * width + (xs - 1) % width,
+                ys * width + (xs + 1) % width,
+                ((ys - 1) % height) * width + xs,
+                ((ys + 1) % height) * width + xs,
+            ])
+            candidates = candidates[(distances[candidates] == -1) & ~blocked[candidates]]
+            # the last write to each cell wins, keeping one copy of each
+            positions = np.arange(len(candidates))
+            claimed_by[candidates] = positions
+            frontier = candidates[claimed_by[candidates] == positions]
+            distances[frontier] = step
+        return distances.reshape(height, width)
+
+    # next cell on a shortest route to the nest, None once there or if the nest can't be reached
+    def step_home(self, colony, x, y):
+        distances = self.nest_distances(colony)
+        distance = distances[y, x]
+        if distance <= 0:
+            return None
+        width = self.environment.width
+        for index in self.neighbours(y * width + x):
+            next_y, next_x = divmod(index, width)
+            if distances[next_y, next_x] == distance - 1:
+                return next_x, next_y
+        return None
+
+    # path between two cells without the start, None if there is no path
+    def find_path(self, start, goal):
+        version = self.environment.hazard_version
+        if self.cache is not None:
+            hit, path = self.cache.lookup(start, goal, version)
+            if hit:
+                return path
+        path = self.search(start, goal)
+        if self.cache is not None:
+            self.cache.store(start, goal, version, path)
+        return path
+
+    # A* search between two cells
+    def search(self, start, goal):
+        width = self.environment.width
+        height = self.environment.height
+        if self.blocked_version != self.environment.hazard_version:
+            self.blocked = self.environment.grid.hazard.ravel().tobytes()
+            self.blocked_version = self.environment.hazard_version
+        blocked = self.blocked
+        goal_x, goal_y = goal
+
+        # manhattan distance that allows for the grid wrapping
+        def heuristic(index):
+            y, x = divmod(index, width)
+            dx = abs(x - goal_x)
+            dy = abs(y - goal_y)
+            return min(dx, width - dx) + min(dy, height - dy)
+
+        self.search_id += 1
+        search_id = self.search_id
+        cost_so_far = self.cost_so_far
+        came_from = self.came_from
+        stamp = self.stamp
+
+        start_index = start[1] * width + start[0]
+        goal_index = goal_y * width + goal_x
+        cost_so_far[start_index] = 0
+        came_from[start_index] = start_index
+        stamp[start_index] = search_id
+        search_q = [(heuristic(start_index), start_index)]
+
+        found = False
+        while search_q:
+            priority, current = heapq.heappop(search_q)
+            if current == goal_index:
+                found = True
+                break
+            current_cost = cost_so_far[current]
+            # skips queue entries left behind by a cheaper route
+            if priority - heuristic(current) > current_cost:
+                continue
+            self.expansions += 1
+            new_cost = current_cost + 1
+            for neighbour in self.neighbours(current):
+                if blocked[neighbour]:
+                    continue
+                if stamp[neighbour] != search_id or new_cost < cost_so_far[neighbour]:
+                    stamp[neighbour] = search_id
+                    cost_so_far[neighbour] = new_cost
+                    came_from[neighbour] = current
+                    heapq.heappush(search_q, (new_cost + heuristic(neighbour), neighbour))
+
+        if not found:
+            return None
+
+        # reconstructs path to goal node then returns the path as output
+        path = []
+        current = goal_index
+        while current != start_index:
+            y, x = divmod(current, width)
+            path.append((x, y))
+            current = came_from[current]
+        path.reverse()
+        return path
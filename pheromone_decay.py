@@ -0,0 +1,86 @@
+import numpy as np
+
+
+# hard timeout, pheromones stay at full strength until the cells timer runs out
+class TimeoutDecay:
+    def step(self, grid):
+        timeleft = grid.timeleft
+        active = timeleft > 0
+        # subtracting the mask is much faster than a masked subtract
+        np.subtract(timeleft, active, out=timeleft, casting="unsafe")
+
+        # cells whose timer ran out this tick
+        expired = active & (timeleft == 0)
+        grid.pheromone[:, expired] = 0
+        return expired
+
+
+# pheromones lose a fraction of their strength every tick until they reach zero
+class EvaporationDecay:
+    def __init__(self, rate=0.02):
+        # fixed point multiplier so the whole layer stays in integer maths
+        self.keep = max(0, min(255, round(256 * (1.0 - rate))))
+
+    def step(self, grid):
+        had_pheromone = grid.pheromone.any(axis=0)
+        grid.pheromone[:] = (grid.pheromone.astype(np.uint16) * self.keep) >> 8
+        return self.clear_expired(grid, had_pheromone)
+
+    # resets timers on cells that no longer hold any pheromone
+    def clear_expired(self, grid, had_pheromone):
+        expired = had_pheromone & ~grid.pheromone.any(axis=0)
+        grid.timeleft[expired] = 0
+        return expired
+
+
+# pheromones spread into the eight neighbouring cells, then evaporate
+class DiffusionDecay(EvaporationDecay):
+    def __init__(self, rate=0.02, spread=0.1):
+        super().__init__(rate)
+        self.spread = spread
+
+    def step(self, grid):
+        had_pheromone = grid.pheromone.any(axis=0)
+        layers = grid.pheromone.astype(np.float32)
+
+        # sums the eight neighbours, the grid wraps like ant movement does
+        neighbours = np.zeros_like(layers)
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
+            neighbours += np.roll(layers, (dy, dx), axis=(1, 2))
+
+        layers *= 1.0 - self.spread
+        layers += neighbours * (self.spread / 8)
+        layers *= self.keep / 256
+        # pheromones can't sit on hazards
+        layers[:, grid.hazard] = 0
+
+        np.minimum(layers, 255, out=layers)
+        grid.pheromone[:] = layers.astype(np.uint8)
+        return self.clear_expired(grid, had_pheromone)
+
+
+DECAY_MODELS = {
+    "timeout": TimeoutDecay,
+    "evaporation": EvaporationDecay,
+    "diffusion": DiffusionDecay,
+}
+# config settings each model takes, by the name of its option
+DECAY_OPTIONS = {
+    "timeout": {},
+    "evaporation": {"rate": "pheromone_decay_rate"},
+    "diffusion": {"rate": "pheromone_decay_rate", "spread": "pheromone_spread"},
+}
+
+
+# builds a decay model from its name
+def make_decay_model(name, **options):
+    if name not in DECAY_MODELS:
+        raise ValueError(f"unknown pheromone decay model: {name}")
+    return DECAY_MODELS[name](**options)
+
+
+# the decay model a SimulationConfig picks, with its settings
+def decay_model_for(config):
+    name = config.pheromone_decay
+    options = {option: getattr(config, setting) for option, setting in DECAY_OPTIONS[name].items()}
+    return make_decay_model(name, **options)
@@ -0,0 +1,165 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+# wall time of each phase of Simulation.update and per tick work counters, kept for the
+# last window ticks, the simulation only calls into it while one is attached
+class TickProfiler:
+    def __init__(self, window=1000):
+        self.window = window
+        # phase -> seconds of each recent tick
+        self.phases = {}
+        # counter -> amount of each recent tick
+        self.counters = {}
+        self.ticks = 0
+        # readers on other threads copy the windows under this lock
+        self.lock = threading.Lock()
+        self.current = {}
+        self.current_counts = {}
+        self.tick_start = 0.0
+        self.last_mark = 0.0
+
+    def start_tick(self):
+        self.current = {}
+        self.current_counts = {}
+        self.tick_start = self.last_mark = time.perf_counter()
+
+    # time since the last mark goes to this phase
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last_mark
+        self.last_mark = now
+
+    # time measured elsewhere, such as one ants act call
+    def add(self, phase, seconds):
+        self.current[phase] = self.current.get(phase, 0.0) + seconds
+
+    def count(self, counter, amount=1):
+        self.current_counts[counter] = self.current_counts.get(counter, 0) + amount
+
+    def end_tick(self):
+        self.current["tick"] = time.perf_counter() - self.tick_start
+        with self.lock:
+            self.ticks += 1
+            for phase, seconds in self.current.items():
+                self.window_for(self.phases, phase).append(seconds)
+            for counter, amount in self.current_counts.items():
+                self.window_for(self.counters, counter).append(amount)
+
+    # a phase timed outside a tick, rendering happens between updates
+    def record(self, phase, seconds):
+        with self.lock:
+            self.window_for(self.phases, phase).append(seconds)
+
+    def window_for(self, windows, name):
+        window = windows.get(name)
+        if window is None:
+            window = windows[name] = deque(maxlen=self.window)
+        return window
+
+    # mean and percentiles of every phase in milliseconds and every counter per tick
+    def summary(self):
+        with self.lock:
+            phases = {phase: np.array(window) * 1000 for phase, window in self.phases.items()}
+            counters = {counter: np.array(window) for counter, window in self.counters.items()}
+            ticks = self.ticks
+
+        def describe(values):
+            described = {"samples": len(values), "mean": float(values.mean())}
+            for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                described[f"p{percentile}"] = float(value)
+            described["max"] = float(values.max())
+            return described
+
+        return {
+            "ticks": ticks,
+            "phases_ms": {phase: describe(values) for phase, values in sorted(phases.items()) if len(values)},
+            "counters_per_tick": {counter: describe(values) for counter, values in sorted(counters.items())
+                                  if len(values)},
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    # summary in the prometheus text format
+    def prometheus_text(self):
+        summary = self.summary()
+        lines = [
+            "# TYPE colonyclash_ticks_total counter",
+            f"colonyclash_ticks_total {summary['ticks']}",
+            "# TYPE colonyclash_phase_seconds summary",
+        ]
+        for phase, described in summary["phases_ms"].items():
+            for percentile in PERCENTILES:
+                quantile = percentile / 100
+                seconds = described[f"p{percentile}"] / 1000
+                lines.append(f'colonyclash_phase_seconds{{phase="{phase}",quantile="{quantile}"}} {seconds:.9f}')
+            lines.append(f'colonyclash_phase_seconds_count{{phase="{phase}"}} {described["samples"]}')
+        lines.append("# TYPE colonyclash_work_per_tick summary")
+        for counter, described in summary["counters_per_tick"].items():
+            for percentile in PERCENTILES:
+                quantile = percentile / 100
+                lines.append(f'colonyclash_work_per_tick{{counter="{counter}",quantile="{quantile}"}} '
+                             f'{described[f"p{percentile}"]}')
+        return "\n".join(lines) + "\n"
+
+
+# serves a profilers summary on localhost, /metrics in prometheus text and /metrics.json as json
+class MetricsServer:
+    def __init__(self, profiler, port=9100, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = profiler.prometheus_text().encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(profiler.summary()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # keeps request lines off stderr
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# slowest phases drawn over the game window, returns the rect it covers, font is made once by the
+# caller as looking up a system font is slow
+def draw_profile_overlay(screen, profiler, font, rows=10):
+    import pygame
+
+    phases = profiler.summary()["phases_ms"]
+    lines = [f"{'phase':<18}{'mean':>8}{'p99':>8}"]
+    for phase, described in sorted(phases.items(), key=lambda item: -item[1]["mean"])[:rows]:
+        lines.append(f"{phase:<18}{described['mean']:>8.2f}{described['p99']:>8.2f}")
+
+    line_height = font.get_linesize()
+    width = max(font.size(line)[0] for line in lines) + 20
+    panel = pygame.Surface((width, line_height * len(lines) + 20), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    for row, line in enumerate(lines):
+        panel.blit(font.render(line, True, (255, 255, 255)), (10, 10 + row * line_height))
+    return screen.blit(panel, (10, screen.get_height() - panel.get_height() - 10))
@@ -0,0 +1,192 @@
+import numpy as np
+import pygame
+
+BACKGROUND = (10, 100, 25)
+HAZARD = (102, 51, 0)
+FOOD = (255, 255, 102)
+NEST_COLORS = {1: (0, 102, 255), 2: (255, 51, 51)}
+ANT_COLORS = {"scout": (0, 255, 255), "worker": (255, 165, 0), "attacker": (255, 0, 0)}
+OTHER_ANT = (255, 255, 255)
+TEXT = (255, 255, 255)
+# largest cell size, the original 75x75 game fills the window with 16 pixel cells
+MAX_CELL_SIZE = 16
+# below this cell size ants fill their cell instead of being drawn as circles
+MIN_CIRCLE_CELL_SIZE = 6
+# cells per side of the squares checked for changes between frames
+TILE = 16
+# rendered text kept for reuse, cleared when it grows past this
+TEXT_CACHE_SIZE = 256
+
+
+# draws the game a frame at a time, keeping what did not change between frames: the cells are
+# coloured from the grid arrays with numpy and scaled up in one blit, hazards are coloured once
+# until they change, fonts and text are made once, and only the parts of the screen that changed
+# are returned for pygame.display.update
+class Renderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self.fonts = {}
+        self.text_cache = {}
+        self.grid_shape = None
+        self.cell_size = 1
+        # background and hazards, copied as the start of each frame
+        self.base = None
+        self.hazard = None
+        # cell colours of the last frame with ants painted in, compared to find what changed
+        self.last_cells = None
+        # the whole screen without text, dirty parts are copied from it to the screen
+        self.world = pygame.Surface(screen.get_size())
+        self.world.fill(BACKGROUND)
+        self.cell_surface = None
+        self.last_text = []
+        # screen areas drawn over by someone else, such as an overlay, redrawn next frame
+        self.invalid = [screen.get_rect()]
+
+    # the default font, or a system font by name, made once per name and size
+    def font(self, size, name=None):
+        font = self.fonts.get((name, size))
+        if font is None:
+            if name is None:
+                font = pygame.font.Font(None, size)
+            else:
+                font = pygame.font.SysFont(name, size)
+            self.fonts[name, size] = font
+        return font
+
+    def text(self, line, size):
+        key = (line, size)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            surface = self.text_cache[key] = self.font(size).render(line, True, TEXT)
+        return surface
+
+    # marks a screen area to be redrawn on the next frame
+    def invalidate(self, rect):
+        self.invalid.append(pygame.Rect(rect))
+
+    # new grid size, picks the cell size that fits the screen and starts from a full redraw
+    def resize(self, width, height):
+        screen_width, screen_height = self.screen.get_size()
+        self.grid_shape = (height, width)
+        self.cell_size = max(1, min(MAX_CELL_SIZE, screen_width // width, screen_height // height))
+        self.cell_surface = pygame.Surface((width, height))
+        self.hazard = None
+        self.last_cells = None
+        self.world.fill(BACKGROUND)
+        self.invalid = [self.screen.get_rect()]
+
+    # cell colours indexed [x, y] as surfarray wants them
+    def cell_colors(self, food, hazard, pheromone, nests):
+        if self.hazard is None or not np.array_equal(self.hazard, hazard):
+            self.hazard = hazard.copy()
+            self.base = np.empty(hazard.T.shape + (3,), dtype=np.uint8)
+            self.base[:] = BACKGROUND
+            self.base[hazard.T] = HAZARD
+        cells = self.base.copy()
+
+        open_cells = ~hazard.T
+        has_food = open_cells & (food.T > 0)
+        cells[has_food] = FOOD
+        # blue and red brightness for each colonies pheromone
+        blue = pheromone[0].T
+        red = pheromone[1].T
+        has_pheromone = open_cells & ~has_food & ((blue > 0) | (red > 0))
+        cells[has_pheromone, 0] = np.minimum(red[has_pheromone].astype(np.uint16) * 2, 255)
+        cells[has_pheromone, 1] = 55
+        cells[has_pheromone, 2] = np.minimum(blue[has_pheromone].astype(np.uint16) * 2, 255)
+
+        for colony, (nest_x, nest_y) in nests.items():
+            cells[nest_x, nest_y] = NEST_COLORS.get(colony, OTHER_ANT)
+        return cells
+
+    @staticmethod
+    def paint_ants(cells, ants):
+        for role, x, y in ants:
+            cells[x, y] = ANT_COLORS.get(role, OTHER_ANT)
+
+    # screen rects of the tiles whose cells differ from the last frame
+    def changed_tiles(self, cells):
+        if self.last_cells is None:
+            changed = np.ones(cells.shape[:2], dtype=bool)
+        else:
+            changed = (cells != self.last_cells).any(axis=2)
+        width, height = changed.shape
+        tiles_x = -(-width // TILE)
+        tiles_y = -(-height // TILE)
+        padded = np.zeros((tiles_x * TILE, tiles_y * TILE), dtype=bool)
+        padded[:width, :height] = changed
+        tiles = padded.reshape(tiles_x, TILE, tiles_y, TILE).any(axis=(1, 3))
+
+        size = TILE * self.cell_size
+        if tiles.sum() * 2 > tiles.size:
+            return [pygame.Rect(0, 0, width * self.cell_size, height * self.cell_size)]
+        return [pygame.Rect(tile_x * size, tile_y * size, size, size) for tile_x, tile_y in zip(*np.nonzero(tiles))]
+
+    # draws a frame and returns the screen rects that changed, ants are (role, x, y)
+    # and winner is the winning colonies name
+    def draw(self, food, hazard, pheromone, nests, ants, counts, food_returned, spawn_food_cost, winner=None):
+        if self.grid_shape != hazard.shape:
+            self.resize(hazard.shape[1], hazard.shape[0])
+        cell_size = self.cell_size
+        cells = self.cell_colors(food, hazard, pheromone, nests)
+        ants = list(ants)
+
+        if cell_size >= MIN_CIRCLE_CELL_SIZE:
+            # ants are circles over their cell, they still go into the compared colours
+            # so the tiles they leave and enter are redrawn
+            compared = cells.copy()
+            self.paint_ants(compared, ants)
+        else:
+            self.paint_ants(cells, ants)
+            compared = cells
+        dirty = self.changed_tiles(compared)
+        self.last_cells = compared
+
+        if dirty:
+            width, height = self.grid_shape[1], self.grid_shape[0]
+            pygame.surfarray.blit_array(self.cell_surface, cells)
+            area = pygame.Rect(0, 0, width * cell_size, height * cell_size)
+            pygame.transform.scale(self.cell_surface, area.size, self.world.subsurface(area))
+            if cell_size >= MIN_CIRCLE_CELL_SIZE:
+                radius = cell_size // 3
+                for role, x, y in ants:
+                    pygame.draw.circle(self.world, ANT_COLORS.get(role, OTHER_ANT),
+                                       (x * cell_size + cell_size // 2, y * cell_size + cell_size // 2), radius)
+
+        # text changes are redrawn over both where the old text was and where the new text goes
+        text = self.hud_text(counts, food_returned, spawn_food_cost, winner)
+        if text != self.last_text:
+            dirty.extend(rect for _, _, rect in self.last_text)
+            dirty.extend(rect for _, _, rect in text)
+        self.last_text = text
+        dirty.extend(self.invalid)
+        self.invalid = []
+
+        for rect in dirty:
+            self.screen.blit(self.world, rect, rect)
+        for line, size, rect in text:
+            if rect.collidelist(dirty) != -1:
+                self.screen.blit(self.text(line, size), rect)
+        return dirty
+
+    # each line of colony counts and the winner as (line, font size, screen rect)
+    def hud_text(self, counts, food_returned, spawn_food_cost, winner):
+        screen_width, screen_height = self.screen.get_size()
+        placed = []
+        for colony, name, left in ((1, "Blue", 10), (2, "Red", screen_width - 300)):
+            lines = [
+                f"Colony {name}",
+                f"Food Returned: {food_returned[colony]}/{spawn_food_cost}",
+                f"Scouts: {counts[colony]['scouts']}",
+                f"Workers: {counts[colony]['workers']}",
+                f"Attackers: {counts[colony]['attackers']}",
+            ]
+            for i, line in enumerate(lines):
+                top = 10 if i == 0 else 50 + (i - 1) * 30
+                placed.append((line, 36, self.text(line, 36).get_rect(topleft=(left, top))))
+        if winner is not None:
+            line = f"Colony {winner} Wins!"
+            placed.append((line, 125, self.text(line, 125).get_rect(center=(screen_width // 2, screen_height // 2))))
+        return placed
@@ -0,0 +1,54 @@
+# plays back an event log in a window at any speed
+# python -m colonyclash replay game.events --start 2000 --speed 120
+# space pauses, left and right step a tick while paused, up and down double or halve the speed
+import pygame
+
+from events import EventLog
+from renderer import Renderer
+
+
+def view(path, start=0, speed=60.0, fps=60):
+    log = EventLog(path)
+    spawn_food_cost = log.header["config"]["spawn_food_cost"]
+    state = log.state_at(start)
+
+    pygame.init()
+    screen = pygame.display.set_mode((1250, 1250))
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen)
+    paused = False
+    # fraction of a tick carried between frames at slow speeds
+    owed = 0.0
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_UP:
+                    speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    speed = max(speed / 2, 0.25)
+                elif event.key == pygame.K_RIGHT and paused:
+                    log.advance(state, state.tick + 1)
+                elif event.key == pygame.K_LEFT and paused:
+                    # going back means rebuilding from the keyframe before
+                    state = log.state_at(state.tick - 1)
+
+        if not paused:
+            owed += speed / fps
+            steps = int(owed)
+            owed -= steps
+            if steps:
+                log.advance(state, state.tick + steps)
+
+        dirty = renderer.draw(state.food, state.hazard, state.pheromone, state.nests, state.ant_positions(),
+                              state.counts(), state.food_returned, spawn_food_cost)
+        pygame.display.update(dirty)
+        pygame.display.set_caption(f"Ant Colony Replay - tick {state.tick} of {log.last_tick} at {speed:g} ticks/s")
+        clock.tick(fps)
+
+    pygame.quit()
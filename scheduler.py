@@ -0,0 +1,32 @@
+# ants bucketed by the tick of their next turn, so a tick only wakes the ants due to move
+# instead of calling every ant to count down its move delay, each ant keeps the tick it was
+# last brought up to date so the ticks it skipped can be caught up before it acts
+class TurnScheduler:
+    def __init__(self):
+        # tick -> ants whose turn it is
+        self.buckets = {}
+
+    # schedules an ant from its move delay countdown, tick is the next tick whose ants act
+    def add(self, ant, tick):
+        ant.last_turn = tick - 1
+        ant.next_turn = tick + ant.move_delay - ant.steps_since_last_move
+        bucket = self.buckets.get(ant.next_turn)
+        if bucket is None:
+            bucket = self.buckets[ant.next_turn] = []
+        bucket.append(ant)
+
+    # ants due on this tick, including any that have since died or changed role
+    def pop(self, tick):
+        return self.buckets.pop(tick, [])
+
+    # catches every scheduled ant up on the ticks before tick as if it had been called each one,
+    # so its counters can be read, as when saving a snapshot
+    def settle(self, ants, tick):
+        for ant in ants:
+            last_turn = getattr(ant, "last_turn", None)
+            if last_turn is not None and last_turn < tick:
+                ant.wait(tick - last_turn)
+                ant.last_turn = tick
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
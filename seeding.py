@@ -0,0 +1,73 @@
+import os
+import random
+
+import numpy as np
+
+# independent random streams drawn from one seed, adding a stream never shifts the others
+STREAMS = {
+    "environment": 0,
+    "regeneration": 1,
+    "agents": 2,
+    "workers": 3,
+    "placement": 4,
+}
+MASK64 = (1 << 64) - 1
+
+
+# splitmix64, a random stream whose whole state is one 64 bit int, for the draws every ant makes,
+# a python Random keeps 2.5 KB of state which is most of what a small ant costs
+class SplitMix64:
+    __slots__ = ("state",)
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        self.state = seed & MASK64
+
+    def next64(self):
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    # float in [0, 1) from the top 53 bits
+    def random(self):
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    # scales a draw to the length, the bias is far too small to matter for a handful of moves
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("cannot choose from an empty sequence")
+        return seq[(self.next64() * len(seq)) >> 64]
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state & MASK64
+
+
+# hands out a random stream per subsystem and per ant from one root seed
+class RngStreams:
+    def __init__(self, seed=None):
+        self.root = np.random.SeedSequence(seed)
+        # the seed in use, unseeded runs get a fresh one that can be passed back to replay them
+        self.seed = self.root.entropy
+
+    # seed sequence for a stream, index picks one of many, such as each ant
+    def sequence(self, name, index=0):
+        return np.random.SeedSequence(self.seed, spawn_key=(STREAMS[name], index))
+
+    # numpy generator for array work
+    def generator(self, name, index=0):
+        return np.random.default_rng(self.sequence(name, index))
+
+    # standard library generator for single draws, which are faster than numpy ones
+    def python_random(self, name, index=0):
+        state = self.sequence(name, index).generate_state(4)
+        return random.Random(int.from_bytes(state.tobytes(), "little"))
+
+    # compact stream for one ant, seeded from its own seed sequence
+    def ant_random(self, name, index=0):
+        state = self.sequence(name, index).generate_state(2)
+        return SplitMix64(int.from_bytes(state.tobytes(), "little"))
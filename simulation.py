@@ -1,289 +1,375 @@
 from agents import ScoutAnt, WorkerAnt, AttackAnt
+from agent_store import AgentStore
+from colony_registry import ColonyRegistry
+from config import SimulationConfig
 from environment import Environment
-import pygame
+from events import EventRecorder
+from pheromone_decay import decay_model_for
+from scheduler import TurnScheduler
+from seeding import RngStreams
+from snapshot import load_simulation, save_simulation
+from spatial_index import SpatialIndex
+from telemetry import INFO, Telemetry
+from worker_batch import BatchedWorkerAnt, WorkerBatch
+import hashlib
+import math
+from time import perf_counter
+
+# role and offset from the nest of each colonies first five ants
+STARTING_LAYOUT = [
+    (ScoutAnt, 0, 0),
+    (WorkerAnt, 0, 0),
+    (WorkerAnt, 0, 2),
+    (WorkerAnt, -2, 0),
+    (AttackAnt, 0, -4),
+]
+# roles handed out in turn to ants past the first five
+EXTRA_ROLES = [WorkerAnt, WorkerAnt, WorkerAnt, ScoutAnt, AttackAnt]
 
 
 class Simulation:
-    def __init__(self):
-        self.environment = Environment(75, 75)
+    def __init__(self, width=None, height=None, seed=None, worker_backend="objects", config=None, populate=True,
+                 telemetry=None):
+        # tuning knobs, width and height override the configs grid size when given
+        config = config or SimulationConfig()
+        if width is not None or height is not None:
+            config = config.with_changes(width=width or config.width, height=height or config.height)
+        self.config = config
+
+        # a seed makes food, hazards and ant decisions repeat exactly between runs,
+        # each part of the game draws from its own stream so none shifts another
+        self.rngs = RngStreams(seed)
+        self.seed = self.rngs.seed
+        # ants made so far, each one gets the next agent stream
+        self.ants_made = 0
+        self.environment = Environment(
+            config.width,
+            config.height,
+            pheromone_decay=decay_model_for(config),
+            regen_seed=self.rngs.sequence("regeneration"),
+            config=config,
+            rng=self.rngs.python_random("environment"),
+        )
+        # leveled messages and event counters, only counting by default
+        self.telemetry = telemetry or Telemetry()
+        self.environment.telemetry = self.telemetry
         self.food_counters = {1: 0, 2: 0}
-
-        # nest for colony 1
-        nest_1_x, nest_1_y = self.environment.nests[1]
-        # starting agents for colony 1
-        self.agents = [
-            ScoutAnt(nest_1_x, nest_1_y, self.environment, colony=1),
-            WorkerAnt(nest_1_x, nest_1_y, self.environment, colony=1),
-            WorkerAnt(nest_1_x, nest_1_y + 2, self.environment, colony=1),
-            WorkerAnt(nest_1_x - 2, nest_1_y, self.environment, colony=1),
-            AttackAnt(nest_1_x, nest_1_y - 4, self.environment, colony=1),
-        ]
-
-        # nest for colony 2
-        nest_2_x, nest_2_y = self.environment.nests[2]
-        # starting agents for colony 2
-        self.agents.extend([
-            ScoutAnt(nest_2_x, nest_2_y, self.environment, colony=2),
-            WorkerAnt(nest_2_x, nest_2_y, self.environment, colony=2),
-            WorkerAnt(nest_2_x, nest_2_y + 2, self.environment, colony=2),
-            WorkerAnt(nest_2_x - 2, nest_2_y, self.environment, colony=2),
-            AttackAnt(nest_2_x, nest_2_y - 4, self.environment, colony=2),
-        ])
-
-        # get copy of ants
-        self.all_ants = self.agents.copy()
-
-        self.environment.spawn_food()
-        self.environment.add_hazards(num_hazards=500)
-        self.occupied_squares = set()
+        # "arrays" steps every worker together from numpy arrays instead of one object at a time
+        if worker_backend not in ("objects", "arrays"):
+            raise ValueError(f"unknown worker backend: {worker_backend}")
+        self.worker_backend = worker_backend
+        self.worker_batch = WorkerBatch(self.environment, seed=self.rngs.sequence("workers")) if worker_backend == "arrays" else None
+
+        # every live ant, all_ants is kept as another name for the same store
+        self.agents = AgentStore()
+        self.all_ants = self.agents
+        # live counts of each colonies ants by role
+        self.colonies = ColonyRegistry(colonies=(1, 2))
+        # ants per cell, updated as each ant moves rather than rebuilt every tick,
+        # ants check their moves against the cells it has full
+        self.occupancy = self.environment.occupancy
+        self.occupied_squares = self.occupancy.full
+        # ticks played so far
+        self.tick = 0
+        # ants by the tick they next move on, turn_tick is the next tick whose ants act
+        self.scheduler = TurnScheduler()
+        self.turn_tick = 1
+        # event log being written, see record_events
+        self.events = None
+        # per phase timings, profiler.TickProfiler when attached
+        self.profiler = None
+        # renderer.Renderer made on the first render
+        self.renderer = None
+
+        # restoring a snapshot fills in the ants, food and hazards itself,
+        # hazards go first so the ants can be kept off them
+        if populate:
+            self.environment.spawn_food()
+            self.environment.add_hazards()
+            for ant in self.starting_ants():
+                self.add_ant(ant)
+
+    # the scout, three workers and attacker each colony starts with, larger colonies
+    # get the rest at random free cells around the nest, so hazards must be placed first
+    def starting_ants(self):
+        width, height = self.config.width, self.config.height
+        hazard = self.environment.grid.hazard
+        occupancy = self.environment.occupancy
+        placement = self.rngs.python_random("placement")
+        starting_ants = []
+        for colony in (1, 2):
+            nest_x, nest_y = self.environment.nests[colony]
+            for ant_class, dx, dy in STARTING_LAYOUT[:self.config.colony_size]:
+                starting_ants.append(self.make_ant(ant_class, (nest_x + dx) % width, (nest_y + dy) % height, colony))
+
+            # about one ant to every four cells of the square they are spread over
+            extra = max(self.config.colony_size - len(STARTING_LAYOUT), 0)
+            spread = max(4, math.isqrt(extra))
+            for i in range(extra):
+                # draws again until the cell is open and has room
+                misses = 0
+                while True:
+                    x = (nest_x + placement.randint(-spread, spread)) % width
+                    y = (nest_y + placement.randint(-spread, spread)) % height
+                    if not hazard[y, x] and (x, y) not in occupancy:
+                        break
+                    misses += 1
+                    # the square has filled up, spread further out
+                    if misses % 100 == 0:
+                        spread += 1
+                        if spread > max(width, height):
+                            raise ValueError(f"no free cells left for {self.config.colony_size} ants per colony")
+                starting_ants.append(self.make_ant(EXTRA_ROLES[i % len(EXTRA_ROLES)], x, y, colony))
+        return starting_ants
+
+    # starts writing every tick's events to an event log for replaying later
+    def record_events(self, path, keyframe_every=500):
+        self.events = EventRecorder(path, self, keyframe_every)
+        self.environment.events = self.events
+        return self.events
+
+    def stop_recording(self):
+        if self.events is not None:
+            self.events.close()
+        self.events = None
+        self.environment.events = None
+
+    # writes the whole game state to a snapshot file
+    def snapshot(self, path):
+        save_simulation(self, path)
+
+    # new simulation carrying on from a snapshot file, options such as telemetry go to the constructor
+    @classmethod
+    def restore(cls, path, **options):
+        return load_simulation(cls, path, **options)
 
     def update(self):
-
-        # clears and updates occupied squares
-        self.occupied_squares.clear()
-        for agent in self.agents:
-            self.occupied_squares.add((agent.x, agent.y))
+        self.tick += 1
+        self.turn_tick = self.tick
+        self.telemetry.tick = self.tick
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_tick()
+            expansions = self.environment.paths.expansions
 
         # removes dead ants
-        self.all_ants = [ant for ant in self.all_ants if ant.alive]
-        self.agents = [ant for ant in self.agents if ant.alive]
+        for ant in self.agents.remove_dead():
+            self.colonies.remove(ant)
+            self.occupancy.remove(ant.x, ant.y)
+        if self.worker_batch is not None:
+            self.worker_batch.release_dead()
+        if profiler is not None:
+            profiler.mark("remove_dead")
 
         # handles ant respawning and ant role changes
         for colony in [1, 2]:
             # check if colony has enough food for new ant
-            if self.environment.food_returned[colony] >= 6:
-                self.environment.food_returned[colony] -= 6
+            if self.environment.food_returned[colony] >= self.config.spawn_food_cost:
+                self.environment.food_returned[colony] -= self.config.spawn_food_cost
                 self.food_counters[colony] += 1
 
                 # spawn either new worker or attack ant
                 nest_x, nest_y = self.environment.nests[colony]
                 if self.food_counters[colony] % 2 == 0:
-                    new_ant = WorkerAnt(nest_x, nest_y, self.environment, colony)
-                    print(f"[colony {colony}] spawned new worker ant")
+                    new_ant = self.make_ant(WorkerAnt, nest_x, nest_y, colony)
+                    self.telemetry.log(INFO, "colony.spawn", "[colony {}] spawned new worker ant", colony)
                 else:
-                    new_ant = AttackAnt(nest_x, nest_y, self.environment, colony)
-                    print(f"[colony {colony}] spawned new attack ant")
+                    new_ant = self.make_ant(AttackAnt, nest_x, nest_y, colony)
+                    self.telemetry.log(INFO, "colony.spawn", "[colony {}] spawned new attack ant", colony)
 
                 # add new ants
-                self.all_ants.append(new_ant)
-                self.agents.append(new_ant)
+                self.add_ant(new_ant)
 
             # check if no scouts alive, change worker ant to scout
-            if not any(isinstance(ant, ScoutAnt) and ant.colony == colony for ant in self.all_ants):
-                for index, ant in enumerate(self.all_ants):
-                    if isinstance(ant, WorkerAnt) and ant.colony == colony:
-                        print(f"[colony {colony}] changing worker ant ({ant.x}, {ant.y}) to scout ant")
-                        new_scout = ScoutAnt(ant.x, ant.y, self.environment, colony)
-                        self.all_ants[index] = new_scout
-
-                        # update the ant list
-                        for i, agent in enumerate(self.agents):
-                            if agent is ant:
-                                self.agents[i] = new_scout
-                                break
-                        break
+            if self.colonies.count(colony, "scout") == 0:
+                ant = self.colonies.first(colony, "worker")
+                if ant:
+                    self.telemetry.log(INFO, "colony.role_change", "[colony {}] changing worker ant ({}, {}) to scout ant",
+                                       colony, ant.x, ant.y)
+                    self.change_role(ant, ScoutAnt)
 
             # check if there are no attack ants and change a worker ant to attack
-            if not any(isinstance(ant, AttackAnt) and ant.colony == colony for ant in self.all_ants):
-                for index, ant in enumerate(self.all_ants):
-                    if isinstance(ant, WorkerAnt) and ant.colony == colony:
-                        print(f"[colony {colony}] changing worker ({ant.x}, {ant.y}) to attack")
-                        new_attacker = AttackAnt(ant.x, ant.y, self.environment, colony)
-                        self.all_ants[index] = new_attacker
-
-                        for i, agent in enumerate(self.agents):
-                            if agent is ant:
-                                self.agents[i] = new_attacker
-                                break
-                        break
+            if self.colonies.count(colony, "attacker") == 0:
+                ant = self.colonies.first(colony, "worker")
+                if ant:
+                    self.telemetry.log(INFO, "colony.role_change", "[colony {}] changing worker ({}, {}) to attack",
+                                       colony, ant.x, ant.y)
+                    self.change_role(ant, AttackAnt)
 
             # check if last scout is the last alive change to attacker
-            colony_ants = [ant for ant in self.all_ants if ant.colony == colony]
-            if len(colony_ants) == 1 and isinstance(colony_ants[0], ScoutAnt):
-                scout = colony_ants[0]
-                print(f"[colony {colony}] last scout alive ({scout.x}, {scout.y}) change to attacker")
-                new_attacker = AttackAnt(scout.x, scout.y, self.environment, colony)
-                self.all_ants.remove(scout)
-                self.all_ants.append(new_attacker)
-
-                for i, agent in enumerate(self.agents):
-                    if agent is scout:
-                        self.agents[i] = new_attacker
-                        break
+            if self.colonies.count(colony) == 1 and self.colonies.count(colony, "scout") == 1:
+                scout = self.colonies.first(colony, "scout")
+                self.telemetry.log(INFO, "colony.role_change", "[colony {}] last scout alive ({}, {}) change to attacker",
+                                   colony, scout.x, scout.y)
+                self.change_role(scout, AttackAnt, to_end=True)
 
             # checks if only a scout ant and an attacker ant remains turns scout into attacker ant
-            colony_ants = [ant for ant in self.all_ants if ant.colony == colony]
-            scouts = [ant for ant in colony_ants if isinstance(ant, ScoutAnt)]
-            attackers = [ant for ant in colony_ants if isinstance(ant, AttackAnt)]
-            if len(colony_ants) == 2 and len(scouts) == 1 and len(attackers) == 1:
-                scout = scouts[0]
-                print(
-                    f"[colony {colony}] only scout and attacker remain changing ({scout.x}, {scout.y}) to attack ant")
-                new_attacker = AttackAnt(scout.x, scout.y, self.environment, colony)
-                self.all_ants.remove(scout)
-                self.all_ants.append(new_attacker)
-
-                for i, agent in enumerate(self.agents):
-                    if agent is scout:
-                        self.agents[i] = new_attacker
-                        break
-
-            # gets number of each type of ant
-            colony_ants = [ant for ant in self.all_ants if ant.colony == colony]
-            scout_ants = [ant for ant in colony_ants if isinstance(ant, ScoutAnt)]
-            worker_ants = [ant for ant in colony_ants if isinstance(ant, WorkerAnt)]
-            attack_ants = [ant for ant in colony_ants if isinstance(ant, AttackAnt)]
+            scouts = self.colonies.count(colony, "scout")
+            attackers = self.colonies.count(colony, "attacker")
+            if self.colonies.count(colony) == 2 and scouts == 1 and attackers == 1:
+                scout = self.colonies.first(colony, "scout")
+                self.telemetry.log(INFO, "colony.role_change",
+                                   "[colony {}] only scout and attacker remain changing ({}, {}) to attack ant",
+                                   colony, scout.x, scout.y)
+                self.change_role(scout, AttackAnt, to_end=True)
 
             # checks for 1 scout and two attacker ants and 0 worker ants
-            if len(scout_ants) == 1 and len(attack_ants) >= 2 and len(worker_ants) == 0:
-                attack_ant_to_convert = attack_ants[0]
-                print(
-                    f"[ colony {colony}] changing attacker ant: ({attack_ant_to_convert.x}, {attack_ant_to_convert.y}) to worker ant ")
-                new_worker = WorkerAnt(attack_ant_to_convert.x, attack_ant_to_convert.y, self.environment, colony)
-
-                # Replace the AttackAnt with the new WorkerAnt
-                self.all_ants.remove(attack_ant_to_convert)
-                self.all_ants.append(new_worker)
-
-                # Update in self.agents
-                for i, agent in enumerate(self.agents):
-                    if agent is attack_ant_to_convert:
-                        self.agents[i] = new_worker
-                        break
-
-        # update all ants
-        for agent in self.all_ants:
-            agent.act(self.occupied_squares, self.all_ants)
+            scouts = self.colonies.count(colony, "scout")
+            attackers = self.colonies.count(colony, "attacker")
+            workers = self.colonies.count(colony, "worker")
+            if scouts == 1 and attackers >= 2 and workers == 0:
+                attack_ant_to_convert = self.colonies.first(colony, "attacker")
+                self.telemetry.log(INFO, "colony.role_change", "[colony {}] changing attacker ant: ({}, {}) to worker ant",
+                                   colony, attack_ant_to_convert.x, attack_ant_to_convert.y)
+                self.change_role(attack_ant_to_convert, WorkerAnt, to_end=True)
+
+        if profiler is not None:
+            profiler.mark("roles")
+
+        # batched workers all move together before the other ants
+        if self.worker_batch is not None:
+            self.worker_batch.step()
+            if profiler is not None:
+                profiler.mark("worker_batch")
+
+        # index ants by position, colony and role once for the whole tick
+        ant_index = SpatialIndex(self.agents)
+        if profiler is not None:
+            profiler.mark("spatial_index")
+
+        # ants due to move this tick act in store order, keeping the index current as they move,
+        # ants waiting out their move delay are caught up on the ticks they skipped when next due
+        tick = self.tick
+        turns = self.agents.in_order(self.scheduler.pop(tick))
+        for agent in turns:
+            if profiler is not None:
+                started = perf_counter()
+            agent.wait(tick - agent.last_turn - 1)
+            old_x, old_y = agent.x, agent.y
+            agent.act(self.occupied_squares, self.agents, ant_index)
+            if agent.x != old_x or agent.y != old_y:
+                ant_index.moved(agent, old_x, old_y)
+            self.scheduler.add(agent, tick + 1)
+            if profiler is not None:
+                profiler.add("act." + agent.role, perf_counter() - started)
+        self.turn_tick = tick + 1
+        if profiler is not None:
+            profiler.mark("act")
+            profiler.count("ants", len(self.agents))
+            profiler.count("turns", len(turns))
+            profiler.count("neighbour_queries", ant_index.queries)
+            profiler.count("index_blocks_scanned", ant_index.blocks_scanned)
+            profiler.count("astar_expansions", self.environment.paths.expansions - expansions)
 
         # clear pheromone trails
         self.environment.update_pheromone_timeleft()
+        if profiler is not None:
+            profiler.mark("pheromone_decay")
         # regen food
         self.environment.regenerate_food()
+        if profiler is not None:
+            profiler.mark("regenerate_food")
         # count ants
         self.count_ants()
+        if profiler is not None:
+            profiler.mark("count_ants")
+        # log what changed this tick
+        if self.events is not None:
+            self.events.end_tick(self)
+            if profiler is not None:
+                profiler.mark("events")
+        if profiler is not None:
+            profiler.end_tick()
         # check for game end
         if self.game_end():
             return  # Stop simulation if a colony has won
 
+    # creates an ant, workers go into the worker batch when it is in use
+    def make_ant(self, ant_class, x, y, colony):
+        if ant_class is WorkerAnt and self.worker_batch is not None:
+            return BatchedWorkerAnt(x, y, self.environment, colony, self.worker_batch)
+        self.ants_made += 1
+        return ant_class(x, y, self.environment, colony, rng=self.rngs.ant_random("agents", self.ants_made))
+
+    def add_ant(self, ant):
+        self.agents.add(ant)
+        self.colonies.add(ant)
+        self.schedule(ant)
+        return ant
+
+    # batched workers move with the batch, every other ant gets turns from the scheduler
+    def schedule(self, ant):
+        if not isinstance(ant, BatchedWorkerAnt):
+            self.scheduler.add(ant, self.turn_tick)
+
+    # replaces an ant with a new ant of another role in the same place, to_end moves the new ant
+    # to the end of the act order instead of keeping the old ants place
+    def change_role(self, ant, new_role, to_end=False):
+        new_ant = self.make_ant(new_role, ant.x, ant.y, ant.colony)
+        self.occupancy.remove(ant.x, ant.y)
+        if isinstance(ant, BatchedWorkerAnt):
+            ant.batch.release(ant.slot)
+        self.colonies.remove(ant)
+        if to_end:
+            self.agents.replace_at_end(ant, new_ant)
+        else:
+            self.agents.replace(ant, new_ant)
+        self.colonies.add(new_ant)
+        self.schedule(new_ant)
+        return new_ant
+
     # checks for game end
     def game_end(self):
-        colony_counts = {1: 0, 2: 0}
-        for ant in self.all_ants:
-            colony_counts[ant.colony] += 1
-
-        if colony_counts[1] == 0:
+        if self.colonies.count(1) == 0:
             self.winning_colony = 'Red'
             return True
-        elif colony_counts[2] == 0:
+        elif self.colonies.count(2) == 0:
             self.winning_colony = 'Blue'
             return True
         return False
 
     # count ants for display
     def count_ants(self):
-        colony_counts = {1: {"scouts": 0, "workers": 0, "attackers": 0},
-                         2: {"scouts": 0, "workers": 0, "attackers": 0}}
-        for ant in self.all_ants:
-            if isinstance(ant, ScoutAnt):
-                colony_counts[ant.colony]["scouts"] += 1
-            elif isinstance(ant, WorkerAnt):
-                colony_counts[ant.colony]["workers"] += 1
-            elif isinstance(ant, AttackAnt):
-                colony_counts[ant.colony]["attackers"] += 1
-        return colony_counts
-
+        return self.colonies.counts()
+
+    # food each colony has brought back over the whole game
+    def total_food_returned(self):
+        return {colony: self.food_counters[colony] * self.config.spawn_food_cost + self.environment.food_returned[colony]
+                for colony in self.food_counters}
+
+    # short hash of the grid, the ants and the food counts, equal hashes mean equal games
+    def state_hash(self):
+        digest = hashlib.sha256()
+        grid = self.environment.grid
+        for layer in (grid.food, grid.hazard, grid.pheromone, grid.timeleft):
+            digest.update(layer.tobytes())
+        for ant in self.agents:
+            digest.update(repr((ant.role, ant.colony, ant.x, ant.y, ant.alive, getattr(ant, "carrying_food", False))).encode())
+        digest.update(repr((sorted(self.environment.food_returned.items()), sorted(self.food_counters.items()))).encode())
+        return digest.hexdigest()[:16]
+
+    # draws the game and returns the screen rects that changed for pygame.display.update
     def render(self, screen):
-        # background colour
-        screen.fill((10, 100, 25))
-        cell_size = 16
-
-        # render each cell of environment grid
-        for y, row in enumerate(self.environment.grid):
-            for x, cell in enumerate(row):
-                # hazard with dark brown color
-                if cell["hazard"]:
-                    pygame.draw.rect(screen, (102, 51, 0),
-                                     (x * cell_size, y * cell_size, cell_size, cell_size))
-                # food with yellow color
-                elif cell["food"] > 0:
-                    pygame.draw.rect(screen, (255, 255, 102),
-                                     (x * cell_size, y * cell_size, cell_size, cell_size))
-                else:
-                    # check pheromone levels for brightness intensity
-                    has_pheromone = False
-                    if isinstance(cell["pheromone"], dict):
-                        for colony, value in cell["pheromone"].items():
-                            if value > 0:
-                                has_pheromone = True
-                                break
-                    else:
-                        cell["pheromone"] = {1: 0, 2: 0}
-                    if has_pheromone:
-                        # blue and red for respective colonys
-                        brightness_blue = min(255, int(cell["pheromone"].get(1, 0) * 2))
-                        brightness_red = min(255, int(cell["pheromone"].get(2, 0) * 2))
-                        color = (brightness_red, 55, brightness_blue)
-                        pygame.draw.rect(screen, color, (x * cell_size, y * cell_size, cell_size, cell_size))
-
-        # renders nests
-        for colony, (nest_x, nest_y) in self.environment.nests.items():
-            color = (0, 102, 255) if colony == 1 else (255, 51, 51)  # Different colors for each nest
-            pygame.draw.rect(screen, color, (nest_x * cell_size, nest_y * cell_size, cell_size, cell_size))
-
-        # renders ants
-        for agent in self.agents:
-            if isinstance(agent, ScoutAnt):
-                # cyan for scouts
-                color = (0, 255, 255)
-            elif isinstance(agent, WorkerAnt):
-                # orange for workers
-                color = (255, 165, 0)
-            elif isinstance(agent, AttackAnt):
-                # red for attack ant
-                color = (255, 0, 0)
-            else:
-                color = (255, 255, 255)
-            # draw ants as circles
-            pygame.draw.circle(screen, color,
-                               (agent.x * cell_size + cell_size // 2, agent.y * cell_size + cell_size // 2),
-                               cell_size // 3)
-
-        # set font and get colony counts
-        font = pygame.font.Font(None, 36)
-        colony_counts = self.count_ants()
-
-        # display colony 1 info
-        header_1 = font.render("Colony Blue", True, (255, 255, 255))
-        screen.blit(header_1, (10, 10))
-        colony_1_text = [
-            f"Food Returned: {self.environment.food_returned[1]}/6",
-            f"Scouts: {colony_counts[1]['scouts']}",
-            f"Workers: {colony_counts[1]['workers']}",
-            f"Attackers: {colony_counts[1]['attackers']}"
-        ]
-        for i, line in enumerate(colony_1_text):
-            text = font.render(line, True, (255, 255, 255))
-            screen.blit(text, (10, 50 + i * 30))
-
-        # display colony 2 info
-        header_2 = font.render("Colony Red", True, (255, 255, 255))
-        screen.blit(header_2, (screen.get_width() - 300, 10))
-        colony_2_text = [
-            f"Food Returned: {self.environment.food_returned[2]}/6",
-            f"Scouts: {colony_counts[2]['scouts']}",
-            f"Workers: {colony_counts[2]['workers']}",
-            f"Attackers: {colony_counts[2]['attackers']}"
-        ]
-        for i, line in enumerate(colony_2_text):
-            text = font.render(line, True, (255, 255, 255))
-            screen.blit(text, (screen.get_width() - 300, 50 + i * 30))
-
-        # display winning colony
-        if hasattr(self, 'winning_colony'):
-            another_font = pygame.font.Font(None, 125)
-            winning_text = another_font.render(f"Colony {self.winning_colony} Wins!", True, (255, 255, 255))  # White text
-            screen.blit(winning_text,
-                        (screen.get_width() // 2 - winning_text.get_width() // 2,
-                         screen.get_height() // 2 - winning_text.get_height() // 2))
-
-        pygame.display.flip()
\ No newline at end of file
+        # pygame is only needed when drawing, headless runs never import it
+        from renderer import Renderer
+
+        if self.renderer is None or self.renderer.screen is not screen:
+            self.renderer = Renderer(screen)
+        return self.renderer.draw(*self.frame(copy=False))
+
+    # the arguments of Renderer.draw, copied unless asked not to so another thread
+    # can draw them while the game plays on
+    def frame(self, copy=True):
+        grid = self.environment.grid
+        layers = (grid.food, grid.hazard, grid.pheromone)
+        if copy:
+            layers = tuple(layer.copy() for layer in layers)
+        return (
+            *layers,
+            dict(self.environment.nests),
+            [(agent.role, agent.x, agent.y) for agent in self.agents],
+            self.count_ants(),
+            dict(self.environment.food_returned),
+            self.config.spawn_food_cost,
+            getattr(self, "winning_colony", None),
+        )
@@ -0,0 +1,284 @@
+import json
+import mmap
+import os
+import struct
+from collections import deque
+
+import numpy as np
+
+from agents import AttackAnt, ScoutAnt, WorkerAnt
+from colony_registry import ROLES
+from config import SimulationConfig
+from pheromone_decay import DECAY_MODELS
+from worker_batch import BatchedWorkerAnt
+
+# file layout: a fixed size preamble, every array packed at a 64 byte boundary, then a json
+# header giving the settings, small state and the dtype, shape and offset of each array
+MAGIC = b"COLONYSN"
+FORMAT_VERSION = 2
+PREAMBLE = struct.Struct("<8sIQQ")
+ALIGNMENT = 64
+
+ANT_CLASSES = {"scout": ScoutAnt, "worker": WorkerAnt, "attacker": AttackAnt}
+# per worker arrays of a WorkerBatch
+BATCH_ARRAYS = ["x", "y", "colony", "in_use", "alive", "carrying_food", "timeout_counter", "steps_since_last_move",
+                "last_xy", "recent_positions", "recent_head"]
+
+
+# writes arrays and a json header to path, through a temporary file so a crash never leaves half a snapshot
+def write_snapshot(path, header, arrays):
+    temporary = f"{path}.tmp"
+    layout = {}
+    with open(temporary, "wb") as file:
+        file.write(b"\0" * PREAMBLE.size)
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            file.write(b"\0" * (-file.tell() % ALIGNMENT))
+            layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": file.tell()}
+            file.write(array.tobytes())
+        header_offset = file.tell()
+        encoded = json.dumps({"version": FORMAT_VERSION, "state": header, "arrays": layout}).encode()
+        file.write(encoded)
+        file.seek(0)
+        file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_offset, len(encoded)))
+    os.replace(temporary, path)
+
+
+# maps a snapshot into memory, arrays are read only views onto the file
+def read_snapshot(path):
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < PREAMBLE.size:
+        raise ValueError(f"{path} is not a simulation snapshot")
+    magic, version, header_offset, header_length = PREAMBLE.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a simulation snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"snapshot format version {version} is not supported, expected {FORMAT_VERSION}")
+    header = json.loads(mapped[header_offset:header_offset + header_length])
+    arrays = {}
+    for name, layout in header["arrays"].items():
+        dtype = np.dtype(layout["dtype"])
+        count = int(np.prod(layout["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(mapped, dtype, count, layout["offset"]).reshape(layout["shape"])
+    return header["state"], arrays
+
+
+def random_state_words(rng):
+    _, words, gauss_next = rng.getstate()
+    return np.array(words, dtype=np.uint32), gauss_next
+
+
+def set_random_state(rng, words, gauss_next):
+    rng.setstate((3, tuple(words.tolist()), gauss_next))
+
+
+# a workers remembered cells oldest first, as they were kept before the ring buffer
+def recent_positions(ant):
+    head = ant.recent_head
+    return [cell for cell in ant.recent_positions[head:] + ant.recent_positions[:head] if cell is not None]
+
+
+def set_recent_positions(ant, cells):
+    limit = ant.memory_limit
+    cells = cells[-limit:] if limit else []
+    ant.recent_positions = cells + [None] * (limit - len(cells))
+    ant.recent_head = len(cells) % limit if limit else 0
+
+
+# (x, y) of every nonzero cell of a grid layer
+def cell_set(layer):
+    ys, xs = np.nonzero(layer)
+    return set(zip(xs.tolist(), ys.tolist()))
+
+
+def pair(value):
+    return None if value is None else tuple(value)
+
+
+def save_simulation(simulation, path):
+    environment = simulation.environment
+    grid = environment.grid
+    arrays = {
+        "food": grid.food,
+        "hazard": grid.hazard,
+        "pheromone": grid.pheromone,
+        "timeleft": grid.timeleft,
+    }
+    arrays["environment_rng"], environment_gauss = random_state_words(environment.rng)
+
+    # trail cells as rows of food x, food y, cell x, cell y
+    trail_rows = [(*food, *cell) for food, cells in environment.trail_index.trails.items() for cell in cells]
+    arrays["trails"] = np.array(trail_rows, dtype=np.int32).reshape(-1, 4)
+
+    # fields every ant has as packed columns, the rest per ant in the header,
+    # move delay and timeout counters are brought up to date from the scheduler first
+    simulation.scheduler.settle(simulation.agents, simulation.tick)
+    ants = list(simulation.agents)
+    arrays["ant_id"] = np.array([ant.id for ant in ants], dtype=np.int64)
+    arrays["ant_role"] = np.array([ROLES.index(ant.role) for ant in ants], dtype=np.int8)
+    arrays["ant_colony"] = np.array([ant.colony for ant in ants], dtype=np.int8)
+    arrays["ant_x"] = np.array([ant.x for ant in ants], dtype=np.int32)
+    arrays["ant_y"] = np.array([ant.y for ant in ants], dtype=np.int32)
+    arrays["ant_alive"] = np.array([ant.alive for ant in ants], dtype=bool)
+    # each ants random stream is one 64 bit state, 0 for batched workers which have none
+    ant_rng = np.zeros(len(ants), dtype=np.uint64)
+    ant_details = []
+    for row, ant in enumerate(ants):
+        if isinstance(ant, BatchedWorkerAnt):
+            ant_details.append({"slot": ant.slot})
+            continue
+        ant_rng[row] = ant.rng.getstate()
+        details = {"steps_since_last_move": ant.steps_since_last_move}
+        if ant.role == "scout":
+            # the scouts food list is rebuilt by every scan before it is read
+            details.update(state=ant.state, current_food=ant.current_food, current_route=list(ant.current_route))
+        elif ant.role == "worker":
+            details.update(carrying_food=ant.carrying_food, last_position=ant.last_position,
+                           timeout_counter=ant.timeout_counter, recent_positions=recent_positions(ant))
+        else:
+            details.update(in_final_duel=ant.in_final_duel)
+        ant_details.append(details)
+    arrays["ant_rng"] = ant_rng
+
+    batch = simulation.worker_batch
+    batch_state = None
+    if batch is not None:
+        for name in BATCH_ARRAYS:
+            arrays[f"batch_{name}"] = getattr(batch, name)
+        batch_state = {"capacity": batch.capacity, "size": batch.size, "free_slots": batch.free_slots,
+                       "rng": batch.rng.bit_generator.state}
+
+    decay = environment.pheromone_decay
+    decay_name = next(name for name, model in DECAY_MODELS.items() if type(decay) is model)
+    paths = environment.paths
+    cache = paths.cache
+    cache_state = None
+    if cache is not None:
+        cache_state = {
+            "hazard_version": cache.hazard_version,
+            "entries": [[start, goal, path] for (start, goal), (path, _, _) in cache.entries.items()],
+            "counters": {name: getattr(cache, name)
+                         for name in ("hits", "suffix_hits", "misses", "evictions", "invalidations")},
+        }
+
+    header = {
+        "config": simulation.config.to_dict(),
+        "seed": simulation.seed,
+        "worker_backend": simulation.worker_backend,
+        "tick": simulation.tick,
+        "ants_made": simulation.ants_made,
+        "food_counters": simulation.food_counters,
+        "winning_colony": getattr(simulation, "winning_colony", None),
+        "next_id": simulation.agents.next_id,
+        "members": [[colony, role, list(members)] for (colony, role), members in simulation.colonies.members.items()],
+        "ants": ant_details,
+        "environment": {
+            "food_returned": environment.food_returned,
+            "hazard_version": environment.hazard_version,
+            "rng_gauss_next": environment_gauss,
+            "regenerator": {"regen_rate": environment.food_regenerator.regen_rate,
+                            "rng": environment.food_regenerator.rng.bit_generator.state},
+            "decay": {"name": decay_name, "state": vars(decay)},
+            "path_cache": cache_state,
+            "path_expansions": paths.expansions,
+        },
+        "worker_batch": batch_state,
+    }
+    write_snapshot(path, header, arrays)
+
+
+def load_simulation(simulation_class, path, **options):
+    header, arrays = read_snapshot(path)
+    simulation = simulation_class(seed=header["seed"], worker_backend=header["worker_backend"],
+                                  config=SimulationConfig.from_dict(header["config"]), populate=False, **options)
+    simulation.tick = header["tick"]
+    simulation.turn_tick = simulation.tick + 1
+    simulation.ants_made = header["ants_made"]
+    simulation.food_counters = {int(colony): count for colony, count in header["food_counters"].items()}
+    if header["winning_colony"] is not None:
+        simulation.winning_colony = header["winning_colony"]
+
+    # grid layers are copied out of the mapped file in one go each
+    environment = simulation.environment
+    state = header["environment"]
+    grid = environment.grid
+    np.copyto(grid.food, arrays["food"])
+    np.copyto(grid.hazard, arrays["hazard"])
+    np.copyto(grid.pheromone, arrays["pheromone"])
+    np.copyto(grid.timeleft, arrays["timeleft"])
+    environment.food_locations = cell_set(grid.food)
+    environment.hazard_locations = frozenset(cell_set(grid.hazard))
+    environment.hazard_version = state["hazard_version"]
+    environment.food_returned = {int(colony): amount for colony, amount in state["food_returned"].items()}
+    set_random_state(environment.rng, arrays["environment_rng"], state["rng_gauss_next"])
+    for food_x, food_y, cell_x, cell_y in arrays["trails"].tolist():
+        environment.trail_index.add((food_x, food_y), (cell_x, cell_y))
+
+    regenerator = environment.food_regenerator
+    regenerator.regen_rate = state["regenerator"]["regen_rate"]
+    regenerator.rng.bit_generator.state = state["regenerator"]["rng"]
+
+    decay = DECAY_MODELS[state["decay"]["name"]].__new__(DECAY_MODELS[state["decay"]["name"]])
+    decay.__dict__.update(state["decay"]["state"])
+    environment.pheromone_decay = decay
+
+    paths = environment.paths
+    paths.expansions = state["path_expansions"]
+    cache_state = state["path_cache"]
+    if paths.cache is not None and cache_state is not None:
+        for start, goal, path in cache_state["entries"]:
+            paths.cache.store(tuple(start), tuple(goal), cache_state["hazard_version"],
+                              None if path is None else [tuple(cell) for cell in path])
+        for name, value in cache_state["counters"].items():
+            setattr(paths.cache, name, value)
+
+    batch = simulation.worker_batch
+    if batch is not None:
+        batch_state = header["worker_batch"]
+        batch.allocate(batch_state["capacity"])
+        for name in BATCH_ARRAYS:
+            np.copyto(getattr(batch, name), arrays[f"batch_{name}"])
+        batch.size = batch_state["size"]
+        batch.free_slots = batch_state["free_slots"]
+        batch.rng.bit_generator.state = batch_state["rng"]
+
+    # ants go back into the store in the same order with the same ids
+    agents = simulation.agents
+    columns = zip(arrays["ant_id"].tolist(), arrays["ant_role"].tolist(), arrays["ant_colony"].tolist(),
+                  arrays["ant_x"].tolist(), arrays["ant_y"].tolist(), arrays["ant_alive"].tolist())
+    for row, (ant_id, role, colony, x, y, alive) in enumerate(columns):
+        details = header["ants"][row]
+        role = ROLES[role]
+        if "slot" in details:
+            ant = BatchedWorkerAnt(x, y, environment, colony, batch, slot=details["slot"])
+        else:
+            ant = ANT_CLASSES[role](x, y, environment, colony)
+            ant.alive = alive
+            ant.steps_since_last_move = details["steps_since_last_move"]
+            ant.rng.setstate(int(arrays["ant_rng"][row]))
+            if role == "scout":
+                ant.state = details["state"]
+                ant.current_food = pair(details["current_food"])
+                ant.current_route = deque(tuple(cell) for cell in details["current_route"])
+            elif role == "worker":
+                ant.carrying_food = details["carrying_food"]
+                ant.last_position = pair(details["last_position"])
+                ant.timeout_counter = details["timeout_counter"]
+                set_recent_positions(ant, [tuple(cell) for cell in details["recent_positions"]])
+            else:
+                ant.in_final_duel = details["in_final_duel"]
+        ant.id = ant_id
+        agents.slots[ant_id] = len(agents.ants)
+        agents.ants.append(ant)
+        simulation.schedule(ant)
+    agents.next_id = header["next_id"]
+
+    # colony groups keep the order ants joined them, which decides who changes role first
+    registry = simulation.colonies
+    for colony, role, members in header["members"]:
+        group = registry.members[(colony, role)]
+        for ant_id in members:
+            group[ant_id] = agents.get(ant_id)
+        registry.colony_sizes[colony] += len(members)
+    return simulation
@@ -0,0 +1,124 @@
+import math
+
+
+# same straight line distance the ants use
+def distance_between(ant, x, y):
+    return math.sqrt((ant.x - x) ** 2 + (ant.y - y) ** 2)
+
+# uniform grid of ant buckets, rebuilt each tick and kept current as ants move
+class SpatialIndex:
+    def __init__(self, ants, block_size=4):
+        self.block_size = block_size
+        self.buckets = {}
+        # ants keyed by (colony, role) in the order they were added
+        self.roles = {}
+        self.colony_sizes = {}
+        # tick order of each ant, used to break ties the same way a list scan would
+        self.order = {}
+        # corners of the area holding ants, in blocks
+        self.min_block = [math.inf, math.inf]
+        self.max_block = [-math.inf, -math.inf]
+        # neighbour queries answered and blocks looked in, for profiling
+        self.queries = 0
+        self.blocks_scanned = 0
+        for ant in ants:
+            self.add(ant)
+
+    def block_of(self, x, y):
+        return x // self.block_size, y // self.block_size
+
+    def add(self, ant):
+        self.order[id(ant)] = len(self.order)
+        self.place(ant, self.block_of(ant.x, ant.y))
+        self.roles.setdefault((ant.colony, ant.role), []).append(ant)
+        self.colony_sizes[ant.colony] = self.colony_sizes.get(ant.colony, 0) + 1
+
+    # moves an ant to the bucket for its new position
+    def moved(self, ant, old_x, old_y):
+        old_block = self.block_of(old_x, old_y)
+        new_block = self.block_of(ant.x, ant.y)
+        if old_block != new_block:
+            self.buckets[old_block].remove(ant)
+            self.place(ant, new_block)
+
+    def place(self, ant, block):
+        self.buckets.setdefault(block, []).append(ant)
+        for axis in (0, 1):
+            self.min_block[axis] = min(self.min_block[axis], block[axis])
+            self.max_block[axis] = max(self.max_block[axis], block[axis])
+
+    # all ants of a colony and role in tick order
+    def by_role(self, colony, role):
+        return self.roles.get((colony, role), [])
+
+    def colonies(self):
+        return list(self.colony_sizes)
+
+    def count(self, colony, role=None):
+        if role is None:
+            return self.colony_sizes.get(colony, 0)
+        return len(self.by_role(colony, role))
+
+    # ants within radius of a point, optionally skipping one colony, in tick order
+    def within_radius(self, x, y, radius, exclude_colony=None):
+        found = []
+        min_bx, min_by = self.block_of(math.floor(x - radius), math.floor(y - radius))
+        max_bx, max_by = self.block_of(math.floor(x + radius), math.floor(y + radius))
+        self.queries += 1
+        self.blocks_scanned += (max_bx - min_bx + 1) * (max_by - min_by + 1)
+        for bx in range(min_bx, max_bx + 1):
+            for by in range(min_by, max_by + 1):
+                for ant in self.buckets.get((bx, by), ()):
+                    if ant.colony == exclude_colony:
+                        continue
+                    if distance_between(ant, x, y) <= radius:
+                        found.append(ant)
+        found.sort(key=lambda ant: self.order[id(ant)])
+        return found
+
+    # nearest ant matching colony and role, searching outwards ring by ring of blocks
+    def nearest(self, x, y, colony, role=None):
+        self.queries += 1
+        if role is not None:
+            candidates = self.by_role(colony, role)
+            # a short list is cheaper to scan than the buckets
+            if len(candidates) <= 8:
+                return self.closest_of(x, y, candidates) if candidates else None
+
+        if not self.order:
+            return None
+        centre_bx, centre_by = self.block_of(x, y)
+        max_ring = max(centre_bx - self.min_block[0], self.max_block[0] - centre_bx,
+                       centre_by - self.min_block[1], self.max_block[1] - centre_by)
+        best = None
+        best_distance = math.inf
+        for ring in range(max_ring + 1):
+            # every ant in this ring or further out is at least this far away
+            if (ring - 1) * self.block_size + 1 > best_distance:
+                break
+            for block in self.ring_blocks(centre_bx, centre_by, ring):
+                self.blocks_scanned += 1
+                for ant in self.buckets.get(block, ()):
+                    if ant.colony != colony or (role is not None and ant.role != role):
+                        continue
+                    distance = distance_between(ant, x, y)
+                    if distance < best_distance or (distance == best_distance and self.order[id(ant)] < self.order[id(best)]):
+                        best = ant
+                        best_distance = distance
+        return best
+
+    # ant closest to a point, ties go to the earliest in tick order
+    def closest_of(self, x, y, ants):
+        return min(ants, key=lambda ant: (distance_between(ant, x, y), self.order[id(ant)]))
+
+    @staticmethod
+    def ring_blocks(centre_bx, centre_by, ring):
+        if ring == 0:
+            yield centre_bx, centre_by
+            return
+        for bx in range(centre_bx - ring, centre_bx + ring + 1):
+            yield bx, centre_by - ring
+            yield bx, centre_by + ring
+        for by in range(centre_by - ring + 1, centre_by + ring):
+            yield centre_bx - ring, by
+            yield centre_bx + ring, by
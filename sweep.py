@@ -0,0 +1,137 @@
+import itertools
+import json
+
+import numpy as np
+
+from config import SimulationConfig
+from tournament import ResultWriter, game_key, load_results, run_jobs, summarise
+
+
+# a parameter space maps config settings to either a list of values or a range,
+# {"low": 2, "high": 8, "steps": 4} ranges give evenly spaced values for grid sweeps
+# and are sampled continuously by random and latin hypercube sweeps, ints stay ints
+def load_space(path):
+    with open(path) as file:
+        space = json.load(file)
+    known = set(SimulationConfig().to_dict())
+    unknown = set(space) - known
+    if unknown:
+        raise ValueError(f"unknown config settings: {', '.join(sorted(unknown))}")
+    for name, spec in space.items():
+        if isinstance(spec, dict):
+            if "low" not in spec or "high" not in spec:
+                raise ValueError(f"range for {name} needs a low and a high")
+        elif not isinstance(spec, list) or not spec:
+            raise ValueError(f"{name} must be a list of values or a range")
+    return space
+
+
+def is_range(spec):
+    return isinstance(spec, dict)
+
+
+def is_int_range(spec):
+    return isinstance(spec["low"], int) and isinstance(spec["high"], int)
+
+
+# the values a grid sweep tries for one setting
+def grid_values(spec):
+    if not is_range(spec):
+        return list(spec)
+    steps = spec.get("steps", 5)
+    values = np.linspace(spec["low"], spec["high"], steps).tolist()
+    if is_int_range(spec):
+        # rounding can repeat values on narrow ranges
+        return sorted({round(value) for value in values})
+    return values
+
+
+# maps a number in [0, 1) onto a setting
+def scale(spec, unit):
+    if not is_range(spec):
+        return spec[int(unit * len(spec))]
+    value = spec["low"] + unit * (spec["high"] - spec["low"])
+    return round(value) if is_int_range(spec) else value
+
+
+# every combination of the grid values
+def grid_points(space):
+    names = list(space)
+    for values in itertools.product(*(grid_values(space[name]) for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_points(space, samples, seed=None):
+    rng = np.random.default_rng(seed)
+    for _ in range(samples):
+        yield {name: scale(spec, rng.random()) for name, spec in space.items()}
+
+
+# each setting is cut into samples equal strata and every stratum is used exactly once
+def latin_hypercube_points(space, samples, seed=None):
+    rng = np.random.default_rng(seed)
+    units = {
+        name: (rng.permutation(samples) + rng.random(samples)) / samples
+        for name in space
+    }
+    for index in range(samples):
+        yield {name: scale(spec, units[name][index]) for name, spec in space.items()}
+
+
+def sample_points(space, mode="grid", samples=20, seed=None):
+    if mode == "grid":
+        return list(grid_points(space))
+    if mode == "random":
+        return list(random_points(space, samples, seed))
+    if mode == "lhs":
+        return list(latin_hypercube_points(space, samples, seed))
+    raise ValueError(f"unknown sweep mode: {mode}")
+
+
+# plays every sampled config against every seed, games already in the jsonl cache_path with the same
+# max_ticks and worker_backend are not replayed, returns one summary per config
+def run_sweep(points, seeds, cache_path, jobs=None, max_ticks=50000, worker_backend="objects", base_config=None,
+              on_result=None):
+    base_config = base_config or SimulationConfig()
+    configs = []
+    for point in points:
+        config = base_config.with_changes(**point)
+        configs.append((point, config, config.config_hash()))
+
+    done = {game_key(result) for result in load_results(cache_path)}
+    pending = []
+    queued = set()
+    for _, config, config_hash in configs:
+        for seed in seeds:
+            key = (config_hash, max_ticks, worker_backend, seed)
+            # samples can land on the same config more than once
+            if key in done or key in queued:
+                continue
+            queued.add(key)
+            pending.append({"max_ticks": max_ticks, "seed": seed, "worker_backend": worker_backend,
+                            "config": config.to_dict()})
+
+    writer = ResultWriter(cache_path)
+
+    def record(result):
+        writer.write(result)
+        if on_result:
+            on_result(result)
+
+    try:
+        run_jobs(pending, jobs, record)
+    finally:
+        writer.close()
+
+    results = {}
+    wanted = set(seeds)
+    for result in load_results(cache_path):
+        config_hash, result_max_ticks, result_backend, seed = game_key(result)
+        if seed in wanted and (result_max_ticks, result_backend) == (max_ticks, worker_backend):
+            results.setdefault(config_hash, []).append(result)
+    summaries = {}
+    for point, _, config_hash in configs:
+        if config_hash not in summaries:
+            summaries[config_hash] = {"config_hash": config_hash, "settings": point,
+                                      "summary": summarise(results.get(config_hash, []))}
+    return list(summaries.values())
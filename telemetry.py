@@ -0,0 +1,109 @@
+import sys
+import threading
+from collections import deque
+
+# message levels, TRACE is per cell detail, OFF keeps only the counters
+TRACE = 5
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+LEVELS = {"trace": TRACE, "debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+LEVEL_NAMES = {value: name.upper() for name, value in LEVELS.items()}
+
+
+# leveled messages and per category counters for the simulation, messages go into a ring buffer
+# and are formatted and written by a background thread so logging never waits on the file
+class Telemetry:
+    def __init__(self, level=OFF, counters=True, path=None, stream=None, capacity=65536, flush_interval=0.2):
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        self.counters = counters
+        # calls return straight away when there is nothing to count or keep
+        self.active = counters or self.level < OFF
+        self.counts = {}
+        # messages not yet written, the oldest are dropped once it is full
+        self.buffer = deque(maxlen=capacity)
+        self.dropped = 0
+        # current tick, stamped on each message
+        self.tick = 0
+
+        self.stream = stream
+        self.file = None
+        if path is not None:
+            self.file = open(path, "a")
+            self.stream = self.file
+        self.flush_interval = flush_interval
+        self.stopping = threading.Event()
+        self.writer = None
+        if self.stream is not None and self.level < OFF:
+            self.writer = threading.Thread(target=self.write_loop, name="telemetry", daemon=True)
+            self.writer.start()
+
+    # counts the category and keeps the message if its level is high enough,
+    # message is a format string only filled in when it is written
+    def log(self, level, category, message, *args):
+        if not self.active:
+            return
+        if self.counters:
+            self.counts[category] = self.counts.get(category, 0) + 1
+        if level < self.level:
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((self.tick, level, category, message, args))
+
+    # adds to a counter without a message
+    def count(self, category, amount=1):
+        if self.counters:
+            self.counts[category] = self.counts.get(category, 0) + amount
+
+    def enabled(self, level):
+        return level >= self.level
+
+    # formatted messages still in the buffer, newest last
+    def recent(self, limit=None):
+        messages = list(self.buffer)
+        if limit is not None:
+            messages = messages[-limit:]
+        return [self.format(message) for message in messages]
+
+    def format(self, entry):
+        tick, level, category, message, args = entry
+        return f"{tick} {LEVEL_NAMES.get(level, level)} {category} {message.format(*args)}"
+
+    def write_loop(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    # writes out everything buffered so far
+    def flush(self):
+        if self.stream is None:
+            return
+        lines = []
+        buffer = self.buffer
+        while buffer:
+            try:
+                lines.append(self.format(buffer.popleft()) + "\n")
+            except IndexError:
+                break
+        if lines:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+
+    def close(self):
+        if self.writer is not None:
+            self.stopping.set()
+            self.writer.join()
+            self.writer = None
+        else:
+            self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.stream = None
+
+
+# telemetry writing messages to stderr as they happen, for watching a run
+def console_telemetry(level=INFO):
+    return Telemetry(level=level, stream=sys.stderr)
@@ -0,0 +1,44 @@
+# settings a game cannot be played with are refused when the config is made, not partway through a game
+import random
+
+import pytest
+
+from config import SimulationConfig, safe_zone
+from environment import Environment
+from pheromone_decay import DiffusionDecay
+from simulation import Simulation
+
+
+@pytest.mark.parametrize("changes, message", [
+    ({"width": 10, "height": 10, "num_hazards": 60}, "num_hazards must be at most 18"),
+    ({"width": 10, "height": 10, "num_hazards": 0, "num_food": 100}, "num_food must be at most 18"),
+    ({"width": 2.5}, "width must be a whole number"),
+    ({"colony_size": True}, "colony_size must be a whole number"),
+    ({"attack_radius": float("nan")}, "attack_radius must be a finite number"),
+    ({"regen_rate": float("inf")}, "regen_rate must be a finite number"),
+    ({"pheromone_timeleft": 40000}, "pheromone_timeleft must be between"),
+    ({"pheromone_decay": "fade"}, "pheromone_decay must be one of"),
+    ({"pheromone_spread": 1.5}, "pheromone_spread must be between"),
+])
+def test_unplayable_settings_are_refused(changes, message):
+    with pytest.raises(ValueError, match=message):
+        SimulationConfig(**changes)
+
+
+def test_hazards_fill_every_free_cell_without_touching_the_nests():
+    config = SimulationConfig(width=30, height=20, num_hazards=30 * 20 - len(safe_zone(30, 20)))
+    environment = Environment(30, 20, config=config, rng=random.Random(1))
+    environment.add_hazards(100)
+    environment.add_hazards(config.num_hazards - 100)
+    assert len(environment.hazard_locations) == config.num_hazards == environment.grid.hazard.sum()
+    assert not environment.hazard_locations & safe_zone(30, 20)
+
+    with pytest.raises(ValueError, match="only 0 free cells"):
+        environment.add_hazards(1)
+
+
+def test_games_use_the_decay_model_the_config_picks():
+    config = SimulationConfig(pheromone_decay="diffusion", pheromone_decay_rate=0.05, pheromone_spread=0.2)
+    decay = Simulation(seed=1, config=config).environment.pheromone_decay
+    assert isinstance(decay, DiffusionDecay)
+    assert decay.spread == 0.2 and decay.keep == round(256 * 0.95)
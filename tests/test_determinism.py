@@ -0,0 +1,44 @@
+# seeded games must replay exactly, the pinned hashes change only when a commit changes how the
+# game plays on purpose, update them in that commit and say why
+import pytest
+
+from config import SimulationConfig
+from simulation import Simulation
+
+# config and ticks played for each named game
+CONFIGS = {
+    "default": (SimulationConfig(), 1000),
+    # extra ants placed around the nests, crowded enough for ants to get in each others way
+    "crowded": (SimulationConfig(width=60, height=60, colony_size=40), 300),
+}
+# (config name, backend, seed) -> state hash at the end of the game
+PINNED = {
+    ("default", "objects", 1): "7ff4205baf3cffc7",
+    ("default", "objects", 2): "f65113d20050d594",
+    ("default", "arrays", 1): "dd2792651aeab101",
+    ("default", "arrays", 2): "d45ab53a1918b2ba",
+    ("crowded", "objects", 1): "3290758780422512",
+    ("crowded", "objects", 2): "9e61ae6ebaf2589a",
+    ("crowded", "arrays", 1): "fdccaa325f99c2c1",
+    ("crowded", "arrays", 2): "853a9d041f08418d",
+}
+
+
+def play(name, backend, seed):
+    config, ticks = CONFIGS[name]
+    simulation = Simulation(seed=seed, worker_backend=backend, config=config)
+    while simulation.tick < ticks and not simulation.game_end():
+        simulation.update()
+    return simulation
+
+
+@pytest.mark.parametrize("name, backend, seed", sorted(PINNED))
+def test_pinned_state_hash(name, backend, seed):
+    assert play(name, backend, seed).state_hash() == PINNED[name, backend, seed]
+
+
+@pytest.mark.parametrize("backend", ["objects", "arrays"])
+def test_same_seed_replays_and_other_seeds_differ(backend):
+    first = play("crowded", backend, 7).state_hash()
+    assert play("crowded", backend, 7).state_hash() == first
+    assert play("crowded", backend, 8).state_hash() != first
@@ -0,0 +1,74 @@
+# snapshots restore a game that plays on exactly as the original would, and refuse files they cannot read
+import pytest
+
+from config import SimulationConfig
+from headless import run_headless
+from simulation import Simulation
+from snapshot import FORMAT_VERSION, MAGIC, PREAMBLE, read_snapshot
+
+# small and crowded so scouts, attackers and the worker batch all have state mid game
+CONFIG = SimulationConfig(width=60, height=60, colony_size=20)
+BACKENDS = ["objects", "arrays"]
+
+
+def played(backend, ticks, seed=5):
+    simulation = Simulation(seed=seed, worker_backend=backend, config=CONFIG)
+    for _ in range(ticks):
+        simulation.update()
+    return simulation
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_restored_game_plays_on_like_the_original(backend, tmp_path):
+    path = tmp_path / "game.snap"
+    original = played(backend, 250)
+    original.snapshot(str(path))
+    restored = Simulation.restore(str(path))
+    assert restored.tick == original.tick
+    assert restored.state_hash() == original.state_hash()
+
+    for _ in range(300):
+        original.update()
+        restored.update()
+    assert restored.state_hash() == original.state_hash()
+
+
+def rewrite_preamble(path, magic=MAGIC, version=FORMAT_VERSION):
+    with open(path, "rb+") as file:
+        _, _, header_offset, header_length = PREAMBLE.unpack(file.read(PREAMBLE.size))
+        file.seek(0)
+        file.write(PREAMBLE.pack(magic, version, header_offset, header_length))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_bad_magic_or_version_is_refused(backend, tmp_path):
+    path = str(tmp_path / "game.snap")
+    played(backend, 10).snapshot(path)
+    read_snapshot(path)
+
+    rewrite_preamble(path, magic=b"NOTASNAP")
+    with pytest.raises(ValueError, match="not a simulation snapshot"):
+        Simulation.restore(path)
+
+    rewrite_preamble(path, version=FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="version"):
+        Simulation.restore(path)
+
+    truncated = tmp_path / "short.snap"
+    truncated.write_bytes(MAGIC)
+    with pytest.raises(ValueError, match="not a simulation snapshot"):
+        read_snapshot(str(truncated))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_checkpoint_and_resume_matches_an_uninterrupted_run(backend, tmp_path):
+    checkpoint = str(tmp_path / "game.snap")
+    options = {"seed": 5, "worker_backend": backend, "config": CONFIG}
+    uninterrupted = run_headless(max_ticks=600, **options)
+
+    # stops at tick 400 with a checkpoint just written, then carries on from it
+    run_headless(max_ticks=400, checkpoint_path=checkpoint, checkpoint_every=200, **options)
+    resumed = run_headless(max_ticks=600, checkpoint_path=checkpoint, checkpoint_every=200, resume=True, **options)
+
+    for key in ("ticks", "winner", "food_returned", "ants_left", "state_hash"):
+        assert resumed[key] == uninterrupted[key]
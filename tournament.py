@@ -0,0 +1,205 @@
+import csv
+import json
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from config import SimulationConfig
+from headless import run_headless
+
+CSV_FIELDS = ["seed", "config_hash", "max_ticks", "worker_backend", "winner", "ticks", "food_returned_1",
+              "food_returned_2", "seconds", "ticks_per_sec", "width", "height"]
+
+
+# what makes two saved results the same game, a result is only reused when all of it matches
+def game_key(result):
+    return result.get("config_hash"), result.get("max_ticks"), result.get("worker_backend"), result["seed"]
+
+
+# runs one seeded game in a worker process
+def run_match(job):
+    return run_headless(**job)
+
+
+# flattens a match summary into one csv row
+def to_csv_row(result):
+    return {
+        "seed": result["seed"],
+        "config_hash": result["config_hash"],
+        "max_ticks": result["max_ticks"],
+        "worker_backend": result["worker_backend"],
+        "winner": result["winner"] or "",
+        "ticks": result["ticks"],
+        "food_returned_1": result["food_returned"][1],
+        "food_returned_2": result["food_returned"][2],
+        "seconds": result["seconds"],
+        "ticks_per_sec": result["ticks_per_sec"],
+        "width": result["width"],
+        "height": result["height"],
+    }
+
+
+def from_csv_row(row):
+    return {
+        "seed": int(row["seed"]),
+        "config_hash": row["config_hash"],
+        "max_ticks": int(row["max_ticks"]),
+        "worker_backend": row["worker_backend"],
+        "winner": row["winner"] or None,
+        "ticks": int(row["ticks"]),
+        "food_returned": {1: int(row["food_returned_1"]), 2: int(row["food_returned_2"])},
+        "seconds": float(row["seconds"]),
+        "ticks_per_sec": float(row["ticks_per_sec"]) if row["ticks_per_sec"] else None,
+        "width": int(row["width"]),
+        "height": int(row["height"]),
+    }
+
+
+# results already written by an earlier run, a half written last line is ignored
+def load_results(out_path):
+    if not os.path.exists(out_path):
+        return []
+    results = []
+    with open(out_path, newline="") as file:
+        if out_path.endswith(".csv"):
+            for row in csv.DictReader(file):
+                try:
+                    results.append(from_csv_row(row))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        else:
+            for line in file:
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return results
+
+
+# appends each match result to a jsonl or csv file as soon as it finishes
+class ResultWriter:
+    def __init__(self, out_path):
+        self.is_csv = out_path.endswith(".csv")
+        new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+        # drops a half written last line left by an interrupted run
+        if not new_file:
+            with open(out_path, "rb+") as file:
+                content = file.read()
+                if not content.endswith(b"\n"):
+                    file.truncate(content.rfind(b"\n") + 1)
+            # rows are appended under the existing header, which has to have every column
+            if self.is_csv:
+                with open(out_path, newline="") as file:
+                    header = next(csv.reader(file), [])
+                if header != CSV_FIELDS:
+                    raise ValueError(f"{out_path} has different columns from this version, write to a new file")
+        self.file = open(out_path, "a", newline="")
+        if self.is_csv:
+            self.csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            if new_file:
+                self.csv.writeheader()
+
+    def write(self, result):
+        if self.is_csv:
+            self.csv.writerow(to_csv_row(result))
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# 95% wilson score interval for a proportion
+def wilson_interval(successes, total, z=1.96):
+    if total == 0:
+        return 0.0, 0.0
+    share = successes / total
+    centre = (share + z * z / (2 * total)) / (1 + z * z / total)
+    margin = z * math.sqrt(share * (1 - share) / total + z * z / (4 * total * total)) / (1 + z * z / total)
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+# mean with a 95% normal interval
+def mean_interval(values, z=1.96):
+    if not values:
+        return None, (None, None)
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, (mean, mean)
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    margin = z * math.sqrt(variance / len(values))
+    return mean, (mean - margin, mean + margin)
+
+
+# win rates and game length over a set of match results
+def summarise(results):
+    total = len(results)
+    outcomes = {}
+    for result in results:
+        outcome = result["winner"] or "unfinished"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    mean_ticks, ticks_interval = mean_interval([result["ticks"] for result in results])
+    return {
+        "matches": total,
+        "outcomes": {
+            outcome: {"count": count, "rate": count / total, "rate_95ci": wilson_interval(count, total)}
+            for outcome, count in sorted(outcomes.items())
+        },
+        "mean_ticks": mean_ticks,
+        "mean_ticks_95ci": ticks_interval,
+    }
+
+
+# runs every job across a pool of processes, calling on_result as each game finishes
+def run_jobs(pending_jobs, jobs=None, on_result=None):
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = set()
+        queue = iter(pending_jobs)
+        while True:
+            # keeps a couple of games queued per process so none sit idle
+            for job in queue:
+                running.add(pool.submit(run_match, job))
+                if len(running) >= jobs * 2:
+                    break
+            if not running:
+                break
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                on_result(future.result())
+
+
+# runs a game for every seed across a pool of processes, skipping seeds already in out_path
+def run_tournament(seeds, out_path, jobs=None, max_ticks=50000, width=None, height=None, worker_backend="objects",
+                   on_result=None, config=None):
+    config = config or SimulationConfig()
+    if width is not None or height is not None:
+        config = config.with_changes(width=width or config.width, height=height or config.height)
+    config_hash = config.config_hash()
+
+    # results from another config, tick limit or backend, or older results that do not say, are not reused
+    def same_game(result):
+        return game_key(result)[:3] == (config_hash, max_ticks, worker_backend)
+
+    done = {result["seed"] for result in load_results(out_path) if same_game(result)}
+    pending = [
+        {"max_ticks": max_ticks, "seed": seed, "worker_backend": worker_backend, "config": config.to_dict()}
+        for seed in seeds if seed not in done
+    ]
+
+    writer = ResultWriter(out_path)
+
+    def record(result):
+        writer.write(result)
+        if on_result:
+            on_result(result)
+
+    try:
+        run_jobs(pending, jobs, record)
+    finally:
+        writer.close()
+
+    wanted = set(seeds)
+    return summarise([result for result in load_results(out_path) if result["seed"] in wanted and same_game(result)])
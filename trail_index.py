@@ -0,0 +1,49 @@
+# two way index between food locations and the pheromone trail cells leading to them
+class TrailIndex:
+    def __init__(self):
+        # trail cells keyed by food location
+        self.trails = {}
+        # food locations keyed by trail cell, the set size is the cells reference count
+        self.foods_by_cell = {}
+
+    def __contains__(self, food_location):
+        return food_location in self.trails
+
+    def __len__(self):
+        return len(self.trails)
+
+    # adds a cell to the trail leading to food_location
+    def add(self, food_location, cell):
+        trail = self.trails.get(food_location)
+        if trail is None:
+            trail = self.trails[food_location] = set()
+        if cell in trail:
+            return
+        trail.add(cell)
+        foods = self.foods_by_cell.get(cell)
+        if foods is None:
+            foods = self.foods_by_cell[cell] = set()
+        foods.add(food_location)
+
+    # removes a whole trail, returns the cells no other trail still uses
+    def release(self, food_location):
+        freed = []
+        for cell in self.trails.pop(food_location, ()):
+            foods = self.foods_by_cell[cell]
+            foods.discard(food_location)
+            if not foods:
+                del self.foods_by_cell[cell]
+                freed.append(cell)
+        return freed
+
+    # removes cells from every trail using them, dropping trails left empty
+    def discard_cells(self, cells):
+        for cell in cells:
+            foods = self.foods_by_cell.pop(cell, None)
+            if foods is None:
+                continue
+            for food_location in foods:
+                trail = self.trails[food_location]
+                trail.discard(cell)
+                if not trail:
+                    del self.trails[food_location]
@@ -0,0 +1,286 @@
+import numpy as np
+
+# the eight moves in the same order the ant classes try them
+MOVES = np.array([(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)], dtype=np.int32)
+
+
+# every worker ant stored as rows of numpy arrays and stepped together each tick
+class WorkerBatch:
+    def __init__(self, environment, capacity=64, seed=None):
+        self.environment = environment
+        self.memory_limit = environment.config.worker_memory_limit
+        self.timeout_limit = environment.config.worker_timeout_limit
+        self.move_delay = environment.config.worker_move_delay
+        self.rng = np.random.default_rng(seed)
+        # nest position of every colony, colony 1 is row 1
+        self.nest_xy = np.zeros((max(environment.nests) + 1, 2), dtype=np.int32)
+        for colony, nest in environment.nests.items():
+            self.nest_xy[colony] = nest
+
+        self.size = 0
+        self.free_slots = []
+        self.allocate(capacity)
+
+    # (re)sizes every array to hold capacity workers
+    def allocate(self, capacity):
+        def grow(name, shape, dtype, fill):
+            new = np.full(shape, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:len(old)] = old
+            setattr(self, name, new)
+
+        grow("x", capacity, np.int32, 0)
+        grow("y", capacity, np.int32, 0)
+        grow("colony", capacity, np.int8, 0)
+        # slot holds a worker, and that worker is still alive
+        grow("in_use", capacity, bool, False)
+        grow("alive", capacity, bool, False)
+        grow("carrying_food", capacity, bool, False)
+        grow("timeout_counter", capacity, np.int32, 0)
+        grow("steps_since_last_move", capacity, np.int16, 0)
+        # last position, -1 when the worker has none
+        grow("last_xy", (capacity, 2), np.int32, -1)
+        # ring buffer of recent positions with the slot to write next
+        grow("recent_positions", (capacity, self.memory_limit, 2), np.int32, -1)
+        grow("recent_head", capacity, np.int8, 0)
+        self.capacity = capacity
+
+    # adds a worker and returns its slot
+    def add(self, x, y, colony):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.size == self.capacity:
+                self.allocate(self.capacity * 2)
+            slot = self.size
+            self.size += 1
+        self.x[slot] = x
+        self.y[slot] = y
+        self.colony[slot] = colony
+        self.in_use[slot] = True
+        self.alive[slot] = True
+        self.carrying_food[slot] = False
+        self.timeout_counter[slot] = 0
+        self.steps_since_last_move[slot] = 0
+        self.last_xy[slot] = -1
+        self.recent_positions[slot] = -1
+        self.recent_head[slot] = 0
+        return slot
+
+    # frees a slot for reuse
+    def release(self, slot):
+        self.in_use[slot] = False
+        self.alive[slot] = False
+        self.free_slots.append(slot)
+
+    # frees the slots of workers killed since the last tick
+    def release_dead(self):
+        for slot in np.flatnonzero(self.in_use[:self.size] & ~self.alive[:self.size]).tolist():
+            self.release(slot)
+
+    # one tick for every worker, same rules as WorkerAnt.act
+    def step(self):
+        n = self.size
+        live = np.flatnonzero(self.alive[:n])
+        if len(live) == 0:
+            return
+        self.timeout_counter[live] += 1
+
+        # movement happens every move_delay steps
+        waiting = self.steps_since_last_move[live] < self.move_delay
+        self.steps_since_last_move[live[waiting]] += 1
+        movers = live[~waiting]
+        if len(movers) == 0:
+            return
+        self.steps_since_last_move[movers] = 0
+
+        occupancy = self.environment.occupancy
+        colony = self.colony[movers]
+        nest = self.nest_xy[colony]
+        at_nest = (self.x[movers] == nest[:, 0]) & (self.y[movers] == nest[:, 1])
+
+        # timed out ants head home, the timer resets once they are there
+        timed_out = self.timeout_counter[movers] > self.timeout_limit
+        self.timeout_counter[movers[timed_out & at_nest]] = 0
+        heading_home = timed_out & ~at_nest
+
+        # ants carrying food drop it at the nest or keep heading home
+        carrying = self.carrying_food[movers] & ~heading_home
+        dropping = carrying & at_nest
+        if dropping.any():
+            dropped = movers[dropping]
+            self.carrying_food[dropped] = False
+            self.timeout_counter[dropped] = 0
+            for colony_id, amount in enumerate(np.bincount(self.colony[dropped]).tolist()):
+                if amount:
+                    self.environment.food_returned[colony_id] += amount
+        self.move_towards_nest(movers[heading_home | (carrying & ~at_nest)], occupancy)
+
+        # everyone else follows pheromone trails
+        self.follow_trails(movers[~heading_home & ~carrying], occupancy)
+
+    # which workers may step onto the cells they picked, workers picking the same cell take
+    # whatever room it has in slot order, the occupancy counts follow the workers that move
+    def claim(self, slots, xs, ys, occupancy):
+        targets = ys.astype(np.int64) * self.environment.width + xs
+        order = np.argsort(targets, kind="stable")
+        sorted_targets = targets[order]
+        starts = np.flatnonzero(np.r_[True, sorted_targets[1:] != sorted_targets[:-1]])
+        # place of each worker in the queue for its cell
+        rank = np.empty(len(targets), dtype=np.int64)
+        rank[order] = np.arange(len(targets)) - np.repeat(starts, np.diff(np.r_[starts, len(targets)]))
+        allowed = rank < occupancy.room(xs, ys)
+
+        moving = slots[allowed]
+        np.subtract.at(occupancy.counts, (self.y[moving], self.x[moving]), 1)
+        np.add.at(occupancy.counts, (ys[allowed], xs[allowed]), 1)
+        occupancy.refresh(np.r_[self.x[moving], xs[allowed]], np.r_[self.y[moving], ys[allowed]])
+        return allowed
+
+    # the eight neighbouring cells of each worker
+    def neighbours(self, slots):
+        xs = (self.x[slots, None] + MOVES[:, 0]) % self.environment.width
+        ys = (self.y[slots, None] + MOVES[:, 1]) % self.environment.height
+        return xs, ys
+
+    def move_towards_nest(self, slots, occupancy):
+        if len(slots) == 0:
+            return
+        xs, ys = self.neighbours(slots)
+        valid = ~occupancy.blocked(xs, ys) & ~self.environment.grid.hazard[ys, xs]
+        nest = self.nest_xy[self.colony[slots]]
+        distance = np.sqrt((xs - nest[:, 0, None]) ** 2 + (ys - nest[:, 1, None]) ** 2)
+        distance[~valid] = np.inf
+        # argmin keeps the first of equal moves like min() does
+        self.move_to(slots, valid.any(axis=1), xs, ys, np.argmin(distance, axis=1), occupancy)
+
+    def move_randomly(self, slots, occupancy):
+        if len(slots) == 0:
+            return
+        xs, ys = self.neighbours(slots)
+        valid = ~occupancy.blocked(xs, ys) & ~self.environment.grid.hazard[ys, xs]
+        # the highest random score among valid moves is a uniform choice
+        scores = self.rng.random(valid.shape)
+        scores[~valid] = -1
+        self.move_to(slots, valid.any(axis=1), xs, ys, np.argmax(scores, axis=1), occupancy)
+
+    def move_to(self, slots, can_move, xs, ys, choice, occupancy):
+        slots = slots[can_move]
+        rows = np.flatnonzero(can_move)
+        target_xs = xs[rows, choice[rows]]
+        target_ys = ys[rows, choice[rows]]
+        allowed = self.claim(slots, target_xs, target_ys, occupancy)
+        self.x[slots[allowed]] = target_xs[allowed]
+        self.y[slots[allowed]] = target_ys[allowed]
+
+    def follow_trails(self, slots, occupancy):
+        if len(slots) == 0:
+            return
+        grid = self.environment.grid
+        xs, ys = self.neighbours(slots)
+        pheromone = grid.pheromone[self.colony[slots, None] - 1, ys, xs].astype(np.int32)
+
+        # filtering out bad moves
+        last = self.last_xy[slots]
+        recent = self.recent_positions[slots]
+        revisit = ((xs[:, :, None] == recent[:, None, :, 0]) & (ys[:, :, None] == recent[:, None, :, 1])).any(axis=2)
+        valid = (
+            ~((xs == last[:, 0, None]) & (ys == last[:, 1, None]))
+            & ~revisit
+            & ~grid.hazard[ys, xs]
+            & ~occupancy.blocked(xs, ys)
+            & (pheromone > 0)
+        )
+        has_trail = valid.any(axis=1)
+
+        # best move is one with highest pheromone level and moving further away from nest
+        nest = self.nest_xy[self.colony[slots]]
+        distance = np.sqrt((xs - nest[:, 0, None]) ** 2 + (ys - nest[:, 1, None]) ** 2)
+        pheromone[~valid] = -1
+        strongest = pheromone == pheromone.max(axis=1, keepdims=True)
+        distance[~(valid & strongest)] = -1
+        choice = np.argmax(distance, axis=1)
+
+        followers = slots[has_trail]
+        if len(followers):
+            rows = np.flatnonzero(has_trail)
+            target_xs = xs[rows, choice[rows]]
+            target_ys = ys[rows, choice[rows]]
+            # followers beaten to their cell by another worker wait for their next turn
+            allowed = self.claim(followers, target_xs, target_ys, occupancy)
+            followers = followers[allowed]
+            self.last_xy[followers, 0] = self.x[followers]
+            self.last_xy[followers, 1] = self.y[followers]
+            self.x[followers] = target_xs[allowed]
+            self.y[followers] = target_ys[allowed]
+
+            # updates last five positions
+            if self.memory_limit:
+                head = self.recent_head[followers]
+                self.recent_positions[followers, head, 0] = self.x[followers]
+                self.recent_positions[followers, head, 1] = self.y[followers]
+                self.recent_head[followers] = (head + 1) % self.memory_limit
+
+            # check if food is found, one at a time as ants can share a food cell
+            found = followers[grid.food[self.y[followers], self.x[followers]] > 0]
+            for slot in found.tolist():
+                x, y = int(self.x[slot]), int(self.y[slot])
+                if self.environment.is_food(x, y):
+                    self.carrying_food[slot] = True
+                    self.environment.collect_food(x, y)
+                    self.last_xy[slot] = -1
+
+        # if no pheromone trails move randomly
+        wanderers = slots[~has_trail]
+        self.move_randomly(wanderers, occupancy)
+        self.last_xy[wanderers, 0] = self.x[wanderers]
+        self.last_xy[wanderers, 1] = self.y[wanderers]
+
+
+# worker ant whose state lives in a WorkerBatch, the batch moves it
+class BatchedWorkerAnt:
+    __slots__ = ("environment", "colony", "batch", "slot", "id", "last_turn", "next_turn")
+    role = "worker"
+
+    # slot reattaches to a worker already in the batch, as when restoring a snapshot
+    def __init__(self, x, y, environment, colony, batch, slot=None):
+        self.environment = environment
+        self.colony = colony
+        self.batch = batch
+        self.slot = batch.add(x, y, colony) if slot is None else slot
+        environment.occupancy.add(x, y)
+
+    @property
+    def x(self):
+        return int(self.batch.x[self.slot])
+
+    @x.setter
+    def x(self, value):
+        self.environment.occupancy.move(self.x, self.y, value, self.y)
+        self.batch.x[self.slot] = value
+
+    @property
+    def y(self):
+        return int(self.batch.y[self.slot])
+
+    @y.setter
+    def y(self, value):
+        self.environment.occupancy.move(self.x, self.y, self.x, value)
+        self.batch.y[self.slot] = value
+
+    @property
+    def alive(self):
+        return bool(self.batch.alive[self.slot])
+
+    @alive.setter
+    def alive(self, value):
+        self.batch.alive[self.slot] = value
+
+    @property
+    def carrying_food(self):
+        return bool(self.batch.carrying_food[self.slot])
+
+    # the batch steps every worker at once
+    def act(self, occupied_squares, all_ants, ant_index=None):
+        pass